@@ -5,117 +5,177 @@ Created on Thu May 11 12:12:53 2023
 
 @author: epnzv
 """
+import os
 
 import pandas as pd 
 import numpy as np
 
-from aggregation_config import (DATA_DIR, SALES_DIR)
-from import_files import (read_2022_CF_data, read_2023_CF_data, read_2024_CF_data,
-                          read_abm_teamkey_file,
-                          read_commodity_corn_soybean, read_CY_CF_data, 
-                          read_kynetic_data, read_performance,
-                          read_sales_filepath, read_soybean_trait_map, read_SRP,
-                          read_state_county_fips, read_weather_filepath, supply_data)
-from merge import (merge_advantages, merge_cf_with_abm, merge_price_received)
-from preprocess import (amend_trait_features, clean_commodity, clean_performance,
-                        clean_state_county, clean_Weather, create_commodity_features,
-                        create_imputation_frames, create_lagged_features, create_portfolio_weights,
-                        create_lagged_sales, flatten_monthly_weather, get_RM,
-                        impute_CY_CF, impute_h2h_data, impute_price, impute_SRP,
-                        Performance_with_yield_adv, usda_acre_data, usda_yield_data)
-
-###### --------------------- Read ABM & Teamkey Map  ------------------- ######
-abm_Teamkey = read_abm_teamkey_file()
-
-###### ---------------------- Read Sales Data ------------------------ ######    
-# define a list to store the FULL datasets
-dfs_full = []
-
-for year in range(2012, 2021):
-    print("Read ", str(year), " Sales Data")
-    dfi_path = DATA_DIR + SALES_DIR + str(year) + '.csv'
-    dfi = pd.read_csv(dfi_path)
-    
-    dfi = dfi[dfi['SPECIE_DESCR'] == 'SOYBEAN'].reset_index(drop=True)
-    dfi = dfi[dfi['BRAND_FAMILY_DESCR'] == 'NATIONAL'].reset_index(drop=True)
+from aggregation_config import (DATA_DIR, REFRESH_YEARS, SALES_DIR, SALES_YEARS)
+from import_files import (read_abm_teamkey_file)
+from parallel_read import (read_years)
+
+# the majority abm of each sales year and FIPS from the previous runs, so only
+# new sales years have to be read
+MAJORITY_MAP_PATH = 'soybean_abm_fips_majority.pkl'
+
+
+def build_abm_fips_map(abm_map_sales, FIPS_abm):
+    """Builds the FIPS to abm map from the majority abms of the sales years
+    and, after 2020, the yearly abm map. Each FIPS keeps its first abm in a
+    year.
     
-    # set a year parameter to be the year 
-    dfi['year'] = year
+    Keyword arguments:
+        abm_map_sales -- the majority abm of each year and FIPS, as returned
+            by majority_abm_map
+        FIPS_abm -- the yearly abm map, with the 'New Area ID' of each abm
+    Returns:
+        abm_map_no_dupes_dropped -- the map of year and FIPS to abm and
+            'New Area ID'
+    """
+    abm_map = abm_map_sales.drop(columns=['net_sales'])
     
-    dfs_full.append(dfi.copy())
-      
-# concate all dataframes  
+    FIPS_abm_area_id = FIPS_abm[
+            ['New Area ID', 'abm']].copy().drop_duplicates().reset_index(drop=True)
 
-Sale_2012_2020_full = pd.concat(dfs_full).reset_index(drop=True)
+    abm_map_area_id = abm_map.merge(FIPS_abm_area_id, on=['abm'], how='left')
 
-Sale_2012_2020_full = Sale_2012_2020_full.rename(
-        columns={'SHIPPING_FIPS_CODE': 'fips',
-                 'SLS_LVL_2_ID': 'abm',
-                 'NET_SALES_QTY_TO_DATE': 'net_sales'})
+    abm_map_area_id_concat = pd.concat(
+            [abm_map_area_id, FIPS_abm[FIPS_abm['year'] > 2020]]).reset_index(drop=True)
     
-Sale_2012_2020_full = Sale_2012_2020_full[['year', 'abm', 'fips', 'net_sales']]
+    abm_map_no_dupes = first_row_by_year_fips(abm_map_area_id_concat)
+            
+    abm_map_no_dupes.loc[abm_map_no_dupes['abm'] == '9Z01', 'New Area ID'] = '9Z01'
+    abm_map_no_dupes.loc[abm_map_no_dupes['abm'] == 'UNK', 'New Area ID'] = 'UNK'
+
+    abm_map_no_dupes_dropped = abm_map_no_dupes.dropna()
+    
+    return abm_map_no_dupes_dropped
 
-abm_map_sales = pd.DataFrame()
 
-for year in Sale_2012_2020_full['year'].unique():
-    single_year = Sale_2012_2020_full[
-            Sale_2012_2020_full['year'] == year].reset_index(drop=True)
+def first_row_by_year_fips(df):
+    """Keeps the first row of each year and FIPS, ordered by year and then by
+    FIPS, each in the order they first appear. Rows with a missing year or
+    FIPS are left out.
     
-    for fips in single_year['fips'].unique():
-        single_year_fips = single_year[
-                single_year['fips'] == fips].reset_index(drop=True)
-        
-        single_year_fips_agg = single_year_fips.groupby(
-                by=['year', 'abm', 'fips'], as_index=False).sum()
-        
-        if len(single_year_fips_agg) > 1:
-            single_year_fips_agg = single_year_fips_agg.sort_values(
-                    by=['net_sales'], ascending=False).reset_index(drop=True)
-            single_year_fips_agg = single_year_fips_agg.head(1)
-        
-        if abm_map_sales.empty == True:
-            abm_map_sales = single_year_fips_agg.copy()
-        else:
-            abm_map_sales = pd.concat(
-                    [abm_map_sales, single_year_fips_agg]).reset_index(drop=True)
-            
-abm_map = abm_map_sales.drop(columns=['net_sales'])
+    Keyword arguments:
+        df -- the dataframe with year and fips columns
+    Returns:
+        df_ordered -- the first rows, in order of year and then FIPS
+    """
+    year_codes = pd.factorize(df['year'])[0]
+    
+    rows = ((df.duplicated(subset=['year', 'fips']) == False).values &
+            (year_codes != -1) & df['fips'].notna().values)
+    
+    # the rows of a year are already in the order their FIPS first appear
+    df_ordered = df[rows]
+    df_ordered = df_ordered.iloc[np.argsort(year_codes[rows], kind='stable')]
+    
+    return df_ordered.reset_index(drop=True)
 
-# import old mapping
-YEARLY_ABM_FIPS_MAP = 'abm_years_08_to_22.csv'
-FIPS_abm_Address = YEARLY_ABM_FIPS_MAP #DATA_DIR + 'abm_years.csv'
-FIPS_abm = pd.read_csv(FIPS_abm_Address)
 
-FIPS_abm_area_id = FIPS_abm[
-        ['New Area ID', 'abm']].copy().drop_duplicates().reset_index(drop=True)
+def majority_abm_map(Sale_full):
+    """Finds the abm with the most net sales in each year and FIPS, in one
+    groupby. Ties go to the first abm in sorted order.
+    
+    Keyword arguments:
+        Sale_full -- the dataframe of the sales rows, with year, abm, fips,
+            and net_sales
+    Returns:
+        abm_map_sales -- the majority abm and its net sales by year and FIPS,
+            in the order the years and FIPS first appear
+    """
+    Sale_full = Sale_full[['year', 'abm', 'fips', 'net_sales']]
+    
+    abm_sales = Sale_full.groupby(by=['year', 'abm', 'fips'], as_index=False).sum()
+    
+    # the groups are sorted by abm, a stable sort keeps the first abm of a tie
+    abm_sales = abm_sales.sort_values(by=['year', 'fips', 'net_sales'],
+                                      ascending=[True, True, False], kind='mergesort')
+    abm_sales = abm_sales.drop_duplicates(subset=['year', 'fips'])
+    
+    # order the years and FIPS as they first appear in the sales
+    year_fips = first_row_by_year_fips(Sale_full)[['year', 'fips']]
+    abm_map_sales = year_fips.merge(abm_sales, on=['year', 'fips'], how='inner')
+    
+    return abm_map_sales[['year', 'abm', 'fips', 'net_sales']]
 
-abm_map_area_id = abm_map.merge(FIPS_abm_area_id, on=['abm'], how='left')
 
-abm_map_area_id_concat = pd.concat(
-        [abm_map_area_id, FIPS_abm[FIPS_abm['year'] > 2020]]).reset_index(drop=True)
+def read_full_sales_year(year):
+    """Reads in one of the yearly sales files, keeping every national brand
+    soybean row.
+    
+    Keyword arguments:
+        year -- the year of the sales file
+    Returns:
+        dfi -- the sales rows for the year
+    """
+    print("Read ", str(year), " Sales Data")
+    dfi_path = DATA_DIR + SALES_DIR + str(year) + '.csv'
+    dfi = pd.read_csv(dfi_path)
+    
+    dfi = dfi[dfi['SPECIE_DESCR'] == 'SOYBEAN'].reset_index(drop=True)
+    dfi = dfi[dfi['BRAND_FAMILY_DESCR'] == 'NATIONAL'].reset_index(drop=True)
+    
+    # set a year parameter to be the year 
+    dfi['year'] = year
+    
+    dfi = dfi.rename(columns={'SHIPPING_FIPS_CODE': 'fips',
+                              'SLS_LVL_2_ID': 'abm',
+                              'NET_SALES_QTY_TO_DATE': 'net_sales'})
+    
+    return dfi[['year', 'abm', 'fips', 'net_sales']]
 
-abm_map_no_dupes = pd.DataFrame()
 
-for year in abm_map_area_id_concat['year'].unique():
-    single_year = abm_map_area_id_concat[
-            abm_map_area_id_concat['year'] == year].reset_index(drop=True)
+def update_majority_abm_map(abm_map_sales, Sale_new):
+    """Updates the majority abm map with new (or restated) sales years. The
+    majority abm of a year only depends on that year's sales, so only the new
+    years are grouped, replacing those years in the map.
+    
+    Keyword arguments:
+        abm_map_sales -- the majority abm map, as returned by majority_abm_map,
+            or None to build it from the new sales alone
+        Sale_new -- the sales rows of the new years
+    Returns:
+        abm_map_sales -- the updated map, in order of year
+    """
+    abm_map_new = majority_abm_map(Sale_new)
+    if abm_map_sales is None:
+        return abm_map_new
     
-    for fips in single_year['fips'].unique():
-        single_year_fips = single_year[
-                single_year['fips'] == fips].reset_index(drop=True)
+    abm_map_kept = abm_map_sales[
+            abm_map_sales['year'].isin(Sale_new['year'].unique()) == False]
+    abm_map_sales = pd.concat([abm_map_kept, abm_map_new])
+    
+    return abm_map_sales.sort_values(by=['year'], kind='mergesort').reset_index(drop=True)
+
+
+if __name__ == '__main__':
+    ###### --------------------- Read ABM & Teamkey Map  ------------------- ######
+    abm_Teamkey = read_abm_teamkey_file()
+
+    ###### ---------------------- Read Sales Data ------------------------ ######    
+    # the majority abms of the years read before are kept, so only the new
+    # years and REFRESH_YEARS are read from the FULL datasets, a file per year
+    abm_map_sales = None
+    new_years = SALES_YEARS
+    if os.path.exists(MAJORITY_MAP_PATH) == True:
+        abm_map_sales = pd.read_pickle(MAJORITY_MAP_PATH)
+        new_years = [year for year in SALES_YEARS
+                     if year not in set(abm_map_sales['year']) or year in REFRESH_YEARS]
+    
+    if len(new_years) > 0:
+        dfs_full = read_years(read_full_sales_year, new_years)
+        Sale_new = pd.concat(dfs_full).reset_index(drop=True)
         
-        if len(single_year_fips) > 1:
-            single_year_fips = single_year_fips.head(1)
-            
-        if abm_map_no_dupes.empty == True:
-            abm_map_no_dupes = single_year_fips.copy()
-        else:
-            abm_map_no_dupes = pd.concat(
-                    [abm_map_no_dupes, single_year_fips]).reset_index(drop=True)
-            
-abm_map_no_dupes.loc[abm_map_no_dupes['abm'] == '9Z01', 'New Area ID'] = '9Z01'
-abm_map_no_dupes.loc[abm_map_no_dupes['abm'] == 'UNK', 'New Area ID'] = 'UNK'
+        abm_map_sales = update_majority_abm_map(abm_map_sales, Sale_new)
+        abm_map_sales.to_pickle(MAJORITY_MAP_PATH)
+
+    # import old mapping
+    YEARLY_ABM_FIPS_MAP = 'abm_years_08_to_22.csv'
+    FIPS_abm_Address = YEARLY_ABM_FIPS_MAP #DATA_DIR + 'abm_years.csv'
+    FIPS_abm = pd.read_csv(FIPS_abm_Address)
 
-abm_map_no_dupes_dropped = abm_map_no_dupes.dropna()
+    abm_map_no_dupes_dropped = build_abm_fips_map(abm_map_sales, FIPS_abm)
 
-abm_map_no_dupes_dropped.to_csv('soybean_abm_fips_map.csv', index=False)
\ No newline at end of file
+    abm_map_no_dupes_dropped.to_csv('soybean_abm_fips_map.csv', index=False)
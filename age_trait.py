@@ -10,19 +10,20 @@ import numpy as np
 import pandas as pd
 import re
 
-from aggregation_config import (CF_2022_FILE, DATA_DIR, SALES_2021, SCM_DATA_DIR,
-                                SCM_DATA_FILE)
+from aggregation_config import (DATA_DIR)
+from data_catalog import (load_source)
+from intermediate_store import (write_intermediate)
 
 old_at = pd.read_csv('Age_Trait_2023_fixed.csv')
     
 # read in the traits and hybrids for 21 and 22
-sales_21 = pd.read_csv(DATA_DIR + SALES_2021)
+sales_21 = load_source('sales_2021', copy=False)
 sales_21 = sales_21[['VARIETY', 'Trait']].drop_duplicates().reset_index(drop=True)
 
-sales_22 = pd.read_csv(DATA_DIR + SCM_DATA_DIR + SCM_DATA_FILE)
+sales_22 = load_source('scm', copy=False)
 sales_22 = sales_22[['VARIETY', 'Trait']].drop_duplicates().reset_index(drop=True)
 
-CF_2022 = pd.read_excel(DATA_DIR + CF_2022_FILE)
+CF_2022 = load_source('cf_2022', copy=False)
 sales_23 = CF_2022[CF_2022['FORECAST_YEAR'] == 2022].reset_index(drop=True)
 sales_23 = sales_23[['ACRONYM_NAME', 'TEAM_Y1_FCST_1', 'TRAIT_NAME']]
 sales_23 = sales_23[
@@ -149,4 +150,4 @@ new_at = pd.concat([new_at, sales_22]).reset_index(drop=True)
 new_at = pd.concat([new_at, sales_23]).reset_index(drop=True)
 new_at = pd.concat([new_at, sales_24]).reset_index(drop=True)
 
-new_at.to_csv('Age_Trait_2024.csv', index=False)
\ No newline at end of file
+write_intermediate(new_at, 'Age_Trait_2024', csv_path='Age_Trait_2024.csv')
\ No newline at end of file
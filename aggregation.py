@@ -9,144 +9,454 @@ Created on Mon Jul 26 13:58:06 2021
 import pandas as pd 
 import numpy as np
 
-from import_files import (read_2022_CF_data, read_2023_CF_data, read_2024_CF_data,
-                          read_abm_teamkey_file,
+from aggregation_config import (BLIZZARD_DIR, CF_Y1_FILES, CM_DIR, DATA_DIR, H2H_DIR, H2H_YEARS,
+                                HISTORICAL_SRP, MEMORY_LEAN, PIPELINE_WORKERS, SALES_DIR,
+                                SALES_YEARS, SEASON_STORE, SRP_YEARS, TRAINING_DROP_COLUMNS,
+                                TRAIT_MAP_DROP_COLUMNS, WEATHER_YEARS)
+from import_files import (read_abm_teamkey_file,
                           read_commodity_corn_soybean, read_CY_CF_data, 
-                          read_kynetic_data, read_performance,
-                          read_sales_filepath, read_soybean_trait_map, read_SRP,
-                          read_state_county_fips, read_weather_filepath, supply_data)
-from merge import (merge_advantages, merge_cf_with_abm, merge_price_received)
+                          read_kynetic_data, read_performance, read_performance_year,
+                          read_sales_filepath, read_soybean_trait_map, read_SRP, read_SRP_year,
+                          read_state_county_fips, read_weather_grouped, read_weather_maps,
+                          read_weather_year_grouped, read_y1_CF_data, read_yearly_abm_map,
+                          read_yearly_sales, impute_supply, supply_table)
+from merge import (impute_price_rec, merge_advantages, merge_cf_with_abm, price_received_table)
 from preprocess import (amend_trait_features, clean_commodity, clean_performance,
-                        clean_state_county, clean_Weather, create_commodity_features,
+                        clean_state_county, create_commodity_features,
                         create_imputation_frames, create_lagged_features, create_portfolio_weights,
                         create_lagged_sales, flatten_monthly_weather, get_RM,
                         impute_CY_CF, impute_h2h_data, impute_price, impute_SRP,
-                        Performance_with_yield_adv, usda_acre_data, usda_yield_data)
-
-###### --------------------- Read ABM & Teamkey Map  ------------------- ######
-abm_Teamkey = read_abm_teamkey_file()
-
-###### ---------------------- Read Sales Data ------------------------ ######
-Sale_2012_2024 = read_sales_filepath(abm_Teamkey=abm_Teamkey)
-Sale_2012_2024_lagged = create_lagged_sales(Sale_2012_2024)
-
-Sale_all = get_RM(df=Sale_2012_2024_lagged)
-
-print("Sale's Structure: ", Sale_all.info())
-df_save_path = 'output/Sale_all.csv'
-Sale_all.to_csv(df_save_path, index = False)
-print("Check the fraction of missing values in Sales data: ", Sale_all.isna().sum())
-print("Sale's shape: ", Sale_all.shape)
-
-###### --------------------- Read Age & Trait Data -------------------- ######
-Age_Trait = pd.read_csv('Age_Trait_2024.csv')
-
-# set E3 to be XF WILL CHANGE LATER
-Age_Trait['trait'] = Age_Trait['trait'].where(Age_Trait['trait'] != 'E3', 'XF')
+                        Performance_with_yield_adv, usda_acre_table, usda_yield_table,
+                        weather_means)
+from data_catalog import (clear_catalog, source_path)
+from feature_assembly import assemble_features
+from intermediate_store import (intermediate_path, read_intermediate, write_intermediate)
+from instrumentation import (reset_run_report, track_step, write_run_report)
+from key_encoding import (KEY_COLUMNS, decode_keys, encode_keys)
+from memory_lean import (downcast_features, prune_feature_tables)
+from pipeline import (apply_config, prune_stages, run_stage_graph)
+from season_store import (load_partitions)
+
+def input_files(stage):
+    """Returns the files a stage reads, used to key the stage cache. The paths
+    are built when the stage graph runs so that config overrides of DATA_DIR
+    and friends are picked up.
+    
+    Keyword arguments:
+        stage -- the name of the stage
+    Returns:
+        files -- the list of file paths
+    """
+    if stage == 'abm_Teamkey':
+        return [source_path('abm_table')]
+    if stage == 'sales':
+        return (year_input_files('sales') +
+                [source_path('sales_2021'), source_path('sales_2022'),
+                 source_path('daily_fractions'),
+                 source_path('sales_2023_d1ms'),
+                 source_path('prod_list_24')])
+    if stage == 'age_trait':
+        return ['Age_Trait_2024.csv', intermediate_path('Age_Trait_2024')]
+    if stage == 'weather':
+        return year_input_files('weather')
+    if stage == 'commodity':
+        return [DATA_DIR + CM_DIR + 'corn_to_01242023.csv',
+                DATA_DIR + CM_DIR + 'soybean_to_01242023.csv']
+    if stage == 'performance':
+        return year_input_files('performance')
+    if stage == 'cf':
+        return ['CF_2016_2022.csv', intermediate_path('CF_2016_2022')] + year_input_files('cf')
+    if stage == 'srp':
+        return (year_input_files('srp') +
+                [DATA_DIR + HISTORICAL_SRP + str(year) + '_product_srp.csv' for year in range(21, 25)])
+    if stage == 'kynetic':
+        return [source_path('kynetic'), source_path('yearly_abm_fips_map')]
+    if stage == 'trait_map':
+        return [DATA_DIR + 'soybean_trait_map_xf.csv']
+    if stage == 'training_set':
+        return [source_path('yield_county'), DATA_DIR + 'corn_acres.csv',
+                DATA_DIR + 'soybean_acres.csv', source_path('abm_fips_map'),
+                source_path('yearly_abm_fips_map'), source_path('historical_supply'),
+                source_path('price_received'), source_path('corn_soy_acres'),
+                'net_sales_23_fcst.csv',
+                intermediate_path('net_sales_23_fcst')]
+    
+    return []
 
-Age_Trait['year'] = Age_Trait['year'].astype(dtype='str',copy=False)
-print("Check the fraction of missing values in Age & Trait data: ", Age_Trait.isna().sum())
-print("Age Trait's shape: ", Age_Trait.shape)
 
-###### -------- Read Weather & County Location & FIPS_abm Data --------- ######
-Weather_2012_2020, County_Location, FIPS_abm = read_weather_filepath()
-print("Weather's Structure: ", Weather_2012_2020.info())
-print("County_Location's Structure: ", County_Location.info())
-print("FIPS_abm's Structure: ", FIPS_abm.info())
+def year_input_files(stage, year=None):
+    """Returns the files one year of a year-partitioned stage is built from,
+    including the files every year shares, or the files of all the years.
+    
+    Keyword arguments:
+        stage -- 'sales', 'weather', 'performance', 'srp', or 'cf'
+        year -- the year, all of the stage's years if None
+    Returns:
+        files -- the list of file paths
+    """
+    STAGE_YEARS = {'sales': SALES_YEARS, 'weather': WEATHER_YEARS,
+                   'performance': H2H_YEARS, 'srp': SRP_YEARS, 'cf': list(CF_Y1_FILES)}
+    if year is None:
+        files = []
+        for stage_year in STAGE_YEARS[stage]:
+            files.extend(file for file in year_input_files(stage, stage_year) if file not in files)
+        return files
+    
+    if stage == 'sales':
+        return [DATA_DIR + SALES_DIR + str(year) + '.csv', source_path('abm_table')]
+    if stage == 'weather':
+        return [BLIZZARD_DIR + 'Blizzard_' + str(year) + '.csv',
+                BLIZZARD_DIR + 'county_locations.csv', source_path('yearly_abm_fips_map')]
+    if stage == 'performance':
+        return [DATA_DIR + H2H_DIR + 'Combined_H2H' + str(year) + '.csv',
+                'state-geocodes-v2018.xlsx', 'all-geocodes-v2018.xlsx',
+                source_path('yearly_abm_fips_map')]
+    if stage == 'srp':
+        return [DATA_DIR + HISTORICAL_SRP + str(year) + '_SRP.csv']
+    if stage == 'cf':
+        return [DATA_DIR + CF_Y1_FILES[year]]
+    
+    return []
 
-Weather = clean_Weather(Weather_2012_2020, County_Location, FIPS_abm) 
-print("Weather's Structure: ", Weather.info())
 
-Weather_Flattened = flatten_monthly_weather(Weather)
+def build_age_trait_data():
+    """Reads in the age/trait data.
+    
+    Keyword arguments:
+        None
+    Returns:
+        Age_Trait -- the age and trait of each product by year
+    """
+    Age_Trait = read_intermediate('Age_Trait_2024', csv_path='Age_Trait_2024.csv',
+                                  dtype={'year': str})
+    
+    # set E3 to be XF WILL CHANGE LATER
+    Age_Trait['trait'] = Age_Trait['trait'].where(Age_Trait['trait'] != 'E3', 'XF')
+    
+    Age_Trait['year'] = Age_Trait['year'].astype(dtype='str',copy=False)
+    print("Check the fraction of missing values in Age & Trait data: ", Age_Trait.isna().sum())
+    print("Age Trait's shape: ", Age_Trait.shape)
+    
+    return Age_Trait
 
-df_save_path = 'Flattened_Weather_abm_fips.csv'
-Weather_Flattened.to_csv(df_save_path, index = False)
-print("Flattened Weather's Structure: ", Weather_Flattened.info())
-print("Check the fraction of missing value in weather data: ", Weather_Flattened.isnull().sum())
-print("Flattened Weather's shape: ", Weather_Flattened.shape)
 
-###### ------------------- Read Commodity Price Data ------------------ ######
-Commodity_Corn, Commodity_Soybean = read_commodity_corn_soybean()
+def build_cf_data(abm_Teamkey):
+    """Reads in the consensus forecast data for 2016 to 2024 and aggregates it
+    to the abm level.
+    
+    Keyword arguments:
+        abm_Teamkey -- the team key to abm converter
+    Returns:
+        CF_abm -- the consensus forecast by year, product, and abm
+    """
+    CF_2016_2021 = read_intermediate('CF_2016_2022', csv_path='CF_2016_2022.csv')
+    
+    # drop 2021 data (it's in error, and add +1 to all years)
+    CF_2016_2021 = CF_2016_2021[CF_2016_2021['year'] != 2021].reset_index(drop=True)
+    CF_2016_2021['year'] = CF_2016_2021['year'] + 1
+    
+    # add the y + 1 forecasts of 2022 on
+    if SEASON_STORE == True:
+        CF_y1 = load_partitions('cf', read_y1_CF_data,
+                                {year: year_input_files('cf', year) for year in sorted(CF_Y1_FILES)},
+                                config=STAGES['cf']['config'])
+    else:
+        CF_y1 = pd.concat([read_y1_CF_data(year=year) for year in sorted(CF_Y1_FILES)])
+    CF_2016_2024 = pd.concat([CF_2016_2021, CF_y1])
+    
+    CF_2016_2024['year'] = CF_2016_2024['year'].astype(int).astype(str)
+    
+    # drop missing value 
+    CF_2016_2024 = CF_2016_2024.dropna(how='any')
+    
+    CF_abm = merge_cf_with_abm(CF_2016_2024, abm_Teamkey)
+    CF_abm['year'] = CF_abm['year'].astype(dtype='str', copy=False)
+    
+    # aggregate to get rid of 0 weirdness
+    CF_abm = CF_abm.groupby(
+            by=['year', 'Variety_Name', 'abm'], as_index=False).sum().reset_index(drop=True)
+    
+    return CF_abm
 
-Commodity_Corn_Soybean = clean_commodity(Commodity_Corn, Commodity_Soybean)
 
-CM_Soybean = create_commodity_features(Commodity_Corn_Soybean, 'soybean')
-CM_Corn = create_commodity_features(Commodity_Corn_Soybean, 'corn')
+def build_commodity_data():
+    """Reads in the corn and soybean commodity prices and creates the lagged
+    commodity features.
+    
+    Keyword arguments:
+        None
+    Returns:
+        CM_lagged -- the commodity features by year
+    """
+    Commodity_Corn, Commodity_Soybean = read_commodity_corn_soybean()
+    
+    Commodity_Corn_Soybean = clean_commodity(Commodity_Corn, Commodity_Soybean)
+    
+    CM_Soybean = create_commodity_features(Commodity_Corn_Soybean, 'soybean')
+    CM_Corn = create_commodity_features(Commodity_Corn_Soybean, 'corn')
+    
+    # concatenate crops together
+    CM_Soybean_Corn = CM_Soybean.merge(CM_Corn, on=['year'])
+    
+    CM_lagged = create_lagged_features(CM_Soybean_Corn)
+    df_save_path = 'CM_Soybean_Corn_Lagged.csv'
+    write_intermediate(CM_lagged, 'CM_Soybean_Corn_Lagged', csv_path=df_save_path)
+    print("Flattened Commodity_Price's Structure: ", CM_lagged.shape)
+    
+    return CM_lagged
 
-# concatenate crops together
-CM_Soybean_Corn = CM_Soybean.merge(CM_Corn, on=['year'])
 
-CM_lagged = create_lagged_features(CM_Soybean_Corn)
-df_save_path = 'CM_Soybean_Corn_Lagged.csv'
-CM_lagged.to_csv(df_save_path, index = False)
-print("Flattened Commodity_Price's Structure: ", CM_lagged.shape)
+def build_performance_data():
+    """Reads in the H2H performance data and creates the yield advantage
+    features by year, abm, and hybrid.
+    
+    Keyword arguments:
+        None
+    Returns:
+        Performance_adv -- the yield advantage features
+    """
+    ## State_County fips Files 
+    State_fips, County_fips = read_state_county_fips()
+    FIPS_abm = read_yearly_abm_map()
+    
+    State_County_abm = clean_state_county(State_fips, County_fips, FIPS_abm)
+    df_save_path = 'State_County_abm.csv'
+    write_intermediate(State_County_abm, 'State_County_abm', csv_path=df_save_path)
+    
+    # the yield advantages only compare products within a year, so each year
+    # can be kept in the season store on its own
+    if SEASON_STORE == True:
+        Performance_adv = load_partitions('performance', build_performance_year,
+                                          {year: year_input_files('performance', year)
+                                           for year in H2H_YEARS},
+                                          config=STAGES['performance']['config'],
+                                          State_County_abm=State_County_abm)
+    else:
+        Performance_2011_2019 = read_performance()
+        
+        # Get abm level using fips
+        Performance_abm = Performance_2011_2019.merge(State_County_abm, how = 'left', on = ['state', 'county'])   
+        Performance_yield_adv = Performance_with_yield_adv(Performance_abm)    
+        Performance_adv = merge_advantages(Performance_yield_adv)
+        
+        Performance_adv = clean_performance(Performance_adv)
+    df_save_path = 'Performance_adv.csv'
+    write_intermediate(Performance_adv, 'Performance_adv', csv_path=df_save_path)
+    
+    return Performance_adv
 
-###### --------------------- Read Performance Data --------------------- ######
-## State_County fips Files 
-Performance_2011_2019 = read_performance()
 
-State_fips, County_fips = read_state_county_fips()
+def build_performance_year(year, State_County_abm):
+    """Reads in one year of the H2H performance data and creates its yield
+    advantage features.
+    
+    Keyword arguments:
+        year -- the year of the H2H file
+        State_County_abm -- the state/county to fips and abm map
+    Returns:
+        Performance_adv -- the yield advantage features for the next year
+    """
+    Performance_abm = read_performance_year(year=year).merge(State_County_abm, how='left',
+                                                             on=['state', 'county'])
+    Performance_yield_adv = Performance_with_yield_adv(Performance_abm)
+    Performance_adv = merge_advantages(Performance_yield_adv)
+    
+    Performance_adv = clean_performance(Performance_adv)
+    
+    return Performance_adv
 
-State_County_abm = clean_state_county(State_fips, County_fips, FIPS_abm)
-df_save_path = 'State_County_abm.csv'
-State_County_abm.to_csv(df_save_path, index = False)
 
-# Get abm level using fips
-## H2H Files
-###### ---------------- Read Consensus Forecasting Data ---------------- ######
-CF_2016_2021 = pd.read_csv('CF_2016_2022.csv')
+def build_sales_data(abm_Teamkey):
+    """Reads in the sales data, adds the lagged sales features and the
+    relative maturity.
+    
+    Keyword arguments:
+        abm_Teamkey -- the team key to abm converter
+    Returns:
+        Sale_all -- the sales data by year, product, and abm
+    """
+    # the yearly files only change when they're restated, so the season store
+    # keeps each year's aggregate. the later years and the lagged features
+    # are built from the stored years every time
+    yearly_sales = None
+    if SEASON_STORE == True:
+        yearly_sales = load_partitions('sales', read_yearly_sales,
+                                       {year: year_input_files('sales', year) for year in SALES_YEARS},
+                                       config=STAGES['sales']['config'],
+                                       abm_Teamkey=abm_Teamkey)
+    
+    Sale_2012_2024 = read_sales_filepath(abm_Teamkey=abm_Teamkey, yearly_sales=yearly_sales)
+    Sale_2012_2024_lagged = create_lagged_sales(Sale_2012_2024)
+    
+    Sale_all = get_RM(df=Sale_2012_2024_lagged)
+    
+    df_save_path = 'output/Sale_all.csv'
+    write_intermediate(Sale_all, 'Sale_all', csv_path=df_save_path)
+    print("Check the fraction of missing values in Sales data: ", Sale_all.isna().sum())
+    print("Sale's shape: ", Sale_all.shape)
+    
+    return Sale_all
 
-# drop 2021 data (it's in error, and add +1 to all years)
-CF_2016_2021 = CF_2016_2021[CF_2016_2021['year'] != 2021].reset_index(drop=True)
-CF_2016_2021['year'] = CF_2016_2021['year'] + 1
 
-CF_2022 = read_2022_CF_data()
-CF_2023 = read_2023_CF_data()
-CF_2024 = read_2024_CF_data()
-CF_2016_2022 = pd.concat([CF_2016_2021, CF_2022])
-CF_2016_2023 = pd.concat([CF_2016_2022, CF_2023])
-CF_2016_2024 = pd.concat([CF_2016_2023, CF_2024])
+def build_srp_data():
+    """Reads in the SRP data.
+    
+    Keyword arguments:
+        None
+    Returns:
+        SRP_2011_2024 -- the SRP by year and product
+    """
+    yearly_SRP = None
+    if SEASON_STORE == True:
+        yearly_SRP = load_partitions('srp', read_SRP_year,
+                                     {year: year_input_files('srp', year) for year in SRP_YEARS},
+                                     config=STAGES['srp']['config'])
+    
+    SRP_2011_2024 = read_SRP(yearly_SRP=yearly_SRP)
+    
+    return SRP_2011_2024
 
-#CF_2016_2022 = read_concensus_forecasting()
-# get the current year data and merge it
 
+def build_weather_data():
+    """Reads in the Blizzard data, aggregates it to the abm level, and
+    flattens it so each month gets a column.
+    
+    Keyword arguments:
+        None
+    Returns:
+        Weather_Flattened -- the flattened weather features by year and abm
+    """
+    County_Grid, FIPS_abm_lookup = read_weather_maps()
+    
+    # the abm weather only depends on the year's own Blizzard data, so each
+    # year can be kept in the season store on its own
+    if SEASON_STORE == True:
+        Weather_Flattened = load_partitions('weather', build_weather_year,
+                                            {year: year_input_files('weather', year)
+                                             for year in WEATHER_YEARS},
+                                            config=STAGES['weather']['config'],
+                                            County_Grid=County_Grid,
+                                            FIPS_abm_lookup=FIPS_abm_lookup)
+    else:
+        # the Blizzard rows are summed by year, month, and abm as they're read
+        Weather = weather_means(read_weather_grouped(WEATHER_YEARS, County_Grid,
+                                                     FIPS_abm_lookup))
+        
+        Weather_Flattened = flatten_monthly_weather(Weather)
+    
+    df_save_path = 'Flattened_Weather_abm_fips.csv'
+    write_intermediate(Weather_Flattened, 'Flattened_Weather_abm_fips', csv_path=df_save_path)
+    print("Check the fraction of missing value in weather data: ", Weather_Flattened.isnull().sum())
+    print("Flattened Weather's shape: ", Weather_Flattened.shape)
+    
+    return Weather_Flattened
 
-CF_2016_2024['year'] = CF_2016_2024['year'].astype(int).astype(str)
 
-# drop missing value 
-CF_2016_2024 = CF_2016_2024.dropna(how='any')
+def build_weather_year(year, County_Grid, FIPS_abm_lookup):
+    """Reads in one year of the Blizzard data, aggregates it to the abm level,
+    and flattens it so each month gets a column.
+    
+    Keyword arguments:
+        year -- the year of the Blizzard file
+        County_Grid -- the grid index of the fips codes by lat and long
+        FIPS_abm_lookup -- the compiled lookup of abm by fips and year
+    Returns:
+        Weather_Flattened -- the flattened weather features for the year
+    """
+    Weather = weather_means(read_weather_year_grouped(year, County_Grid, FIPS_abm_lookup))
+    
+    Weather_Flattened = flatten_monthly_weather(Weather)
+    
+    return Weather_Flattened
 
-#print("Concensus Forecasting data's Structure: ", CF_2016_2022.info())
-#print("Checking the fraction of missing value: ", CF_2016_2022.isna().sum()/CF_2016_2022.shape[0])
-df_save_path = 'CF_2016_2023.csv'
 
-#CF_2016_2022.to_csv(df_save_path, index = False)
-CF_abm = merge_cf_with_abm(CF_2016_2024, abm_Teamkey)
-CF_abm['year'] = CF_abm['year'].astype(dtype='str', copy=False)
+def build_training_set(config=None, stages=None, n_workers=PIPELINE_WORKERS):
+    """Builds the training data set, or a subset of the pipeline outputs.
+    Nothing is read until this is called, and only the stages needed for the
+    requested outputs run, e.g. stages=['weather'] only reads the Blizzard data.
+    
+    Keyword arguments:
+        config -- a dictionary of aggregation_config constants to override for
+            this run, e.g. {'DATA_DIR': '/data/'}
+        stages -- the names of the STAGES whose outputs are wanted, None for
+            the full training set
+        n_workers -- the number of worker processes running stages
+    Returns:
+        output -- the training set dataframe if stages is None, otherwise a
+            dictionary of stage name to stage output
+    
+    The time, CPU time, memory, and shapes of each stage and merge step are
+    written to RUN_REPORT_PATH.
+    """
+    if config is None:
+        config = {}
+    
+    targets = ['training_set'] if stages is None else list(stages)
+    
+    previous = apply_config(config)
+    try:
+        reset_run_report()
+        clear_catalog()
+        outputs = run_stage_graph(prune_stages(STAGES, targets), n_workers=n_workers,
+                                  config=config, input_files=input_files)
+        write_run_report()
+    finally:
+        clear_catalog()
+        apply_config(previous)
+    
+    if stages is None:
+        return outputs['training_set']
+    
+    return {name: outputs[name] for name in targets}
 
-# aggregate to get rid of 0 weirdness
-CF_abm = CF_abm.groupby(
-        by=['year', 'Variety_Name', 'abm'], as_index=False).sum().reset_index(drop=True)
 
-###### --------------------------- Read trait map  ------------------------- ######
-trait_map = read_soybean_trait_map()
-SRP_2011_2024 = read_SRP()
+def refresh_season(years, config=None, n_workers=PIPELINE_WORKERS):
+    """Builds the training data set from the season store, e.g. after adding
+    a season's files (and its year to SALES_YEARS, WEATHER_YEARS, etc.).
+    The given years are processed again, as is any year whose files changed;
+    every other year of the yearly sales, weather, performance, SRP, and
+    consensus forecast data is read back from the store. The lagged features
+    and the merges are then rebuilt from the stored years.
+    
+    Keyword arguments:
+        years -- the years to process again even if their files haven't changed
+        config -- a dictionary of other aggregation_config constants to override
+        n_workers -- the number of worker processes running stages
+    Returns:
+        Final_df_acreage -- the training data set
+    """
+    season_config = dict(config or {})
+    season_config.update({'SEASON_STORE': True, 'REFRESH_YEARS': list(years)})
+    
+    return build_training_set(config=season_config, n_workers=n_workers)
 
-##### ---------------------------- Read Kynetic Data ---------------------######
-kynetic_data = read_kynetic_data()
 
 ###### ----------------------- Merge All Datasets ---------------------- ######
-def merge_all():
+def merge_all(Sale_all, Age_Trait, Weather_Flattened, CM_lagged, Performance_adv,
+              CF_abm, kynetic_data, SRP_2011_2024):
     """ Reads in and returns the final combined dataframe.
     
     Keyword arguments:
-        None
+        Sale_all -- the sales data with lagged features and RM
+        Age_Trait -- the age/trait data
+        Weather_Flattened -- the flattened weather features
+        CM_lagged -- the lagged commodity features
+        Performance_adv -- the yield advantage features
+        CF_abm -- the consensus forecast data at the abm level
+        kynetic_data -- the kynetic data at the abm level
+        SRP_2011_2024 -- the SRP data
     Returns:
         Sale_HP_trait_weather_CM_Performance_CF -- the dataframe of sales, 
                                                     hot products, trait/age, 
                                                     weather, commoidty price, 
                                                     concensus forecasting data
     """
+    # join on integer year/abm/product codes rather than strings, the keys are
+    # decoded again before anything leaves merge_all
+    Sale_all, Age_Trait, Weather_Flattened, CM_lagged, CF_abm, kynetic_data, SRP_2011_2024 = [
+            encode_keys(df) for df in [Sale_all, Age_Trait, Weather_Flattened, CM_lagged, CF_abm,
+                                       kynetic_data, SRP_2011_2024]]
+    
     # ## Merge Sale with HP
     # print("Step 1: Merge Sale_2012_2019 with Hot Products......")
     # Sale_HP = Sale_2012_2019_lagged.merge(Hot_Products, how = 'left', on = ['year', 'Variety_Name'])
@@ -154,195 +464,231 @@ def merge_all():
     # print("Step 1: Sale_HP's shape: ", Sale_HP.shape)
     # print("..................")
     
-    ## Merge Sale_HP with age_trait 
-    print("Step 2: Merge Sale_HP with Age_Trait......")
-    Sale_HP_trait = Sale_all.merge(Age_Trait, how = 'left', on = ['year', 'Variety_Name'])
-    if 'Unnamed: 18' in Sale_HP_trait.columns:
-        print('point 1')
-        
-    #print("Step 2: Sale_HP_trait's structure: ", Sale_HP_trait.info())
-    print("Step 2: Sale_HP_trait's shape: ", Sale_HP_trait.shape)
+    # rename hybrid columns and drop the trait columns of the performance data
+    product_abm_level, trait_abm_year_level, abm_year_level, year_level = [
+            encode_keys(df) for df in create_imputation_frames(df=Performance_adv)]
+    Performance_adv1 = Performance_adv.rename(columns = {'hybrid': 'Variety_Name'})
+    Performance_adv1 = Performance_adv1.drop(columns=['trait'])
+    Performance_adv1 = encode_keys(Performance_adv1)
+    
+    # in the memory-lean mode, downcast the sales quantities and the weather,
+    # commodity, and yield advantage features (and the frames the yield
+    # advantages are imputed from, so the imputed values keep the smaller type)
+    if MEMORY_LEAN == True:
+        Sale_all, Weather_Flattened, CM_lagged, Performance_adv1 = [
+                downcast_features(df, skip_columns=KEY_COLUMNS)
+                for df in [Sale_all, Weather_Flattened, CM_lagged, Performance_adv1]]
+        product_abm_level, trait_abm_year_level, abm_year_level, year_level = [
+                downcast_features(df, skip_columns=KEY_COLUMNS)
+                for df in [product_abm_level, trait_abm_year_level, abm_year_level, year_level]]
+    
+    ## Add age/trait, weather, commodity, performance, CF, kynetic, and SRP data
+    ## to the sales in one pass rather than one merge at a time
+    print("Steps 2-7: Assemble Sale_all with Age_Trait, Weather_flattened, CM_lagged, Performance, CF, kynetic data, and SRP......")
+    performance_tables = [(Age_Trait, ['year', 'Variety_Name']),
+                          (Weather_Flattened, ['year', 'abm']),
+                          (CM_lagged, ['year']),
+                          (Performance_adv1, ['year', 'abm', 'Variety_Name'])]
+    later_tables = [(CF_abm, ['year', 'Variety_Name', 'abm']),
+                    (kynetic_data, ['year', 'Variety_Name', 'abm']),
+                    (SRP_2011_2024, ['year', 'Variety_Name'])]
+    if MEMORY_LEAN == True:
+        performance_tables, later_tables = [
+                prune_feature_tables(tables, TRAINING_DROP_COLUMNS + TRAIT_MAP_DROP_COLUMNS)
+                for tables in [performance_tables, later_tables]]
+    feature_tables = performance_tables + later_tables
+    with track_step('Steps 2-7: assemble_features', inputs=[Sale_all] + [table for table, _ in feature_tables],
+                    kind='merge') as step:
+        Sale_HP_trait_weather_CM_Performance_CF_SRP = assemble_features(Sale_all, feature_tables)
+        step['output'] = Sale_HP_trait_weather_CM_Performance_CF_SRP
+    print("Steps 2-7: Sale_HP_trait_weather_CM_Performance_CF_SRP's shape: ", Sale_HP_trait_weather_CM_Performance_CF_SRP.shape)
     print("..................")
     
     # impute lagged sales for age one products
     #
     #Sale_HP_trait = impute_age_one_lagged(df=Sale_HP_trait)
     
-    
-    ## Merge Sale_HP_trait with weather_flattened
-    print("Step 3: Merge Sale_HP_trait with Weather_flattened......")
-    Sale_HP_trait_weather = Sale_HP_trait.merge(Weather_Flattened, how = 'left', on = ['year', 'abm'])
-    if 'Unnamed: 18' in Sale_HP_trait_weather.columns:
-        print('point 2')
-    #print("Step 3: Sale_HP_trait_weather's structure: ", Sale_HP_trait_weather.info())
-    print("Step 3: Sale_HP_trait_weather's shape: ", Sale_HP_trait_weather.shape)
-    print("..................")
-    
-    ## Merge Sale_HP_trait_weather with CM_Soybean_Corn
-    print("Step 4: Merge Sale_HP_trait with CM_lagged_soybean_corn......")
-    Sale_HP_trait_weather_CM = Sale_HP_trait_weather.merge(CM_lagged, how = 'left', on = ['year'])
-    if 'Unnamed: 18' in Sale_HP_trait_weather_CM.columns:
-        print('point 3')
-    print("Step 4: Sale_HP_trait_weather_CM's shape: ", Sale_HP_trait_weather_CM.shape)
-    print("..................")
-    
-    
-    ## Merge Sale_HP_trait_weather_CM with the Performance
-    print("Step 5: Merge Sale_HP_trait_weather_CM with Performance......")
-
-    Performance_abm = Performance_2011_2019.merge(State_County_abm, how = 'left', on = ['state', 'county'])   
-    Performance_yield_adv = Performance_with_yield_adv(Performance_abm)    
-    Performance_adv = merge_advantages(Performance_yield_adv)
-    
-    Performance_adv = clean_performance(Performance_adv)
-    df_save_path = 'Performance_adv.csv'
-    Performance_adv.to_csv(df_save_path, index = False)
-    
-    product_abm_level, trait_abm_year_level, abm_year_level, year_level = create_imputation_frames(
-                df=Performance_adv)
-    # rename hybrid columns
-    Performance_adv1 = Performance_adv.rename(columns = {'hybrid': 'Variety_Name'})
-    # drop trait columns
-    Performance_adv1 = Performance_adv1.drop(columns=['trait'])
-    Performance_adv1['year'] = Performance_adv1['year'].astype(str)
-    
-    Sale_HP_trait_weather_CM_Performance = Sale_HP_trait_weather_CM.merge(Performance_adv1,
-                                        on=['year', 'abm', 'Variety_Name'],
-                                        how='left')
-    if 'Unnamed: 18' in Sale_HP_trait_weather_CM_Performance.columns:
-        print('point 4')
     # impute the missing value 
-    Sale_HP_trait_weather_CM_Performance = impute_h2h_data(Sale_HP_trait_weather_CM_Performance, 
-                                                            product_abm_level, trait_abm_year_level,
-                                                            abm_year_level, year_level)
-    if 'Unnamed: 18' in Sale_HP_trait_weather_CM_Performance.columns:
-        print('point 5')
+    with track_step('Step 5: impute_h2h_data', inputs=[Sale_HP_trait_weather_CM_Performance_CF_SRP],
+                    kind='impute') as step:
+        Sale_HP_trait_weather_CM_Performance_CF_SRP = impute_h2h_data(Sale_HP_trait_weather_CM_Performance_CF_SRP, 
+                                                                      product_abm_level, trait_abm_year_level,
+                                                                      abm_year_level, year_level)
+        step['output'] = Sale_HP_trait_weather_CM_Performance_CF_SRP
     
     # replace any blank trait values with "Conventional"
-    Sale_HP_trait_weather_CM_Performance['trait'] = Sale_HP_trait_weather_CM_Performance['trait'].fillna('Conventional')
-    print("Step 5: Sale_HP_trait_weather_CM's shape: ", Sale_HP_trait_weather_CM_Performance.shape)
-    print("..................")
+    Sale_HP_trait_weather_CM_Performance_CF_SRP['trait'] = Sale_HP_trait_weather_CM_Performance_CF_SRP['trait'].fillna('Conventional')
     
+    # the performance intermediate doesn't have the CF, kynetic, or SRP columns
+    later_columns = [column for table, keys in later_tables for column in table.columns
+                     if column not in keys]
     df_save_path = 'Sale_HP_trait_weather_CM_Performance.csv'
-    Sale_HP_trait_weather_CM_Performance.to_csv(df_save_path, index = False)
-    
-    ## Merge Sale_HP_trait_weather_CM_Performance with Concensus Forecasting
-    print("Step 6: Merge Sale_HP_trait_weather_CM with CF and kynetic data......")
-    Sale_HP_trait_weather_CM_Performance_CF = Sale_HP_trait_weather_CM_Performance.merge(
-            CF_abm, how = 'left', on = ['year','Variety_Name','abm'])
-    if 'Unnamed: 18' in Sale_HP_trait_weather_CM_Performance_CF.columns:
-        print('point 6')
-    Sale_HP_trait_weather_CM_Performance_CF = Sale_HP_trait_weather_CM_Performance_CF.merge(
-            kynetic_data, how='left', on=['year', 'Variety_Name', 'abm'])
-    if 'Unnamed: 18' in Sale_HP_trait_weather_CM_Performance_CF.columns:
-        print('point 7')
-    print("Step 6: Sale_HP_trait_weather_CM's shape: ", Sale_HP_trait_weather_CM_Performance_CF.shape)
-    print("..................")
+    write_intermediate(decode_keys(Sale_HP_trait_weather_CM_Performance_CF_SRP.drop(columns=later_columns)),
+                       'Sale_HP_trait_weather_CM_Performance', csv_path=df_save_path)
     
     print("Checking the portion of missing value in the combined dataset: ")
-    print(Sale_HP_trait_weather_CM_Performance_CF.isna().sum()/Sale_HP_trait_weather_CM_Performance_CF.shape[0])
-    Sale_HP_trait_weather_CM_Performance_CF['TEAM_Y1_FCST_1'] = Sale_HP_trait_weather_CM_Performance_CF['TEAM_Y1_FCST_1'].fillna(0)
+    print(Sale_HP_trait_weather_CM_Performance_CF_SRP.isna().sum()/Sale_HP_trait_weather_CM_Performance_CF_SRP.shape[0])
+    Sale_HP_trait_weather_CM_Performance_CF_SRP['TEAM_Y1_FCST_1'] = Sale_HP_trait_weather_CM_Performance_CF_SRP['TEAM_Y1_FCST_1'].fillna(0)
     
-    print("Step 7: Merge Sale_HP_trait_weather_CM_CF with SRP......")
-    Sale_HP_trait_weather_CM_Performance_CF_SRP = Sale_HP_trait_weather_CM_Performance_CF.merge(SRP_2011_2023, how = 'left', on = ['year', 'Variety_Name'])
-    if 'Unnamed: 18' in Sale_HP_trait_weather_CM_Performance_CF_SRP.columns:
-        print('point 8')
     # impute the missing value
-    Sale_HP_trait_weather_CM_Performance_CF_SRP = impute_SRP(Sale_HP_trait_weather_CM_Performance_CF_SRP)
-    
-    if 'Unnamed: 18' in Sale_HP_trait_weather_CM_Performance_CF_SRP.columns:
-        print('point 9')
+    with track_step('Step 7: impute_SRP', inputs=[Sale_HP_trait_weather_CM_Performance_CF_SRP],
+                    kind='impute') as step:
+        Sale_HP_trait_weather_CM_Performance_CF_SRP = impute_SRP(Sale_HP_trait_weather_CM_Performance_CF_SRP)
+        step['output'] = Sale_HP_trait_weather_CM_Performance_CF_SRP
     
     # impute missing price values as well
-    Sale_HP_trait_weather_CM_Performance_CF_SRP = impute_price(Sale_HP_trait_weather_CM_Performance_CF_SRP)
-    
-    if 'Unnamed: 18' in Sale_HP_trait_weather_CM_Performance_CF_SRP.columns:
-        print('point 10')
+    with track_step('Step 7: impute_price', inputs=[Sale_HP_trait_weather_CM_Performance_CF_SRP],
+                    kind='impute') as step:
+        Sale_HP_trait_weather_CM_Performance_CF_SRP = impute_price(Sale_HP_trait_weather_CM_Performance_CF_SRP)
+        step['output'] = Sale_HP_trait_weather_CM_Performance_CF_SRP
     
     print("Step 7: Sale_HP_trait_weather_CM_SRP's shape: ", Sale_HP_trait_weather_CM_Performance_CF_SRP.shape)
     print("..................")
     
+    Sale_HP_trait_weather_CM_Performance_CF_SRP = decode_keys(Sale_HP_trait_weather_CM_Performance_CF_SRP)
+    
     print("Saving Files.........")
     df_save_path = 'Sale_HP_trait_weather_CM_Performance_CF_SRP.csv'
-    Sale_HP_trait_weather_CM_Performance_CF_SRP.to_csv(df_save_path, index = False)
-
-    return Sale_HP_trait_weather_CM_Performance_CF_SRP, Sale_HP_trait_weather
-
-Sale_HP_trait_weather_CM_Performance_CF_SRP, Sale_HP_trait_weather = merge_all()
-
-# encoding trait
-print("Step 8: Encoding trait")
-Final_df = Sale_HP_trait_weather_CM_Performance_CF_SRP.merge(trait_map,
-                                                             how='left',
-                                                             on=['trait']) 
-
-
-# add county yield data
-sales_w_county_yield = usda_yield_data(df=Final_df)
-
-# add the USDA acreage data
-sales_w_corn_acreage = usda_acre_data(df=sales_w_county_yield, crop='corn')
-sales_w_soybean_acreage = usda_acre_data(df=sales_w_corn_acreage, crop='soybean')
+    write_intermediate(Sale_HP_trait_weather_CM_Performance_CF_SRP, 'Sale_HP_trait_weather_CM_Performance_CF_SRP', csv_path=df_save_path)
 
-sales_w_soybean_acreage = sales_w_soybean_acreage.replace(-np.inf, 0)
-sales_w_soybean_acreage = sales_w_soybean_acreage.replace(np.inf, 0)
-sales_w_soybean_acreage = sales_w_soybean_acreage.fillna(0)
-sales_w_soybean_acreage.loc[sales_w_soybean_acreage['age'] == 0, 'age'] = 1
+    return Sale_HP_trait_weather_CM_Performance_CF_SRP
 
-Final_df_acreage = sales_w_soybean_acreage.copy()#drop(columns = ['trait'])
 
-# drop any UNKNOWNs
-Final_df_acreage = Final_df_acreage.rename(columns={'Variety_Name': 'hybrid'})
-Final_df_acreage = Final_df_acreage[
-        Final_df_acreage['hybrid'] != 'UNKNOWN'].reset_index(drop=True)
-Final_df_acreage = Final_df_acreage[
-        Final_df_acreage['abm'] != 'UNK'].reset_index(drop=True)
-
-# set the 'pred_price' feature to be the price feature
-Final_df_acreage['pred_price'] = Final_df_acreage['price'].copy()
-
-# get the avai_supply_region
-Final_df_acreage = supply_data(df=Final_df_acreage)
-
-# get the price_rec data
-Final_df_acreage = merge_price_received(df=Final_df_acreage)
+def build_training_data(Sale_HP_trait_weather_CM_Performance_CF_SRP, trait_map):
+    """Adds the trait encoding, USDA, supply, and price received data to the
+    merged dataframe and writes out the training data set.
     
-# edit trait columns
-Final_df_acreage = amend_trait_features(df=Final_df_acreage)
-
-# create the product weights
-weights_matrix = create_portfolio_weights(df=Final_df_acreage)
-
-# drop any columns we aren't interested in
-Final_df_acreage = Final_df_acreage.drop(
-        columns=['discount', 'Unnamed: 18', 'county_yield', 'avg_yield', 'corn_acres',
-                 'avg_corn_acres', 'soybean_acres', 'avg_soybean_acres'])
-
-
-df_save_path = 'training_data_set_2024_feb28.csv'
-
-Final_df_acreage = Final_df_acreage.drop_duplicates()
-
-# set the 2023 nets_Q_eoy to be the forecast from soy success
-net_sales_23_fcst = pd.read_csv('net_sales_23_fcst.csv')
-net_sales_23_fcst['year'] = net_sales_23_fcst['year'].astype(str)
-
-Final_df_acreage = Final_df_acreage.merge(net_sales_23_fcst,
-                                          on=['year', 'hybrid', 'abm'],
-                                          how='left')
-
-Final_df_acreage.loc[
-        Final_df_acreage['year'] == '2023', 'nets_Q_eoy'] =  Final_df_acreage.loc[
-                Final_df_acreage['year'] == '2023', 'loc'].values
-
-Final_df_acreage['nets_Q'] = Final_df_acreage['nets_Q_eoy'].values
-Final_df_acreage = Final_df_acreage.drop(columns=['nets_Q_eoy', 'loc'])
-
-Final_df_acreage = Final_df_acreage.fillna(0)
-
-Final_df_acreage.to_csv(df_save_path, index = False)
-Final_df_acreage.isna().sum()
-
-Final_df_acreage.isna().sum().sum()
-
-Final_df_acreage
\ No newline at end of file
+    Keyword arguments:
+        Sale_HP_trait_weather_CM_Performance_CF_SRP -- the output of merge_all
+        trait_map -- the trait map for encoding
+    Returns:
+        Final_df_acreage -- the training data set
+    """
+    # encoding trait and adding the county yield and USDA acreage data
+    print("Step 8: Encoding trait")
+    usda_tables = [(trait_map, ['trait']),
+                   (usda_yield_table(), ['year', 'abm']),
+                   (usda_acre_table(crop='corn'), ['year', 'abm']),
+                   (usda_acre_table(crop='soybean'), ['year', 'abm'])]
+    if MEMORY_LEAN == True:
+        usda_tables = prune_feature_tables(usda_tables, TRAINING_DROP_COLUMNS + TRAIT_MAP_DROP_COLUMNS)
+    with track_step('Step 8: assemble trait_map and USDA data',
+                    inputs=[Sale_HP_trait_weather_CM_Performance_CF_SRP] + [table for table, _ in usda_tables],
+                    kind='merge') as step:
+        sales_w_soybean_acreage = assemble_features(Sale_HP_trait_weather_CM_Performance_CF_SRP,
+                                                    usda_tables)
+        step['output'] = sales_w_soybean_acreage
+
+    sales_w_soybean_acreage = sales_w_soybean_acreage.replace(-np.inf, 0)
+    sales_w_soybean_acreage = sales_w_soybean_acreage.replace(np.inf, 0)
+    sales_w_soybean_acreage = sales_w_soybean_acreage.fillna(0)
+    sales_w_soybean_acreage.loc[sales_w_soybean_acreage['age'] == 0, 'age'] = 1
+
+    Final_df_acreage = sales_w_soybean_acreage.copy()#drop(columns = ['trait'])
+
+    # drop any UNKNOWNs
+    Final_df_acreage = Final_df_acreage.rename(columns={'Variety_Name': 'hybrid'})
+    Final_df_acreage = Final_df_acreage[
+            Final_df_acreage['hybrid'] != 'UNKNOWN'].reset_index(drop=True)
+    Final_df_acreage = Final_df_acreage[
+            Final_df_acreage['abm'] != 'UNK'].reset_index(drop=True)
+
+    # set the 'pred_price' feature to be the price feature
+    Final_df_acreage['pred_price'] = Final_df_acreage['price'].copy()
+
+    # get the avai_supply_region and the price_rec data
+    supply_price_tables = [(supply_table(), ['year', 'abm', 'hybrid']),
+                           (price_received_table(), ['year', 'abm'])]
+    with track_step('Step 8: assemble supply and price received data',
+                    inputs=[Final_df_acreage] + [table for table, _ in supply_price_tables],
+                    kind='merge') as step:
+        Final_df_acreage = assemble_features(Final_df_acreage, supply_price_tables)
+        Final_df_acreage = impute_supply(df=Final_df_acreage)
+        Final_df_acreage = impute_price_rec(df=Final_df_acreage)
+        step['output'] = Final_df_acreage
+    
+    # edit trait columns
+    Final_df_acreage = amend_trait_features(df=Final_df_acreage)
+
+    # create the product weights
+    create_portfolio_weights(df=Final_df_acreage)
+
+    # drop any columns we aren't interested in
+    Final_df_acreage = Final_df_acreage.drop(columns=TRAINING_DROP_COLUMNS, errors='ignore')
+
+
+    df_save_path = 'training_data_set_2024_feb28.csv'
+
+    Final_df_acreage = Final_df_acreage.drop_duplicates()
+
+    # set the 2023 nets_Q_eoy to be the forecast from soy success
+    net_sales_23_fcst = read_intermediate('net_sales_23_fcst', csv_path='net_sales_23_fcst.csv',
+                                          dtype={'year': str})
+    net_sales_23_fcst['year'] = net_sales_23_fcst['year'].astype(str)
+
+    Final_df_acreage = assemble_features(Final_df_acreage,
+                                         [(net_sales_23_fcst, ['year', 'hybrid', 'abm'])])
+
+    Final_df_acreage.loc[
+            Final_df_acreage['year'] == '2023', 'nets_Q_eoy'] =  Final_df_acreage.loc[
+                    Final_df_acreage['year'] == '2023', 'loc'].values
+
+    Final_df_acreage['nets_Q'] = Final_df_acreage['nets_Q_eoy'].values
+    Final_df_acreage = Final_df_acreage.drop(columns=['nets_Q_eoy', 'loc'])
+
+    Final_df_acreage = Final_df_acreage.fillna(0)
+
+    Final_df_acreage.to_csv(df_save_path, index = False)
+
+    return Final_df_acreage
+
+
+###### ------------------------- Pipeline Stages ------------------------ ######
+# each stage declares the stages it takes inputs from (keyword argument ->
+# stage) and the config constants it depends on (the files it reads are
+# listed in input_files). the
+# sales, weather, commodity, performance, CF, SRP, and kynetic branches are
+# independent of each other until merge_all
+STAGES = {
+        'abm_Teamkey': {'func': read_abm_teamkey_file},
+        'sales': {'func': build_sales_data,
+                  'inputs': {'abm_Teamkey': 'abm_Teamkey'},
+                  'config': ['EFFECTIVE_DATE', 'ORDER_DATE', 'REFRESH_YEARS', 'RM_BINS',
+                             'SALES_LAGS', 'SALES_YEARS', 'SEASON_STORE']},
+        'age_trait': {'func': build_age_trait_data},
+        'weather': {'func': build_weather_data,
+                    'config': ['REFRESH_YEARS', 'SEASON_STORE', 'WEATHER_CHUNK_SIZE',
+                               'WEATHER_YEARS']},
+        'commodity': {'func': build_commodity_data},
+        'performance': {'func': build_performance_data,
+                        'config': ['H2H_YEARS', 'REFRESH_YEARS', 'SEASON_STORE', 'US_STATE_ABBREV']},
+        'cf': {'func': build_cf_data,
+               'inputs': {'abm_Teamkey': 'abm_Teamkey'},
+               'config': ['CF_Y1_FILES', 'REFRESH_YEARS', 'SEASON_STORE']},
+        'srp': {'func': build_srp_data,
+                'config': ['REFRESH_YEARS', 'SEASON_STORE', 'SRP_YEARS']},
+        'kynetic': {'func': read_kynetic_data,
+                    'config': ['KYNETIC_COLUMNS_TO_DROP', 'KYNETIC_COLUMN_NAMES']},
+        'trait_map': {'func': read_soybean_trait_map},
+        'merged': {'func': merge_all,
+                   'inputs': {'Sale_all': 'sales',
+                              'Age_Trait': 'age_trait',
+                              'Weather_Flattened': 'weather',
+                              'CM_lagged': 'commodity',
+                              'Performance_adv': 'performance',
+                              'CF_abm': 'cf',
+                              'kynetic_data': 'kynetic',
+                              'SRP_2011_2024': 'srp'},
+                   'config': ['LEAN_FLOAT_DTYPE', 'LEAN_PRECISION_CHECK', 'LEAN_PRECISION_TOLERANCE',
+                              'MEMORY_LEAN', 'TRAINING_DROP_COLUMNS', 'TRAIT_MAP_DROP_COLUMNS'],
+                   'local': True},
+        'training_set': {'func': build_training_data,
+                         'inputs': {'Sale_HP_trait_weather_CM_Performance_CF_SRP': 'merged',
+                                    'trait_map': 'trait_map'},
+                         'config': ['MEMORY_LEAN', 'TRAINING_DROP_COLUMNS', 'TRAIT_MAP_DROP_COLUMNS'],
+                         'local': True},
+        }
+
+if __name__ == '__main__':
+    Final_df_acreage = build_training_set()
+    print("Training set's shape: ", Final_df_acreage.shape)
@@ -8,14 +8,36 @@ Created on Wed Sep 15 14:19:38 2021
 
 ABM_FIPS_MAP = 'mappingall_processed.csv'
 
+# the benchmark's working directory, saved baseline, scale factors, and the
+# slowdown relative to the baseline that's reported as a regression
+BENCHMARK_BASELINE = 'benchmark_baseline.json'
+
+BENCHMARK_DIR = 'benchmark/'
+
+BENCHMARK_SCALES = [1, 10, 100]
+
+BENCHMARK_TOLERANCE = 0.25
+
 BIG_CF_FILE = 'Soybean_CY_Asgrow_12_29_21.csv'
 
+# the stage cache directory, and whether input files are fingerprinted by
+# hashing their contents rather than by size and modification time
+CACHE_DIR = 'cache/'
+
+CACHE_HASH_CONTENTS = False
+
 BLIZZARD_DIR = '../../NA-soy-pricing/dataframe_construction_r_r/blizzard/county_data/'
 
 CF_2022_FILE = 'FY23_01_20_22.xlsx'
 
 CF_2023_FILE = 'FY23_Soy_011923.xlsx'
 
+# the file each year's y + 1 consensus forecast is read from, a new season
+# only needs its file added here
+CF_Y1_FILES = {2022: BIG_CF_FILE,
+               2023: CF_2022_FILE,
+               2024: CF_2023_FILE}
+
 CM_DIR = 'CM_prep/'
 
 CORN_SOY_ACRES = 'acres_corn_soy_08_to_19.csv'
@@ -23,14 +45,45 @@ CORN_SOY_ACRES = 'acres_corn_soy_08_to_19.csv'
 # the data directory
 DATA_DIR = '../../NA-soy-pricing/data/'
 
+# whether the intermediates are also exported as CSV
+EXPORT_CSV = False
+
 H2H_DIR = 'H2H_yield_data/'
 
+# the years of the yearly H2H files (each is the performance for the next year)
+H2H_YEARS = list(range(2011, 2023))
+
 HISTORICAL_SRP = 'historical_SRP/'
 
 HISTORICAL_SUPPLY = 'hist_supply_info.csv'
 
+# the intermediate store directory, the format of the intermediates ('parquet',
+# 'feather', or 'pickle'), and the compression used by parquet and feather
+INTERMEDIATE_COMPRESSION = 'zstd'
+
+INTERMEDIATE_DIR = 'intermediate/'
+
+INTERMEDIATE_FORMAT = 'parquet'
+
 KYNETIC_DATA = 'soybean_kynetic_2008_2022.csv'
 
+# the float type numeric features are downcast to in the memory-lean mode, and
+# whether each downcast is checked against the largest relative change allowed
+LEAN_FLOAT_DTYPE = 'float32'
+
+LEAN_PRECISION_CHECK = False
+
+LEAN_PRECISION_TOLERANCE = 1e-6
+
+# whether the merges leave out the columns the training data set drops and
+# downcast the numeric features, which lowers peak memory but changes the
+# trailing digits of the float features
+MEMORY_LEAN = False
+
+# the number of worker processes used to run independent pipeline stages at
+# the same time (None uses every core, 1 runs the stages one after another)
+PIPELINE_WORKERS = None
+
 # the price received data file
 PRICE_REC = 'price_received_06to22Dec.csv'
 
@@ -38,10 +91,40 @@ PROD_LIST_23 = '2023_prelim_asgrow_prod_list.csv'
 
 PROD_LIST_24 = 'product_list_zones_24.csv'
 
+# the number of worker processes reading the yearly sales, H2H, SRP, and
+# Blizzard files at the same time (None uses every core, or one process when
+# the files are read in a pipeline worker, 1 reads the files one after another)
+READ_WORKERS = None
+
+# the years the season store processes again even if their files haven't changed
+REFRESH_YEARS = []
+
+# the relative maturity (RM) bins of the first two digits of the first number in
+# a product name, as (lowest two digit value, RM) in increasing order: 00 is
+# -0.1, 01-04 are 0, 05-09 are 0.5, and so on in steps of 5 up to 85-89 at 8.5,
+# and 90 and up are 0
+RM_BINS = ([(0, -0.1), (1, 0.0)] + [(lower, lower / 10) for lower in range(5, 90, 5)] +
+           [(90, 0.0)])
+
+# the JSON report of the stage and merge step timings, memory, and shapes
+RUN_REPORT_PATH = 'run_report.json'
+
+# whether the per-year sales, weather, performance, SRP, and consensus forecast
+# data are kept in a year-partitioned store under INTERMEDIATE_DIR, so that a
+# run only processes the years that are new or whose files changed
+SEASON_STORE = False
+
 SCM_DATA_DIR = 'SCM_data/'
 
 SCM_DATA_FILE = 'may11_22_SCM.csv'
 
+# the columns dropped from the training data set, and the trait map columns
+# dropped by amend_trait_features
+TRAINING_DROP_COLUMNS = ['discount', 'Unnamed: 18', 'county_yield', 'avg_yield', 'corn_acres',
+                         'avg_corn_acres', 'soybean_acres', 'avg_soybean_acres']
+
+TRAIT_MAP_DROP_COLUMNS = ['RR', 'SR', 'RR2X', 'XF']
+
 # the abm table
 ABM_TABLE = 'ABM_Table.csv'
 
@@ -73,10 +156,27 @@ SALES_2022 = '2022_hybrid_abm_dealer.csv'
 
 SALES_2021_W_DATE = 'D1_MS_21_product_location_202110281734.csv'
 
+# the 2023 D1 MS sales to date, by effective date
+SALES_2023_D1MS = 'D1_MS_23_product_location_022823.csv'
+
 #SALES_2022 = 'nov1_21_order_bank.csv'
 
+# the number of rows read at a time from the dealer level sales files, which
+# are summed a chunk at a time (None reads each file whole)
+SALES_CHUNK_SIZE = None
+
 SALES_DIR = 'sales_data/'
 
+# the sales quantities lagged by each number of years in the lagged sales
+# features, e.g. nets_Q_1 is last year's nets_Q of the product in the abm
+SALES_LAGS = {1: ['nets_Q', 'order_Q', 'return_Q', 'replant_Q'],
+              2: ['nets_Q', 'order_Q', 'return_Q']}
+
+# the years of the yearly sales files, and of the historical '<year>_SRP.csv' files
+SALES_YEARS = list(range(2012, 2021))
+
+SRP_YEARS = list(range(2011, 2020))
+
 OLD_2020 = '2020_old.csv'
 
 YIELD_COUNTY_DATA = 'county_soybean_yield.csv'
@@ -147,4 +247,17 @@ US_STATE_ABBREV = {
     }
 
 
+# the number of rows of a Blizzard file aggregated at a time, each chunk's sums
+# by year, month, and abm being folded into the year's running sums (None
+# aggregates each file whole)
+WEATHER_CHUNK_SIZE = 1000000
+
+# whether the Blizzard data are read from the typed, year-partitioned columnar
+# store under INTERMEDIATE_DIR (see weather_store.py) rather than the CSVs. a
+# year's CSV is converted the first time it's read and again when it changes
+WEATHER_STORE = True
+
+# the years of the yearly Blizzard weather files
+WEATHER_YEARS = list(range(2012, 2025))
+
 YEARLY_ABM_FIPS_MAP = 'abm_years_08_to_22.csv'
\ No newline at end of file
@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 11:47:09 2026
+
+@author: epnzv
+"""
+import argparse
+import copy
+import datetime as dt
+import inspect
+import json
+import os
+import platform
+import shutil
+import sys
+import tracemalloc
+
+import pandas as pd
+
+import aggregation
+import import_files
+import merge
+import preprocess
+
+from aggregation_config import (BENCHMARK_BASELINE, BENCHMARK_DIR, BENCHMARK_SCALES,
+                                BENCHMARK_TOLERANCE, DATA_DIR, INTERMEDIATE_DIR, SALES_DIR)
+from instrumentation import (measure_call)
+from pipeline import (REPO_DIR, apply_config)
+from synthetic_data import (generate_synthetic_data, synthetic_config)
+
+# the modules whose public functions are benchmarked
+BENCHMARK_MODULES = [import_files, preprocess, merge]
+
+# timings below this many seconds are too noisy to flag as regressions
+NOISE_FLOOR_S = 0.05
+
+
+def benchmark_functions(recorded, functions=None, repeat=1, memory=True):
+    """Times every public function of the benchmarked modules. Each call gets
+    a fresh copy of its inputs, so functions that modify their inputs in place
+    are measured the same way every time. A function that raises is recorded
+    with its error rather than stopping the run.
+
+    Keyword arguments:
+        recorded -- the dictionary of function name to keyword arguments, from
+            record_inputs and extra_inputs
+        functions -- the names of the functions to run, None for all
+        repeat -- the number of timed calls, the fastest is kept
+        memory -- whether to also measure the peak memory allocated by a call
+            (in a separate call, as tracing slows it down)
+    Returns:
+        results -- the list of result dictionaries
+    """
+    results = []
+
+    for module_name, name, func in public_functions():
+        if functions is not None and name not in functions:
+            continue
+
+        result = {'module': module_name, 'function': name}
+        if len(inspect.signature(func).parameters) > 0 and name not in recorded:
+            result['status'] = 'no inputs'
+            results.append(result)
+            continue
+
+        print("Benchmarking ", module_name, ".", name)
+        written = _backup_files(name)
+        try:
+            result.update(_time_call(name, func, recorded.get(name, {}), repeat, memory,
+                                     setup=lambda: _reset_files(written)))
+            result['status'] = 'ok'
+        except Exception as error:
+            result['status'] = 'error'
+            result['error'] = type(error).__name__ + ': ' + str(error)
+        finally:
+            _restore_files(written)
+
+        results.append(result)
+
+    return results
+
+
+def benchmark_pipeline(config, repeat=1, memory=True, n_workers=1):
+    """Times the full pipeline, build_training_set, from an empty stage cache.
+
+    Keyword arguments:
+        config -- the aggregation_config overrides pointing at the data
+        repeat -- the number of timed runs, the fastest is kept
+        memory -- whether to also measure the peak memory allocated by a run
+        n_workers -- the number of worker processes running stages
+    Returns:
+        result -- the result dictionary
+    """
+    def run_pipeline():
+        _clear_pipeline_outputs(config)
+        return aggregation.build_training_set(config=config, n_workers=n_workers)
+
+    result = {'module': 'aggregation', 'function': 'build_training_set'}
+
+    print("Benchmarking the full pipeline")
+    try:
+        result.update(_time_call('build_training_set', run_pipeline, {}, repeat, memory))
+        result['status'] = 'ok'
+    except Exception as error:
+        result['status'] = 'error'
+        result['error'] = type(error).__name__ + ': ' + str(error)
+
+    return result
+
+
+def compare_to_baseline(results, baseline, tolerance=BENCHMARK_TOLERANCE):
+    """Compares benchmark results to a saved baseline. A function regressed if
+    its time or peak memory grew by more than the tolerance, or if it ran in
+    the baseline and fails now.
+
+    Keyword arguments:
+        results -- the benchmark report dictionary
+        baseline -- the baseline report dictionary
+        tolerance -- the allowed relative growth, e.g. 0.25 for 25%
+    Returns:
+        regressions -- the list of regression dictionaries
+    """
+    if results['environment'] != baseline['environment']:
+        print("The baseline was run in a different environment: ", baseline['environment'])
+
+    previous = {(result['scale'], result['function']): result for result in baseline['results']}
+    regressions = []
+
+    for result in results['results']:
+        old = previous.get((result['scale'], result['function']))
+        if old is None or old['status'] != 'ok':
+            continue
+
+        if result['status'] != 'ok':
+            regressions.append({'scale': result['scale'], 'function': result['function'],
+                                'metric': 'status', 'baseline': old['status'],
+                                'current': result['status']})
+            continue
+
+        for metric, floor in [('wall_s', NOISE_FLOOR_S), ('peak_mem_mb', 1.0)]:
+            if old.get(metric) is None or result.get(metric) is None:
+                continue
+            if old[metric] < floor and result[metric] < floor:
+                continue
+            if result[metric] > old[metric] * (1 + tolerance):
+                regressions.append({'scale': result['scale'], 'function': result['function'],
+                                    'metric': metric, 'baseline': old[metric],
+                                    'current': result[metric]})
+
+    return regressions
+
+
+def extra_inputs(recorded, abm_Teamkey):
+    """Builds the inputs of the public functions the pipeline doesn't call
+    (the older 2021/2022 sales merges, the monthly sales, ...) from the inputs
+    recorded for the functions it does call.
+
+    Keyword arguments:
+        recorded -- the dictionary of function name to keyword arguments
+        abm_Teamkey -- the abm to team key map
+    Returns:
+        inputs -- the dictionary of function name to keyword arguments
+    """
+    inputs = {'preprocess_2020_sale': {'abm_Teamkey': abm_Teamkey}}
+
+    # the 2012-2020 sales, before the later years are merged on
+    if 'merge_2021_sales_data_impute_daily' in recorded:
+        sales = recorded['merge_2021_sales_data_impute_daily']['df']
+        for name in ['merge_2021_sales_data', 'merge_2022_sales_data',
+                     'merge_2021_sales_data_impute_monthly', 'merge_2022_SCM_data',
+                     'create_prediction_set']:
+            inputs[name] = {'df': sales, 'abm_Teamkey': abm_Teamkey}
+
+        sales_2021 = sales[sales['year'].astype(str) == '2020'].copy()
+        sales_2021['year'] = '2021'
+        inputs['merge_2021_sales_data_w_date'] = {
+                'df': sales_2021, 'order_index': import_files.read_order_index(abm_Teamkey)}
+        inputs['create_late_lagged_sales'] = {'df': sales_2021[['year', 'Variety_Name', 'abm']],
+                                              'full_df': sales, 'year': 2021}
+
+    if 'get_RM' in recorded:
+        inputs['create_monthly_sales'] = {'Sale_2012_2020_lagged': recorded['get_RM']['df'],
+                                          'order_index': import_files.read_order_index(abm_Teamkey),
+                                          'abm_Teamkey': abm_Teamkey}
+
+    if 'impute_supply' in recorded:
+        inputs['impute_age_one_lagged'] = {'df': recorded['impute_supply']['df']}
+
+    # the consensus forecast with the monthly forecast quantities it imputes from
+    if 'merge_cf_with_abm' in recorded:
+        cf = recorded['merge_cf_with_abm']['df_cf'].copy()
+        cf['year'] = cf['year'].astype(int)
+        for month in [9, 10, 11, 12]:
+            cf['TEAM_FCST_QTY_' + str(month)] = cf['TEAM_Y1_FCST_1'] * month / 12
+        inputs['impute_CY_CF'] = {'df': cf}
+
+    return inputs
+
+
+def public_functions():
+    """Returns the public functions defined in the benchmarked modules.
+
+    Keyword arguments:
+        None
+    Returns:
+        functions -- the list of (module name, function name, function)
+    """
+    functions = []
+    for module in BENCHMARK_MODULES:
+        for name, func in sorted(vars(module).items(), key=lambda item: item[0].lower()):
+            if (inspect.isfunction(func) == True and func.__module__ == module.__name__ and
+                    name.startswith('_') == False):
+                functions.append((module.__name__, name, func))
+
+    return functions
+
+
+def record_inputs(config):
+    """Runs the pipeline once and records the keyword arguments of the first
+    call to each public function of the benchmarked modules, so the
+    benchmark runs each function on the inputs it gets in the pipeline. Each
+    stage is run as its own target, so a failing stage only leaves the
+    functions it and the stages after it call without inputs.
+
+    Keyword arguments:
+        config -- the aggregation_config overrides pointing at the data
+    Returns:
+        recorded -- the dictionary of function name to keyword arguments
+        errors -- the dictionary of stage name to the error it failed with
+    """
+    recorded = {}
+
+    def recorder(name, func):
+        signature = inspect.signature(func)
+
+        def wrapper(*args, **kwargs):
+            if name not in recorded:
+                arguments = signature.bind(*args, **kwargs)
+                recorded[name] = copy.deepcopy(dict(arguments.arguments))
+            return func(*args, **kwargs)
+        return wrapper
+
+    replacements = {func: recorder(name, func) for _, name, func in public_functions()}
+    patched = _replace_functions(replacements)
+
+    errors = {}
+    try:
+        _clear_pipeline_outputs(config)
+        for stage in aggregation.STAGES:
+            try:
+                aggregation.build_training_set(config=config, stages=[stage], n_workers=1)
+            except Exception as error:
+                errors[stage] = type(error).__name__ + ': ' + str(error)
+                print("Stage ", stage, " failed while recording inputs: ", errors[stage])
+    finally:
+        for module, name, func in patched:
+            setattr(module, name, func)
+
+    return recorded, errors
+
+
+def run_benchmarks(scales=None, repeat=1, memory=True, functions=None, seed=0,
+                   output_dir=BENCHMARK_DIR):
+    """Generates synthetic data at each scale and benchmarks the public
+    functions of import_files, preprocess, and merge and the full pipeline on
+    it. The data for a scale is reused by later runs with the same seed.
+
+    Keyword arguments:
+        scales -- the scale factors, BENCHMARK_SCALES by default
+        repeat -- the number of timed calls per function, the fastest is kept
+        memory -- whether to measure the peak memory of each call
+        functions -- the names of the functions to run, None for all
+        seed -- the seed of the synthetic data
+        output_dir -- the directory the data and results are written to
+    Returns:
+        report -- the benchmark report dictionary
+    """
+    if scales is None:
+        scales = BENCHMARK_SCALES
+
+    output_dir = os.path.abspath(output_dir)
+    start_dir = os.getcwd()
+    report = {'created': dt.datetime.now().isoformat(timespec='seconds'),
+              'environment': benchmark_environment(),
+              'repeat': repeat,
+              'recording_errors': {},
+              'results': []}
+
+    for scale in scales:
+        root = os.path.join(output_dir, 'scale_' + str(scale))
+        config = _synthetic_data(root, scale, seed)
+
+        os.chdir(os.path.join(root, 'work'))
+        previous = apply_config(config)
+        try:
+            abm_Teamkey = import_files.read_abm_teamkey_file()
+            recorded, stage_errors = record_inputs(config)
+            recorded.update(extra_inputs(recorded, abm_Teamkey))
+
+            results = benchmark_functions(recorded, functions=functions, repeat=repeat,
+                                          memory=memory)
+            if functions is None or 'build_training_set' in functions:
+                results.append(benchmark_pipeline(config, repeat=repeat, memory=memory))
+        finally:
+            apply_config(previous)
+            os.chdir(start_dir)
+
+        for result in results:
+            result['scale'] = scale
+        report['results'] += results
+        report['recording_errors'][str(scale)] = stage_errors
+
+    return report
+
+
+def benchmark_environment():
+    """Returns the versions the benchmark ran with, as timings are only
+    comparable between runs on the same setup.
+    """
+    return {'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'machine': platform.machine(),
+            'system': platform.system()}
+
+
+def summary_table(results):
+    """Formats the benchmark results as a table with one line per function
+    and scale.
+
+    Keyword arguments:
+        results -- the list of result dictionaries
+    Returns:
+        table -- the table as a string
+    """
+    def fmt(value, spec):
+        return '-' if value is None else format(value, spec)
+
+    lines = ['{:<6} {:<42} {:<9} {:>9} {:>9} {:>9} {:>10} {:>10}'.format(
+            'scale', 'function', 'status', 'wall s', 'cpu s', 'mem MB', 'rows in', 'rows out')]
+    for result in results:
+        lines.append('{:<6} {:<42} {:<9} {:>9} {:>9} {:>9} {:>10} {:>10}'.format(
+                result['scale'], result['function'][:42], result['status'],
+                fmt(result.get('wall_s'), '.3f'), fmt(result.get('cpu_s'), '.3f'),
+                fmt(result.get('peak_mem_mb'), '.1f'), fmt(result.get('rows_in'), 'd'),
+                fmt(result.get('rows_out'), 'd')))
+
+    return '\n'.join(lines)
+
+
+def _backup_files(name):
+    """Copies the input files a function overwrites (preprocess_2020_sale
+    rewrites the 2020 sales) so every call can start from the originals.
+    """
+    paths = {'preprocess_2020_sale': [DATA_DIR + SALES_DIR + '2020.csv']}.get(name, [])
+    backups = []
+    for path in paths:
+        shutil.copyfile(path, path + '.bak')
+        backups.append(path)
+
+    return backups
+
+
+def _clear_pipeline_outputs(config):
+    """Removes the stage cache and intermediates so the pipeline runs from
+    scratch.
+    """
+    for directory in [config['CACHE_DIR'], INTERMEDIATE_DIR]:
+        if os.path.exists(directory) == True:
+            shutil.rmtree(directory)
+
+
+def _replace_functions(replacements):
+    """Replaces functions in every imported repo module holding them by name.
+    Returns the (module, name, original function) triples to undo it with.
+    """
+    patched = []
+    for module in list(sys.modules.values()):
+        module_file = getattr(module, '__file__', None)
+        if (module_file is None or
+                os.path.dirname(os.path.abspath(module_file)) != REPO_DIR):
+            continue
+        for name, value in list(vars(module).items()):
+            if inspect.isfunction(value) == True and value in replacements:
+                setattr(module, name, replacements[value])
+                patched.append((module, name, value))
+
+    return patched
+
+
+def _reset_files(backups):
+    """Copies the files backed up by _backup_files over their current versions."""
+    for path in backups:
+        shutil.copyfile(path + '.bak', path)
+
+
+def _restore_files(backups):
+    """Puts back the files backed up by _backup_files."""
+    for path in backups:
+        os.replace(path + '.bak', path)
+
+
+def _synthetic_data(root, scale, seed):
+    """Generates the synthetic data for a scale unless it's already there."""
+    marker = os.path.join(root, 'synthetic.json')
+    settings = {'scale': scale, 'seed': seed}
+
+    if os.path.exists(marker) == True:
+        with open(marker) as f:
+            if json.load(f) == settings:
+                return synthetic_config(root)
+        shutil.rmtree(root)
+
+    config = generate_synthetic_data(root, scale=scale, seed=seed)
+    with open(marker, 'w') as f:
+        json.dump(settings, f)
+
+    return config
+
+
+def _time_call(name, func, kwargs, repeat, memory, setup=None):
+    """Calls a function repeat times on fresh copies of its inputs and keeps
+    the fastest call, then measures its peak traced memory in one more call.
+    The setup function, if given, runs untimed before every call.
+    """
+    best = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        _, records = measure_call(name, func, copy.deepcopy(kwargs), kind='benchmark')
+        if best is None or records[-1]['wall_s'] < best['wall_s']:
+            best = records[-1]
+
+    result = {'wall_s': best['wall_s'],
+              'cpu_s': best['cpu_s'],
+              'rows_in': best['rows_in'],
+              'rows_out': best['rows_out'],
+              'columns_out': best['columns_out'],
+              'peak_mem_mb': None}
+
+    if memory == True:
+        if setup is not None:
+            setup()
+        call_kwargs = copy.deepcopy(kwargs)
+        tracemalloc.start()
+        try:
+            func(**call_kwargs)
+            result['peak_mem_mb'] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        finally:
+            tracemalloc.stop()
+
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks the pipeline on synthetic data.')
+    parser.add_argument('--scales', type=int, nargs='+', default=BENCHMARK_SCALES,
+                        help='the synthetic data scale factors')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='the number of timed calls per function')
+    parser.add_argument('--functions', nargs='+', default=None,
+                        help='the functions to benchmark, all by default')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='skip the peak memory measurements')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='save the results as the new baseline')
+    args = parser.parse_args()
+
+    report = run_benchmarks(scales=args.scales, repeat=args.repeat,
+                            memory=args.no_memory == False, functions=args.functions)
+    print(summary_table(report['results']))
+
+    with open(os.path.join(BENCHMARK_DIR, 'benchmark_results.json'), 'w') as f:
+        json.dump(report, f, indent=2)
+
+    if args.save_baseline == True or os.path.exists(BENCHMARK_BASELINE) == False:
+        with open(BENCHMARK_BASELINE, 'w') as f:
+            json.dump(report, f, indent=2)
+        print("Saved the baseline to ", BENCHMARK_BASELINE)
+    else:
+        with open(BENCHMARK_BASELINE) as f:
+            regressions = compare_to_baseline(report, json.load(f))
+        for regression in regressions:
+            print("Regression at scale ", regression['scale'], " in ", regression['function'],
+                  ": ", regression['metric'], " ", regression['baseline'], " -> ",
+                  regression['current'])
+        if len(regressions) > 0:
+            sys.exit(1)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 25 10:03:41 2026
+
+@author: epnzv
+"""
+import os
+
+import pandas as pd
+
+from aggregation_config import (ABM_FIPS_MAP, ABM_TABLE, BIG_CF_FILE, CF_2022_FILE, CF_2023_FILE,
+                                CORN_SOY_ACRES, DAILY_FRACTIONS, DATA_DIR, HISTORICAL_SUPPLY,
+                                KYNETIC_DATA, MONTHLY_FRACTIONS, PRICE_REC, PROD_LIST_23,
+                                PROD_LIST_24, SALES_2021, SALES_2021_W_DATE, SALES_2022,
+                                SALES_2023_D1MS, SCM_DATA_DIR, SCM_DATA_FILE, YEARLY_ABM_FIPS_MAP,
+                                YIELD_COUNTY_DATA)
+from instrumentation import (track_step)
+
+# the sources read from the files named in aggregation_config. 'path' builds
+# the path when the source is loaded, so config overrides are picked up,
+# 'read_kwargs' are passed to the reader (read_excel for .xlsx files,
+# read_csv otherwise), and 'schema' maps the columns the pipeline needs to
+# the types they're read as. columns typed None are left to be inferred, the
+# team keys since they're numbers in some years and the quantities since
+# some files store them as strings with commas
+CATALOG_SOURCES = {
+        'abm_fips_map': {'path': lambda: DATA_DIR + ABM_FIPS_MAP,
+                         'schema': {'fips': 'int64', 'abm': str, 'crd': 'float64'}},
+        'abm_table': {'path': lambda: DATA_DIR + ABM_TABLE,
+                      'schema': {'Old Area ID': None, 'New Area ID': None}},
+        'big_cf': {'path': lambda: DATA_DIR + BIG_CF_FILE,
+                   'schema': {'FORECAST_YEAR': 'int64', 'TEAM_KEY': None, 'ACRONYM_NAME': str,
+                              'TEAM_Y1_FCST_1': 'float64'}},
+        'cf_2022': {'path': lambda: DATA_DIR + CF_2022_FILE,
+                    'schema': {'FORECAST_YEAR': 'int64', 'TEAM_KEY': None, 'ACRONYM_NAME': str,
+                               'BASE_TRAIT': str, 'TEAM_Y1_FCST_1': None}},
+        'cf_2023': {'path': lambda: DATA_DIR + CF_2023_FILE,
+                    'schema': {'FORECAST_YEAR': 'int64', 'TEAM_KEY': None, 'ACRONYM_NAME': str,
+                               'TEAM_Y1_FCST_1': None}},
+        'corn_soy_acres': {'path': lambda: DATA_DIR + CORN_SOY_ACRES,
+                           'schema': {'Year': 'int64', 'Commodity': str, 'State': str,
+                                      'State ANSI': 'int64', 'Ag District Code': 'int64',
+                                      'Value': None}},
+        'daily_fractions': {'path': lambda: DAILY_FRACTIONS,
+                            'schema': {'abm': str, 'month': 'int64', 'day': 'int64'}},
+        'historical_supply': {'path': lambda: HISTORICAL_SUPPLY,
+                              'schema': {'year': 'int64'}},
+        'kynetic': {'path': lambda: DATA_DIR + KYNETIC_DATA,
+                    'read_kwargs': {'low_memory': False, 'sep': ',', 'thousands': ','},
+                    'schema': {'Year': 'int64', 'County (Numeric)': None, 'Hybrid/Variety': str,
+                               'Retail Price': 'float64', 'Discount Amount': 'float64'}},
+        'monthly_fractions': {'path': lambda: MONTHLY_FRACTIONS,
+                              'schema': {'abm': str}},
+        'price_received': {'path': lambda: DATA_DIR + PRICE_REC,
+                           'schema': {'Year': 'int64', 'Period': str, 'Commodity': str,
+                                      'State': str, 'Value': None}},
+        'prod_list_23': {'path': lambda: DATA_DIR + PROD_LIST_23,
+                         'schema': {'ACRONYM_NAME': str}},
+        'prod_list_24': {'path': lambda: PROD_LIST_24,
+                         'schema': {'ACRONYM_NAME': str, 'TEAM_KEY': None}},
+        'sales_2021': {'path': lambda: DATA_DIR + SALES_2021,
+                       'schema': {'Team': None, 'VARIETY': str, 'CY Net Sales': str,
+                                  'Returns': str, 'Haulbacks': str, 'Replants': str}},
+        'sales_2021_w_date': {'path': lambda: DATA_DIR + SALES_2021_W_DATE,
+                              'schema': {'MK_YR': None, 'EFFECTIVE_DATE': None,
+                                         'BRAND_FAMILY_DESCR': str, 'SPECIE_DESCR': str,
+                                         'VARIETY_NAME': str, 'SLS_LVL_2_ID': None,
+                                         'SUM(ORDER_QTY_TO_DATE)': None}},
+        'sales_2022': {'path': lambda: DATA_DIR + SALES_2022,
+                       'schema': {'Team': None, 'VARIETY': str, 'CY Net Sales': str,
+                                  'Returns': str, 'Haulbacks': str, 'Replants': str,
+                                  'Shipped': str}},
+        'sales_2023_d1ms': {'path': lambda: DATA_DIR + SALES_2023_D1MS,
+                            'schema': {'MK_YR': str, 'EFFECTIVE_DATE': None,
+                                       'BRAND_FAMILY_DESCR': str, 'SPECIE_DESCR': str,
+                                       'VARIETY_NAME': str, 'SLS_LVL_2_ID': None,
+                                       'SUM(ORDER_QTY_TO_DATE)': None,
+                                       'SUM(RETURN_QTY_TO_DATE)': None,
+                                       'SUM(REPLANT_QTY_TO_DATE)': None,
+                                       'SUM(NET_SALES_QTY_TO_DATE)': None}},
+        'scm': {'path': lambda: DATA_DIR + SCM_DATA_DIR + SCM_DATA_FILE,
+                'schema': {'Team': None, 'VARIETY': str, 'Dealer/Gross Orders': None,
+                           'Returns': None, 'Replants': None, 'Haulbacks': None,
+                           'CY Net Sales': None}},
+        'yearly_abm_fips_map': {'path': lambda: YEARLY_ABM_FIPS_MAP,
+                                'schema': {'year': 'int64', 'fips': 'int64', 'abm': str}},
+        'yield_county': {'path': lambda: DATA_DIR + YIELD_COUNTY_DATA,
+                         'read_kwargs': {'low_memory': False},
+                         'schema': {'Year': 'int64', 'State ANSI': 'int64',
+                                    'County ANSI': 'float64', 'Value': 'float64'}},
+        }
+
+# the loaded files of this process, by path and read keyword arguments
+CATALOG_CACHE = {}
+
+
+def clear_catalog():
+    """Drops every loaded file, so the next loads read the files again."""
+    CATALOG_CACHE.clear()
+
+
+def load_file(path, copy=True, **read_kwargs):
+    """Reads a file once per process and hands out the loaded dataframe. The
+    file is read again if it has changed since it was loaded. Every read is
+    printed and measured, and its record added to instrumentation.RUN_RECORDS.
+
+    Keyword arguments:
+        path -- the path of the file, read with read_excel for .xlsx files and
+            read_csv otherwise
+        copy -- whether to hand out a copy the caller can change. without a
+            copy the loaded dataframe itself is returned, which must not be
+            changed
+        **read_kwargs -- the keyword arguments of the reader
+    Returns:
+        df -- the dataframe of the file
+    """
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    cache_key = (path, repr(sorted(read_kwargs.items())))
+
+    entry = CATALOG_CACHE.get(cache_key)
+    if entry is None or entry['version'] != version:
+        with track_step('load ' + os.path.basename(path), kind='load') as step:
+            if path.endswith('.xlsx') == True:
+                df = pd.read_excel(path, **read_kwargs)
+            else:
+                df = pd.read_csv(path, **read_kwargs)
+            step['output'] = df
+
+        print("Loaded ", path, " ", df.shape, " in ", round(step['wall_s'], 2),
+              " s, peak RSS +", round(step['peak_rss_delta_mb'] or 0, 1), " MB")
+
+        entry = {'version': version, 'df': df}
+        CATALOG_CACHE[cache_key] = entry
+
+    if copy == True:
+        return entry['df'].copy()
+
+    return entry['df']
+
+
+def load_source(name, copy=True):
+    """Loads one of the catalog sources with the types of its schema, checking
+    it has the columns the pipeline needs.
+
+    Keyword arguments:
+        name -- the name of the source in CATALOG_SOURCES
+        copy -- whether to hand out a copy the caller can change, see load_file
+    Returns:
+        df -- the dataframe of the source
+    """
+    df = load_file(source_path(name), copy=copy, **source_read_kwargs(name))
+
+    missing_columns = [column for column in CATALOG_SOURCES[name].get('schema', {})
+                       if column not in df.columns]
+    if len(missing_columns) > 0:
+        raise ValueError('catalog source ' + name + ' is missing the columns ' +
+                         str(missing_columns))
+
+    return df
+
+
+def source_path(name):
+    """Returns the path of one of the catalog sources.
+
+    Keyword arguments:
+        name -- the name of the source in CATALOG_SOURCES
+    Returns:
+        path -- the path of the source's file
+    """
+    if name not in CATALOG_SOURCES:
+        raise KeyError('unknown catalog source ' + name)
+
+    return CATALOG_SOURCES[name]['path']()
+
+
+def source_read_kwargs(name):
+    """Returns the keyword arguments one of the catalog sources is read with,
+    its read_kwargs and the types of its schema, e.g. to stream the file a
+    chunk at a time.
+
+    Keyword arguments:
+        name -- the name of the source in CATALOG_SOURCES
+    Returns:
+        read_kwargs -- the dictionary of reader keyword arguments
+    """
+    source = CATALOG_SOURCES[name]
+    dtype = {column: column_type for column, column_type in source.get('schema', {}).items()
+             if column_type is not None}
+
+    read_kwargs = dict(source.get('read_kwargs', {}))
+    if len(dtype) > 0:
+        read_kwargs['dtype'] = dtype
+
+    return read_kwargs
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 26 09:12:37 2026
+
+@author: epnzv
+"""
+import numpy as np
+import pandas as pd
+
+# the number of days in each month of a non-leap year
+DAYS_IN_MONTH = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+
+def decode_yyyymmdd(values, errors='raise'):
+    """Converts YYYYMMDD dates, stored as integers, floats, or strings, to
+    datetimes with integer arithmetic instead of slicing strings. Missing
+    values become NaT.
+
+    Keyword arguments:
+        values -- the series of YYYYMMDD dates
+        errors -- 'raise' to raise a ValueError on values that aren't valid
+            dates (e.g. 20210231 or 2021103), 'coerce' to set them to NaT
+    Returns:
+        dates -- the series of datetime64 dates, with the index of values
+    """
+    values = pd.Series(values)
+    missing = values.isna().values
+    numbers = pd.to_numeric(values, errors='coerce').values.astype('float64')
+
+    # the dates have to be whole numbers within the years pandas can hold
+    valid = (np.isfinite(numbers) & (numbers == np.floor(numbers)) &
+             (numbers >= 16780101) & (numbers <= 22611231))
+    dates_int = np.where(valid, numbers, 19700101).astype('int64')
+
+    year = dates_int // 10000
+    month = dates_int // 100 % 100
+    day = dates_int % 100
+
+    # a month between 1 and 12 and a day within the month, February has 29
+    # days in leap years
+    month_valid = (month >= 1) & (month <= 12)
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    month_days = DAYS_IN_MONTH[np.clip(month, 1, 12) - 1] + ((month == 2) & leap)
+    valid = valid & month_valid & (day >= 1) & (day <= month_days)
+
+    invalid = (valid == False) & (missing == False)
+    if invalid.any() == True and errors == 'raise':
+        raise ValueError(str(invalid.sum()) + ' values are not YYYYMMDD dates, e.g. ' +
+                         str(list(values.values[invalid][:5])))
+
+    # count the months and then the days from the epoch
+    months = ((year - 1970) * 12 + month - 1).astype('datetime64[M]')
+    dates = months.astype('datetime64[D]') + (day - 1).astype('timedelta64[D]')
+    dates = dates.astype('datetime64[ns]')
+    dates[valid == False] = np.datetime64('NaT')
+
+    return pd.Series(dates, index=values.index)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 10:04:51 2026
+
+@author: epnzv
+"""
+import numpy as np
+import pandas as pd
+
+
+def assemble_features(base, tables):
+    """Adds the columns of several feature tables to a base dataframe, giving
+    the same rows and columns as a chain of left merges of the tables onto
+    it. Rather than copying the growing frame once per merge, the base keys
+    are indexed once, each table's rows are looked up by position, and every
+    column is gathered straight into one new frame. A table whose keys aren't
+    unique or whose columns clash with columns already added (so a merge
+    would duplicate rows or add _x/_y suffixes) is merged instead.
+
+    Keyword arguments:
+        base -- the base dataframe, whose rows and row order are kept
+        tables -- the list of (feature dataframe, key columns) pairs, in the
+            order they would be merged
+    Returns:
+        df_assembled -- the dataframe with the feature columns added
+    """
+    df_assembled = base
+    pending = []
+    pending_columns = set()
+
+    for table, keys in tables:
+        new_columns = set(table.columns) - set(keys)
+        key_types_match = all((df_assembled[key].dtype == object) == (table[key].dtype == object)
+                              for key in keys)
+        if (key_types_match == True and table.duplicated(subset=keys).any() == False and
+                len(new_columns & (set(df_assembled.columns) | pending_columns)) == 0):
+            pending.append((table, keys))
+            pending_columns |= new_columns
+            continue
+
+        # gather what can be gathered, then merge this table the usual way
+        df_assembled = _gather_features(df_assembled, pending)
+        df_assembled = df_assembled.merge(table, on=keys, how='left')
+        pending = []
+        pending_columns = set()
+
+    return _gather_features(df_assembled, pending)
+
+
+def _feature_positions(base, table, keys, base_codes):
+    """Returns the position in table of the row matching each base row's keys,
+    -1 where there's none. Missing keys match each other, as in a merge.
+    """
+    base_key = np.zeros(len(base), dtype='int64')
+    table_key = np.zeros(len(table), dtype='int64')
+    matchable = np.ones(len(table), dtype=bool)
+
+    for key in keys:
+        # index each base key column once, shared by every table joined on it
+        if key not in base_codes:
+            codes, uniques = pd.factorize(base[key])
+            base_codes[key] = (codes + 1, pd.Index(uniques))
+        codes, uniques = base_codes[key]
+
+        # code 0 is a missing key, so base and table NaNs line up
+        table_values = table[key]
+        positions = uniques.get_indexer(table_values)
+        table_codes = np.where(table_values.isna().values, 0, positions + 1)
+        matchable &= (table_values.isna().values | (positions != -1))
+
+        base_key = base_key * (len(uniques) + 1) + codes
+        table_key = table_key * (len(uniques) + 1) + table_codes
+
+    rows = np.flatnonzero(matchable)
+    positions = pd.Index(table_key[rows]).get_indexer(base_key)
+
+    matched = positions != -1
+    positions[matched] = rows[positions[matched]]
+
+    return positions
+
+
+def _gather_features(base, tables):
+    """Builds the base dataframe plus the non-key columns of each table, with
+    the table values taken by position for each base row.
+    """
+    if len(tables) == 0:
+        return base
+
+    columns = list(base.columns)
+    values = [base.iloc[:, i].values for i in range(base.shape[1])]
+    base_codes = {}
+    for table, keys in tables:
+        positions = _feature_positions(base, table, keys, base_codes)
+        for column in table.columns:
+            if column not in keys:
+                columns.append(column)
+                values.append(pd.api.extensions.take(table[column].values, positions,
+                                                     allow_fill=True))
+
+    df_gathered = pd.DataFrame(dict(enumerate(values)))
+    df_gathered.columns = columns
+
+    return df_gathered
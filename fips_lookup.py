@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 31 09:48:15 2026
+
+@author: epnzv
+"""
+import numpy as np
+import pandas as pd
+
+from data_catalog import (load_source, source_path)
+from stage_cache import (load_stage_output, save_stage_output, stage_key)
+
+# the number of 5 digit FIPS codes, the width of a year slot
+FIPS_SLOTS = 100000
+
+# the compiled lookups of this process, by map, with the key of the map file
+# they were built from
+FIPS_LOOKUPS = {}
+
+
+def compile_fips_lookup(fips_map, year='year'):
+    """Compiles a FIPS to abm map into dense arrays indexed by year slot and
+    FIPS code. Every (year slot, FIPS) holds the range of its abms in a flat
+    list of abm codes, so a FIPS listed with several abms joins to each of
+    them, in the order of the map, as in a merge.
+
+    Keyword arguments:
+        fips_map -- the dataframe of the map, with fips and abm columns
+        year -- the year column of a yearly map, None for a map that's the
+            same every year
+    Returns:
+        lookup -- a dictionary of the sorted years of the map ('years', None
+            for a map without years), the abm labels ('abms'), the start of
+            the abms of each year slot and FIPS ('offsets'), and the flat list
+            of abm codes ('abm_codes')
+    """
+    fips_map = fips_map[fips_map['fips'].notna() & fips_map['abm'].notna()]
+    fips = fips_map['fips'].values.astype('int64')
+
+    if year is None:
+        years = None
+        slots = np.zeros(len(fips_map), dtype='int64')
+    else:
+        map_years = fips_map[year].astype(int).values
+        years = np.unique(map_years)
+        slots = np.searchsorted(years, map_years)
+
+    abm_codes, abms = pd.factorize(fips_map['abm'])
+
+    # order the entries by year slot and FIPS, keeping the order of the map
+    cells = slots * FIPS_SLOTS + fips
+    entry_order = np.argsort(cells, kind='stable')
+
+    n_slots = 1 if years is None else len(years)
+    counts = np.bincount(cells, minlength=n_slots * FIPS_SLOTS)
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype('int32')
+
+    return {'years': years,
+            'abms': np.asarray(abms, dtype=object),
+            'offsets': offsets,
+            'abm_codes': abm_codes[entry_order].astype('int32')}
+
+
+def fips_abm_lookup(source='yearly_abm_fips_map', year='year'):
+    """Returns the compiled lookup of one of the FIPS to abm maps (see
+    compile_fips_lookup). It's compiled once per version of the map file and
+    kept in the stage cache across runs.
+
+    Keyword arguments:
+        source -- the name of the map in the data catalog, the yearly map by
+            default
+        year -- the year column of the map, None for a map without years
+    Returns:
+        lookup -- the compiled lookup
+    """
+    key = stage_key('fips_abm_lookup_' + source, compile_fips_lookup,
+                    files=[source_path(source)])
+
+    entry = FIPS_LOOKUPS.get(source)
+    if entry is None or entry['key'] != key:
+        hit, lookup = load_stage_output(name='fips_abm_lookup_' + source, key=key)
+        if hit == False:
+            lookup = compile_fips_lookup(load_source(source, copy=False), year=year)
+            save_stage_output(name='fips_abm_lookup_' + source, key=key, output=lookup)
+        entry = {'key': key, 'lookup': lookup}
+        FIPS_LOOKUPS[source] = entry
+
+    return entry['lookup']
+
+
+def join_abm(df, lookup, how='left', carry_forward=True, fips='fips', year='year'):
+    """Adds the abm of each row's FIPS and year with an array gather. With
+    carry_forward, years without a map of their own use the latest earlier
+    year's map, so the last year of the map carries forward to future years.
+
+    Keyword arguments:
+        df -- the dataframe with the FIPS (and year) columns
+        lookup -- the compiled lookup, see compile_fips_lookup
+        how -- 'left' to keep the rows without an abm (with NaN), 'inner' to
+            drop them
+        carry_forward -- whether years missing from the map use the latest
+            earlier year's map, otherwise their rows have no abm
+        fips -- the FIPS column
+        year -- the year column, as integers or strings of integers, ignored
+            for a map without years
+    Returns:
+        df_with_abm -- df with the abm column added, a row for each of its
+            FIPS's abms as a merge gives, with a new index
+    """
+    fips_values = pd.to_numeric(df[fips], errors='coerce').values.astype('float64')
+    valid = (np.isnan(fips_values) == False) & (fips_values >= 0) & (fips_values < FIPS_SLOTS)
+    valid = valid & (fips_values == np.floor(np.where(valid, fips_values, 0)))
+
+    if lookup['years'] is None:
+        slots = np.zeros(len(df), dtype='int64')
+    else:
+        df_years = pd.to_numeric(df[year], errors='coerce').values.astype('float64')
+        slots = np.searchsorted(lookup['years'], np.where(np.isnan(df_years), -1, df_years),
+                                side='right') - 1
+        valid = valid & (slots >= 0)
+        if carry_forward == False and len(lookup['years']) > 0:
+            valid = valid & (lookup['years'][np.maximum(slots, 0)] == df_years)
+
+    cells = np.where(valid, slots * FIPS_SLOTS + np.where(valid, fips_values, 0), 0).astype('int64')
+    starts = lookup['offsets'][cells].astype('int64')
+    counts = np.where(valid, lookup['offsets'][cells + 1] - starts, 0)
+
+    # a row for each abm, and for a left join a row with no abm
+    row_counts = counts if how == 'inner' else np.maximum(counts, 1)
+    rows = np.repeat(np.arange(len(df)), row_counts)
+    within = np.arange(len(rows)) - np.repeat(np.cumsum(row_counts) - row_counts, row_counts)
+
+    found = within < counts[rows]
+    abms = np.full(len(rows), np.nan, dtype=object)
+    abms[found] = lookup['abms'][lookup['abm_codes'][starts[rows][found] + within[found]]]
+
+    df_with_abm = df.iloc[rows].reset_index(drop=True)
+    df_with_abm['abm'] = abms
+
+    return df_with_abm
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct 28 09:31:52 2026
+
+@author: epnzv
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_catalog import (load_source, source_path)
+from order_curves import (SEASON_MONTHS)
+
+# the quantities with historical fractions
+FRACTION_QUANTITIES = ['nets', 'order', 'return', 'replant']
+
+# the days in each month of the season, in the order of SEASON_MONTHS. February
+# has 29 so every calendar day has its own day of the season
+SEASON_MONTH_DAYS = np.array([30, 31, 30, 31, 31, 29, 31, 30, 31, 30, 31, 31])
+
+# the cubes built from the fraction files, with the version of the file they
+# were built from so they're rebuilt when the file changes. only the cubes are
+# kept, not the loaded files
+FRACTION_CUBES = {}
+
+
+def build_daily_cube(daily_fractions, quantities=FRACTION_QUANTITIES):
+    """Builds the dense array of the historical daily fractions, indexed by
+    abm, day of the season, and quantity.
+
+    Keyword arguments:
+        daily_fractions -- the dataframe of the fractions by abm, month, and
+            day, with a <quantity>_fraction column for each quantity
+        quantities -- the quantities of the fractions
+    Returns:
+        cube -- a dictionary of the sorted abms ('abms'), the quantities
+            ('quantities'), and the array of fractions ('fractions'), NaN for
+            the days without a fraction
+    """
+    abms = np.unique(daily_fractions['abm'].dropna().values)
+    fractions = np.full((len(abms), SEASON_MONTH_DAYS.sum(), len(quantities)), np.nan)
+
+    daily_fractions = daily_fractions[daily_fractions['abm'].notna()]
+    abm_codes = np.searchsorted(abms, daily_fractions['abm'].values)
+    days = season_day(daily_fractions['month'].values, daily_fractions['day'].values)
+
+    fractions[abm_codes, days] = daily_fractions[
+            [qty + '_fraction' for qty in quantities]].values
+
+    return {'abms': abms, 'quantities': list(quantities), 'fractions': fractions}
+
+
+def build_monthly_cube(monthly_fractions):
+    """Builds the dense array of the historical monthly fractions, indexed by
+    abm and month of the season. August, the end of the season, is 1.
+
+    Keyword arguments:
+        monthly_fractions -- the dataframe of the fractions by abm, with a
+            frac_<month> column for every month but August
+    Returns:
+        cube -- a dictionary of the sorted abms ('abms') and the array of
+            fractions ('fractions'), in the order of SEASON_MONTHS
+    """
+    monthly_fractions = monthly_fractions[
+            monthly_fractions['abm'].notna()].drop_duplicates(subset=['abm'])
+    abms = np.unique(monthly_fractions['abm'].values)
+
+    fractions = np.ones((len(abms), len(SEASON_MONTHS)))
+    abm_codes = np.searchsorted(abms, monthly_fractions['abm'].values)
+    for i, month in enumerate(SEASON_MONTHS):
+        if month != 8:
+            fractions[abm_codes, i] = monthly_fractions['frac_' + str(month)].values
+
+    return {'abms': abms, 'fractions': fractions}
+
+
+def daily_fraction_cube():
+    """Returns the cube of the daily fractions file, built once per version
+    of the file (see build_daily_cube).
+    """
+    return fraction_cube('daily_fractions', build_daily_cube)
+
+
+def fraction_cube(source, build_cube):
+    """Returns the cube of a fraction file, building it only when the file
+    has changed since the cube was built.
+
+    Keyword arguments:
+        source -- the name of the fraction file in the data catalog
+        build_cube -- the function building the cube from the file
+    Returns:
+        cube -- the cube of the fractions
+    """
+    path = source_path(source)
+    stat = os.stat(path)
+    version = (path, stat.st_mtime_ns, stat.st_size)
+
+    entry = FRACTION_CUBES.get(source)
+    if entry is None or entry['version'] != version:
+        entry = {'version': version, 'cube': build_cube(load_source(source, copy=False))}
+        FRACTION_CUBES[source] = entry
+
+    return entry['cube']
+
+
+def gather_fractions(cube, abms, index):
+    """Gathers the fractions of each row's abm, NaN for the abms not in the cube.
+
+    Keyword arguments:
+        cube -- the daily or monthly cube
+        abms -- the abm of each row
+        index -- the days (or months) of the season to gather, as positions
+            along the second axis of the cube
+    Returns:
+        fractions -- the array of fractions by row, then by the positions in
+            index, then (for the daily cube) by quantity
+    """
+    abm_codes = pd.Index(cube['abms']).get_indexer(abms)
+
+    fractions = cube['fractions'][abm_codes][:, np.asarray(index)]
+    fractions[abm_codes == -1] = np.nan
+
+    return fractions
+
+
+def impute_to_date(sales, cube, months, days):
+    """Imputes the quantities to date from the end of year quantities and the
+    daily fractions, for any number of dates in one gather and multiply.
+
+    Keyword arguments:
+        sales -- the dataframe of the end of year quantities, with the abm and
+            a <quantity>_Q column for each quantity of the cube
+        cube -- the daily cube, see build_daily_cube
+        months -- the months of the dates
+        days -- the days of the dates
+    Returns:
+        to_date -- the array of the quantities to date by row, date, and
+            quantity of the cube. NaN where the abm has no fraction for the date
+    """
+    quantities = sales[[qty + '_Q' for qty in cube['quantities']]].values
+    fractions = gather_fractions(cube, sales['abm'].values,
+                                 season_day(np.atleast_1d(months), np.atleast_1d(days)))
+
+    return quantities[:, np.newaxis, :] * fractions
+
+
+def monthly_fraction_cube():
+    """Returns the cube of the monthly fractions file, built once per version
+    of the file (see build_monthly_cube).
+    """
+    return fraction_cube('monthly_fractions', build_monthly_cube)
+
+
+def season_day(month, day):
+    """Returns the day of the season, counted from the 1st of September, of
+    each month and day.
+
+    Keyword arguments:
+        month -- the months
+        day -- the days of the month
+    Returns:
+        season_days -- the array of the days of the season
+    """
+    month = np.asarray(pd.Series(month).values, dtype='int64')
+    day = np.asarray(pd.Series(day).values, dtype='int64')
+
+    month_starts = np.concatenate([[0], np.cumsum(SEASON_MONTH_DAYS)[:-1]])
+    season_month = (month - SEASON_MONTHS[0]) % 12
+
+    return month_starts[season_month] + day - 1
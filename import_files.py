@@ -8,19 +8,35 @@ Created on Thu Jan  6 15:06:45 2022
 import datetime as dt
 import pandas as pd
 
-from calendar import monthrange
-
-from aggregation_config import(ABM_TABLE, BIG_CF_FILE, BLIZZARD_DIR, CF_2022_FILE,
-                               CF_2023_FILE, CM_DIR, DATA_DIR, EFFECTIVE_DATE, H2H_DIR,
-                               HISTORICAL_SRP, HISTORICAL_SUPPLY, KYNETIC_DATA,
-                               KYNETIC_COLUMNS_TO_DROP, KYNETIC_COLUMN_NAMES,
-                               PROD_LIST_23, PROD_LIST_24, SALES_2021, SALES_2022,
-                               SALES_DIR, YEARLY_ABM_FIPS_MAP)
-from merge import (merge_2021_sales_data_w_date)
+from aggregation_config import(BIG_CF_FILE, CF_2022_FILE, CF_2023_FILE,
+                               CF_Y1_FILES, CM_DIR, DATA_DIR, EFFECTIVE_DATE, H2H_DIR,
+                               H2H_YEARS, HISTORICAL_SRP, KYNETIC_COLUMNS_TO_DROP,
+                               KYNETIC_COLUMN_NAMES, SALES_CHUNK_SIZE, SALES_DIR, SALES_YEARS,
+                               SRP_YEARS, WEATHER_CHUNK_SIZE, WEATHER_STORE,
+                               WEATHER_YEARS)
+from data_catalog import (load_file, load_source, source_path)
+from fips_lookup import (fips_abm_lookup, join_abm)
+from merge import (merge_2021_sales_data_w_date, read_dated_orders_file)
+from order_curves import (load_order_index, month_end_cutoffs, orders_as_of)
+from parallel_read import (read_years)
 from preprocess import(create_late_lagged_sales, create_prediction_set,
                        merge_2021_sales_data_impute_daily,
-                       merge_2022_sales_data_impute_daily, merge_2023_D1MS)
+                       merge_2022_sales_data_impute_daily, merge_2023_D1MS,
+                       prepare_2023_D1MS, weather_partial_sums)
+from streaming_read import (read_csv_grouped)
+from weather_store import (WEATHER_COLUMN_TYPES, blizzard_csv_path, grid_fips_index,
+                           iter_weather_partition, match_grid_fips, read_weather_partition,
+                           report_unmatched_points)
 
+# the columns read from the yearly sales files and their types, the abm is
+# left to be inferred since it's the team key in 2020
+SALES_COLUMN_TYPES = {'SPECIE_DESCR': str, 'BRAND_FAMILY_DESCR': str,
+                      'EFFECTIVE_DATE': str, 'SLS_LVL_2_ID': None,
+                      'VARIETY_NAME': str, 'NET_SALES_QTY_TO_DATE': 'float64',
+                      'ORDER_QTY_TO_DATE': 'float64', 'RETURN_QTY_TO_DATE': 'float64',
+                      'REPLANT_QTY_TO_DATE': 'float64'}
+SALES_COLUMN_DTYPES = {column: column_type for column, column_type
+                       in SALES_COLUMN_TYPES.items() if column_type is not None}
 
 def fips_to_abm_by_year(df):
     """Joins the abm feature to a dataset based on FIPS code using the yearly
@@ -31,12 +47,8 @@ def fips_to_abm_by_year(df):
     Returns:
         df_with_abm -- the dataframe with abm joined
     """
-    # read in the fips/abm map and subset out the fips/abm columns
-    fips_abm_map = pd.read_csv(YEARLY_ABM_FIPS_MAP)
-    fips_abm_map = fips_abm_map[['fips', 'abm', 'year']]
-    
-    # merge with the dataframe on fips
-    df_with_abm = df.merge(fips_abm_map, on=['fips', 'year'])
+    # look up the abm by fips and year, dropping the rows without one
+    df_with_abm = join_abm(df, fips_abm_lookup(), how='inner')
     
     # drop the fips feature
     df_with_abm = df_with_abm.drop(columns=['fips'])
@@ -52,7 +64,7 @@ def import_2023_product_list():
     Returns:
         prod_list_23 -- the product list data series
     """
-    prod_list_23 = pd.read_csv(DATA_DIR + PROD_LIST_23)
+    prod_list_23 = load_source('prod_list_23')
     
     return prod_list_23
 
@@ -66,7 +78,7 @@ def merge_2021_sales_data(df, abm_Teamkey):
         df_merged
     """
     # read in the 2021 sales data
-    sales_2021 = pd.read_csv(DATA_DIR + SALES_2021)
+    sales_2021 = load_source('sales_2021', copy=False)
     
     # grab relevant columns
     sales_2021_subset = sales_2021[['Team', 'VARIETY', 'CY Net Sales',
@@ -116,7 +128,7 @@ def merge_2021_sales_data(df, abm_Teamkey):
     
     # merge in the order data
     sales_2021_monthly = merge_2021_sales_data_w_date(df=sales_2021_agg,
-                                                      abm_Teamkey=abm_Teamkey)    
+                                                      order_index=read_order_index(abm_Teamkey))
     
         
     # merge the lagged parts
@@ -139,78 +151,10 @@ def merge_2022_sales_data(df, abm_Teamkey):
     Returns:
         df_merged -- the fully merged dataframe
     """
-    # read in the 2022 data
-    sales_2022 = pd.read_csv(DATA_DIR + SALES_2022)
-        
-    # grab relevant columns
-    sales_2022_subset = sales_2022[['MK_YR', 'EFFECTIVE_DATE', 'BRAND_FAMILY_DESCR',
-                                    'SPECIE_DESCR', 'VARIETY_NAME', 'SLS_LVL_2_ID',
-                                    'SUM(ORDER_QTY_TO_DATE)']]
-    
-    # get the asgrow soybeans
-    sales_asgrow = sales_2022_subset[
-            sales_2022_subset['BRAND_FAMILY_DESCR'] == 'NATIONAL'].reset_index(drop=True)
-    sales_soybeans = sales_asgrow[sales_asgrow['SPECIE_DESCR'] == 'SOYBEAN'].reset_index(drop=True)
-    
-    # drop those columns
-    sales_soybeans = sales_soybeans.drop(columns=['BRAND_FAMILY_DESCR',
-                                                  'SPECIE_DESCR'])
-    
-    # rename the columns
-    sales_soybeans = sales_soybeans.rename(columns={'MK_YR': 'year',
-                                                    'SLS_LVL_2_ID': 'TEAM_KEY',
-                                                    'VARIETY_NAME': 'Variety_Name',
-                                                    'EFFECTIVE_DATE': 'date',
-                                                    'SUM(ORDER_QTY_TO_DATE)': 'order_Q'})
-    
-    # remove any variety names with "Empty"
-    sales_soybeans = sales_soybeans[
-            sales_soybeans['Variety_Name'] != '(Empty)'].reset_index(drop=True)
-        
-    sales_soybeans = sales_soybeans.merge(abm_Teamkey, on=['TEAM_KEY'], how='left')
-    
-    sales_soybeans = sales_soybeans.drop(columns=['TEAM_KEY'])
-    sales_soybeans['year'] = '2022'
-            
-    # change the date column to a datetime
-    # grab the year, month, and day values from the date field
-    sales_dates = sales_soybeans['date'].astype(str).to_frame()
-    sales_dates['year'] = sales_dates['date'].str[:4]
-    sales_dates['month'] = sales_dates['date'].str[4:6]
-    sales_dates['day'] = sales_dates['date'].str[6:8]
-    sales_dates = sales_dates.drop(columns=['date'])
-    
-    sales_dates['EFFECTIVE_DATE'] = pd.to_datetime(sales_dates)
-    sales_soybeans['EFFECTIVE_DATE'] = sales_dates['EFFECTIVE_DATE'].copy()
-    sales_soybeans = sales_soybeans.drop(columns=['date'])
-    
-    # only grab orders after certain date
-    months=[9, 10, 11, 12, 1, 2, 3, 4, 5, 6, 7, 8]
-    year = 2022
-    
-    # create the total monthly dataframe
-    sales_monthly_total = sales_soybeans[
-            ['year', 'abm', 'Variety_Name']].drop_duplicates().reset_index(drop=True)
-    
-    for month in months:
-        print("month", month)
-        if month > 8:
-            date_mask = dt.datetime(year = int(year) - 1, month = month, day = monthrange(int(year) - 1, month)[1])
-            
-        if month <= 8:
-            date_mask = dt.datetime(year = int(year), month = month, day = monthrange(int(year), month)[1])
-            
-        sales_monthly = sales_soybeans[sales_soybeans['EFFECTIVE_DATE'] <= date_mask].copy().reset_index(drop = True)
-        
-        sales_monthly = sales_monthly.groupby(
-                by=['year','Variety_Name', 'abm'], as_index=False).sum().reset_index(drop = True)
-        
-        # rename 
-        sales_monthly = sales_monthly.rename(columns = {'order_Q': 'order_Q_month_' + str(month)})
-            
-        # merge with df_monthly_total 
-        sales_monthly_total = sales_monthly_total.merge(
-                sales_monthly, on=['year', 'Variety_Name', 'abm'], how='left')
+    # read the orders up to the end of each month of the season off the
+    # as-of index of the dated orders
+    sales_monthly_total = orders_as_of(read_order_index(abm_Teamkey),
+                                       month_end_cutoffs(year=2022), where={'year': '2022'})
     
     sales_monthly_total = sales_monthly_total.fillna(0)
     
@@ -249,21 +193,7 @@ def read_2022_CF_data():
     Returns:
         CF_2022 -- the y + 1 forecast for 2022
     """
-    big_cf_file = pd.read_csv(DATA_DIR + BIG_CF_FILE)
-    
-    # grab the forecast year 2022 piece
-    big_cf_file_2022 = big_cf_file[big_cf_file['FORECAST_YEAR'] == 2021].reset_index(drop=True)
-    
-    # subset out columns
-    big_cf_file_2022 = big_cf_file_2022[['FORECAST_YEAR', 'TEAM_KEY', 'ACRONYM_NAME',
-                                         'TEAM_Y1_FCST_1']]
-    
-    # rename the columns
-    CF_2022 = big_cf_file_2022.copy().rename(
-            columns={'FORECAST_YEAR': 'year',
-                     'ACRONYM_NAME': 'Variety_Name'})
-        
-    CF_2022['year'] = 2022
+    CF_2022 = read_y1_CF_data(year=2022, file_name=BIG_CF_FILE)
     
     return CF_2022
 
@@ -276,21 +206,7 @@ def read_2023_CF_data():
     Returns:
         CF_2023 -- the y + 1 forecast for 2023
     """
-    cf_file = pd.read_excel(DATA_DIR + CF_2022_FILE)
-    
-    # grab the forecast year 2022 piece
-    cf_file_2023 = cf_file[cf_file['FORECAST_YEAR'] == 2022].reset_index(drop=True)
-    
-    # subset out columns
-    cf_file_2023 = cf_file_2023[['FORECAST_YEAR', 'TEAM_KEY', 'ACRONYM_NAME',
-                                 'TEAM_Y1_FCST_1']]
-    
-    # rename the columns
-    CF_2023 = cf_file_2023.copy().rename(
-            columns={'FORECAST_YEAR': 'year',
-                     'ACRONYM_NAME': 'Variety_Name'})
-        
-    CF_2023['year'] = 2023
+    CF_2023 = read_y1_CF_data(year=2023, file_name=CF_2022_FILE)
     
     return CF_2023
 
@@ -303,22 +219,41 @@ def read_2024_CF_data():
     Returns:
         CF_2024 -- the y + 1 forecast for 2024
     """
-    cf_file = pd.read_excel(DATA_DIR + CF_2023_FILE)
+    CF_2024 = read_y1_CF_data(year=2024, file_name=CF_2023_FILE)
+    
+    return CF_2024
 
-    cf_file_2024 = cf_file[cf_file['FORECAST_YEAR'] == 2023].reset_index(drop=True)
+
+def read_y1_CF_data(year, file_name=None):
+    """Reads in a year's y + 1 consensus forecast data, the piece of the file
+    forecast in the year before.
+    
+    Keyword arguments:
+        year -- the year being forecast
+        file_name -- the CSV or Excel file in DATA_DIR, CF_Y1_FILES[year] by default
+    Returns:
+        CF_year -- the y + 1 forecast for the year
+    """
+    if file_name is None:
+        file_name = CF_Y1_FILES[year]
+    
+    cf_file = load_file(DATA_DIR + file_name, copy=False)
+    
+    # grab the piece forecast the year before
+    cf_file_year = cf_file[cf_file['FORECAST_YEAR'] == year - 1].reset_index(drop=True)
     
     # subset out columns
-    cf_file_2024 = cf_file_2024[['FORECAST_YEAR', 'TEAM_KEY', 'ACRONYM_NAME',
+    cf_file_year = cf_file_year[['FORECAST_YEAR', 'TEAM_KEY', 'ACRONYM_NAME',
                                  'TEAM_Y1_FCST_1']]
     
     # rename the columns
-    CF_2024 = cf_file_2024.copy().rename(
+    CF_year = cf_file_year.copy().rename(
             columns={'FORECAST_YEAR': 'year',
                      'ACRONYM_NAME': 'Variety_Name'})
-
-    CF_2024['year'] = 2024
+        
+    CF_year['year'] = year
     
-    return CF_2024
+    return CF_year
 
 def read_abm_teamkey_file():
     """ Reads in and returns the abm and teamkey data as a dataframe.
@@ -330,8 +265,7 @@ def read_abm_teamkey_file():
     """
     
     # read in data
-    abm_Teamkey_Address = DATA_DIR + ABM_TABLE
-    abm_Teamkey = pd.read_csv(abm_Teamkey_Address)
+    abm_Teamkey = load_source('abm_table', copy=False)
     
     # rename columns 
     abm_Teamkey = abm_Teamkey.rename(columns = {'Old Area ID':'abm', 'New Area ID':'TEAM_KEY'})
@@ -420,7 +354,7 @@ def read_CY_CF_data():
         cy_CF -- the current year consensus forecast data
     """
     # read in the file
-    big_cf_file = pd.read_csv(DATA_DIR + BIG_CF_FILE)
+    big_cf_file = load_source('big_cf', copy=False)
     
     # subset relevant columns
     big_cf_file_subset = big_cf_file[['FORECAST_YEAR', 'TEAM_KEY', 'ACRONYM_NAME']]
@@ -433,6 +367,34 @@ def read_CY_CF_data():
     return cy_CF
 
 
+def read_dated_orders(abm_Teamkey):
+    """Reads every dated order of the sales files, the yearly files through
+    2020, the 2021 and 2022 DSM files, and the 2023 D1 MS file. The DSM files
+    only have orders, so their returns, replants, and net sales are 0.
+    
+    Keyword arguments:
+        abm_Teamkey -- the team key to abm converter
+    Returns:
+        orders -- the dataframe of the orders, returns, replants, and net
+            sales by year, product, abm, and effective date
+    """
+    ORDER_COLUMNS = ['year', 'Variety_Name', 'abm', 'EFFECTIVE_DATE', 'order_Q',
+                     'return_Q', 'replant_Q', 'nets_Q']
+    
+    orders = read_years(read_yearly_orders, SALES_YEARS, abm_Teamkey=abm_Teamkey)
+    for source, year in [('sales_2021_w_date', 2021), ('sales_2022', 2022)]:
+        orders.append(read_dated_orders_file(source=source, year=year,
+                                             abm_Teamkey=abm_Teamkey))
+    orders.append(prepare_2023_D1MS(sales_23=load_source('sales_2023_d1ms', copy=False),
+                                    abm_Teamkey=abm_Teamkey))
+    
+    orders = pd.concat(orders).reset_index(drop=True)
+    orders[['return_Q', 'replant_Q', 'nets_Q']] = orders[
+            ['return_Q', 'replant_Q', 'nets_Q']].fillna(0)
+    
+    return orders[ORDER_COLUMNS]
+
+
 def read_kynetic_data():
     """Reads in the kynetic data.
     
@@ -443,8 +405,7 @@ def read_kynetic_data():
             feature added
     """
     # read in the kynetic data
-    kynetic_df = pd.read_csv(DATA_DIR + KYNETIC_DATA, low_memory=False,
-                             sep=',', thousands=',')
+    kynetic_df = load_source('kynetic', copy=False)
     
     # drop unwanted columns
     kynetic_df_abbr = kynetic_df.drop(columns=KYNETIC_COLUMNS_TO_DROP)
@@ -465,6 +426,29 @@ def read_kynetic_data():
     return kynetic_df_with_abm
 
 
+def read_order_index(abm_Teamkey):
+    """Loads the as-of index of the dated orders (see read_dated_orders), so
+    the orders, returns, replants, and net sales of every year, product, and
+    abm can be looked up as of any date with order_curves.orders_as_of or
+    order_curves.order_snapshot. The index is kept in the stage cache and only
+    rebuilt when the sales files or the code reading them change.
+    
+    Keyword arguments:
+        abm_Teamkey -- the team key to abm converter
+    Returns:
+        order_index -- the order index, see order_curves.build_order_index
+    """
+    files = [DATA_DIR + SALES_DIR + str(year) + '.csv' for year in SALES_YEARS]
+    files = files + [source_path('sales_2021_w_date'), source_path('sales_2022'),
+                     source_path('sales_2023_d1ms'), source_path('abm_table')]
+    
+    order_index = load_order_index('dated_orders', read_dated_orders, files=files,
+                                   values=['order_Q', 'return_Q', 'replant_Q', 'nets_Q'],
+                                   abm_Teamkey=abm_Teamkey)
+    
+    return order_index
+
+
 def read_performance():
     """ Reads in and returns the performance data as a dataframe.
     
@@ -474,17 +458,8 @@ def read_performance():
         Peformance_2011_2022 -- the dataframe of the performance data from 2011 to 2019
     """
     
-    # create a list to store all H2H data
-    dfs_path = []
-    for i in range(2011, 2023):
-        print("Read ", str(i), "H2H Data")
-        dfi_path = DATA_DIR + H2H_DIR + 'Combined_H2H'+ str(i) + '.csv'
-        dfi = pd.read_csv(dfi_path)
-        
-        # set a year parameter to be the year
-        dfi['year'] = i + 1
-        dfs_path.append(dfi)
-            
+    # read all H2H data, a file per year
+    dfs_path = read_years(read_performance_year, H2H_YEARS)
         
     # concatenate all H2H data
     Performance_2011_2023 = pd.concat(dfs_path)
@@ -499,112 +474,43 @@ def read_performance():
     return Performance_2011_2023
 
 
-def read_sales_filepath(abm_Teamkey):
+def read_performance_year(year):
+    """Reads in one year of the H2H performance data.
+    
+    Keyword arguments:
+        year -- the year of the H2H file
+    Returns:
+        dfi -- the performance data, with the year set to the next year
+    """
+    print("Read ", str(year), "H2H Data")
+    dfi_path = DATA_DIR + H2H_DIR + 'Combined_H2H'+ str(year) + '.csv'
+    dfi = pd.read_csv(dfi_path)
+    
+    # set a year parameter to be the year
+    dfi['year'] = year + 1
+    
+    return dfi
+
+
+def read_sales_filepath(abm_Teamkey, yearly_sales=None):
     """ Reads in and returns the sales data as a dataframe.
     
     Keyword arguments:
-        None
+        abm_Teamkey -- the team key to abm converter
+        yearly_sales -- the sales from the yearly files, as returned by
+            read_yearly_sales for each of SALES_YEARS. read from the files when
+            not given
     Returns:
-        Sale_2012_2020 -- the dataframe of the yealry sales data from 2012 to 2020
-        df_clean_sale -- the dataframe of clean sales data with effective date
+        Sale_2012_2024 -- the dataframe of the sales data from 2012 to 2024
     """
     # preprocess sales 2020 sales data to get consistent abm data  
     #Preprocess_2020_sale()
 
-    # define a list to store all sales data 
-    dfs_path = []
-    
-    # define a list to store the FULL datasets
-    dfs_full = []
-
     # read in the data by year 
-    for year in range(2012, 2021):
-        print("Read ", str(year), " Sales Data")
-        dfi_path = DATA_DIR + SALES_DIR + str(year) + '.csv'
-        dfi = pd.read_csv(dfi_path)
-        
-        dfi = dfi[dfi['SPECIE_DESCR'] == 'SOYBEAN'].reset_index(drop=True)
-        
-        # set a year parameter to be the year 
-        dfi['year'] = year
-        
-        # convert the effective date to a datetime format in order to set the mask 
-        dfi['EFFECTIVE_DATE'] = pd.to_datetime(dfi['EFFECTIVE_DATE'])
-        
-        # set 2020 abms to old format
-        if year == 2020:
-            dfi = dfi.rename(columns = {'SLS_LVL_2_ID':"TEAM_KEY"})
-            dfi = dfi.merge(abm_Teamkey, how = 'left', on = ['TEAM_KEY'])
-            dfi = dfi.rename(columns = {'abm':'SLS_LVL_2_ID'})
-            dfi = dfi.drop(columns=['TEAM_KEY'])
-        
-        # set the date mask
-        date_mask = dt.datetime(year = int(year),
-                                month = EFFECTIVE_DATE['month'],
-                                day = EFFECTIVE_DATE['day'])
-        
-        # remove stuff after the effective date
-        dfi_masked = dfi[dfi['EFFECTIVE_DATE'] <= date_mask].copy().reset_index(drop=True)
-        
-        # add modified dataframe to the list 
-        dfs_path.append(dfi_masked.copy())
-        dfs_full.append(dfi.copy())
-      
-    # concate all dataframes  
-    Sale_2012_2020 = pd.concat(dfs_path).reset_index(drop=True)
-    
-    Sale_2012_2020_full = pd.concat(dfs_full).reset_index(drop=True)
-    
-    # rename the columns 
-    SALES_COLUMN_NAMES = {'year': 'year', 'SPECIE_DESCR': 'crop',
-                          'SLS_LVL_2_ID': 'abm', 'VARIETY_NAME': 'Variety_Name',
-                          'NET_SALES_QTY_TO_DATE': 'nets_Q',
-                          'ORDER_QTY_TO_DATE': 'order_Q',
-                          'RETURN_QTY_TO_DATE': 'return_Q',
-                          'REPLANT_QTY_TO_DATE': 'replant_Q'}
-    
-    # 'eoy' means 'end of year'
-    FULL_COLUMN_NAMES = {'year': 'year', 'SPECIE_DESCR': 'crop',
-                          'SLS_LVL_2_ID': 'abm', 'VARIETY_NAME': 'Variety_Name',
-                          'NET_SALES_QTY_TO_DATE': 'nets_Q_eoy'}
-    
-    Sale_2012_2020 = Sale_2012_2020.rename(columns = SALES_COLUMN_NAMES)
-    Sale_2012_2020_full = Sale_2012_2020_full.rename(columns=FULL_COLUMN_NAMES)
-    
-    # select the soybean crop 
-    Sale_2012_2020 = Sale_2012_2020[
-            Sale_2012_2020['BRAND_FAMILY_DESCR'] == 'NATIONAL'].reset_index(drop=True)
-    Sale_2012_2020_full = Sale_2012_2020_full[
-            Sale_2012_2020_full['BRAND_FAMILY_DESCR'] == 'NATIONAL'].reset_index(drop=True)
-    
-    # set year as str
-    Sale_2012_2020['year'] = Sale_2012_2020['year'].astype(str)
-    Sale_2012_2020_full['year'] = Sale_2012_2020_full['year'].astype(str)
-    
-    
-    # drop unnecessary columns for yearly sales
-    SALES_COLUMNS_TO_DROP_Yearly = ['BRAND_FAMILY_DESCR', 'EFFECTIVE_DATE',
-                                    'DEALER_ACCOUNT_CY_BRAND_FAMILY',
-                                    'SHIPPING_STATE_CODE', 'SHIPPING_COUNTY',
-                                    'SHIPPING_FIPS_CODE', 'SLS_LVL_1_ID', 'CUST_ID',
-                                    'ACCT_ID', 'NET_SHIPPED_QTY_TO_DATE']
-    
-    Sale_2012_2020 = Sale_2012_2020.drop(columns=SALES_COLUMNS_TO_DROP_Yearly)
-    
-    # reorder the columns
-    Sale_2012_2020 = Sale_2012_2020[['year', 'abm', 'Variety_Name', 
-                                    'nets_Q', 'order_Q', 'return_Q','replant_Q']]
-    Sale_2012_2020_full = Sale_2012_2020_full[['year', 'abm', 'Variety_Name','nets_Q_eoy']]
-    
-    Sale_2012_2020 = Sale_2012_2020.groupby(by=['year', 'Variety_Name', 'abm'],
-                                            as_index=False).sum()
-    Sale_2012_2020_full = Sale_2012_2020_full.groupby(by=['year', 'Variety_Name', 'abm'],
-                                                      as_index=False).sum()
-
-    # merge the eoy values
-    Sale_2012_2020  = Sale_2012_2020.merge(Sale_2012_2020_full,
-                                           on=['year', 'Variety_Name', 'abm'],
-                                           how='left')
+    if yearly_sales is None:
+        yearly_sales = pd.concat(read_years(read_yearly_sales, SALES_YEARS,
+                                            abm_Teamkey=abm_Teamkey)).reset_index(drop=True)
+    Sale_2012_2020 = yearly_sales.copy()
     
     # add the 2021 data
     Sale_2012_2021 = merge_2021_sales_data_impute_daily(df=Sale_2012_2020,
@@ -621,7 +527,7 @@ def read_sales_filepath(abm_Teamkey):
                                      abm_Teamkey=abm_Teamkey)
     
     # add in 2024 product list
-    product_list_24 = pd.read_csv(PROD_LIST_24)
+    product_list_24 = load_source('prod_list_24', copy=False)
     product_list_24 = product_list_24[['ACRONYM_NAME', 'TEAM_KEY']].merge(
             abm_Teamkey, on=['TEAM_KEY'], how='left').drop(columns=['TEAM_KEY'])
     
@@ -641,31 +547,140 @@ def read_sales_filepath(abm_Teamkey):
 
 
 
-def read_SRP():
+def read_yearly_sales(year, abm_Teamkey):
+    """Reads in one of the yearly sales files and aggregates the sales to date
+    and the end of year net sales by year, product, and abm. Only the columns
+    used are read, and with SALES_CHUNK_SIZE set the file is read and summed a
+    chunk at a time.
+    
+    Keyword arguments:
+        year -- the year of the sales file
+        abm_Teamkey -- the team key to abm converter
+    Returns:
+        Sale_year -- the dataframe of the yearly sales
+    """
+    print("Read ", str(year), " Sales Data")
+    dfi_path = DATA_DIR + SALES_DIR + str(year) + '.csv'
+    Sale_year = read_csv_grouped(
+            dfi_path,
+            aggregate_chunk=lambda dfi: aggregate_yearly_sales(dfi=dfi, year=year,
+                                                               abm_Teamkey=abm_Teamkey),
+            by=['year', 'Variety_Name', 'abm'],
+            chunk_size=SALES_CHUNK_SIZE,
+            usecols=list(SALES_COLUMN_TYPES),
+            dtype=SALES_COLUMN_DTYPES)
+    
+    # keep the products/abms with sales to date
+    Sale_year = Sale_year[Sale_year['rows_to_date'] > 0].reset_index(drop=True)
+    Sale_year = Sale_year.drop(columns=['rows_to_date'])
+    
+    return Sale_year
+
+
+def aggregate_yearly_sales(dfi, year, abm_Teamkey):
+    """Sums the rows of a yearly sales file by year, product, and abm, both up
+    to the effective date and to the end of the year, in a single groupby.
+    
+    Keyword arguments:
+        dfi -- the rows of the yearly sales file, or a chunk of them
+        year -- the year of the sales file
+        abm_Teamkey -- the team key to abm converter
+    Returns:
+        Sale_year -- the sums, with the number of rows up to the effective
+            date as rows_to_date
+    """
+    dfi = prepare_yearly_sales(dfi=dfi, year=year, abm_Teamkey=abm_Teamkey)
+    
+    # set the date mask
+    date_mask = dt.datetime(year = int(year),
+                            month = EFFECTIVE_DATE['month'],
+                            day = EFFECTIVE_DATE['day'])
+    
+    # the sales to date only count the rows up to the effective date, the end
+    # of year net sales count every row
+    to_date = (dfi['EFFECTIVE_DATE'] <= date_mask).values
+    
+    dfi['nets_Q_eoy'] = dfi['nets_Q']
+    for column in ['nets_Q', 'order_Q', 'return_Q', 'replant_Q']:
+        dfi[column] = dfi[column].where(to_date, 0)
+    dfi['rows_to_date'] = to_date.astype(int)
+    
+    Sale_year = dfi[['year', 'Variety_Name', 'abm', 'nets_Q', 'order_Q', 'return_Q',
+                     'replant_Q', 'nets_Q_eoy', 'rows_to_date']].groupby(
+            by=['year', 'Variety_Name', 'abm'], as_index=False).sum()
+    
+    return Sale_year
+
+
+def prepare_yearly_sales(dfi, year, abm_Teamkey):
+    """Selects the national brand soybean rows of a yearly sales file, with
+    the abm names of the other years, the pipeline's column names, and the
+    effective date as a datetime.
+    
+    Keyword arguments:
+        dfi -- the rows of the yearly sales file, or a chunk of them
+        year -- the year of the sales file
+        abm_Teamkey -- the team key to abm converter
+    Returns:
+        dfi -- the dated sales by year, product, and abm
+    """
+    # rename the columns 
+    SALES_COLUMN_NAMES = {'SLS_LVL_2_ID': 'abm', 'VARIETY_NAME': 'Variety_Name',
+                          'NET_SALES_QTY_TO_DATE': 'nets_Q',
+                          'ORDER_QTY_TO_DATE': 'order_Q',
+                          'RETURN_QTY_TO_DATE': 'return_Q',
+                          'REPLANT_QTY_TO_DATE': 'replant_Q'}
+    
+    # select the national brand soybeans
+    dfi = dfi[(dfi['SPECIE_DESCR'] == 'SOYBEAN') &
+              (dfi['BRAND_FAMILY_DESCR'] == 'NATIONAL')].reset_index(drop=True)
+    
+    # set 2020 abms to old format
+    if year == 2020:
+        dfi = dfi.rename(columns = {'SLS_LVL_2_ID':"TEAM_KEY"})
+        dfi = dfi.merge(abm_Teamkey, how = 'left', on = ['TEAM_KEY'])
+        dfi = dfi.rename(columns = {'abm':'SLS_LVL_2_ID'})
+        dfi = dfi.drop(columns=['TEAM_KEY'])
+    
+    dfi['EFFECTIVE_DATE'] = pd.to_datetime(dfi['EFFECTIVE_DATE'])
+    
+    dfi = dfi.rename(columns = SALES_COLUMN_NAMES)
+    dfi['year'] = str(year)
+    
+    return dfi
+
+
+def read_yearly_orders(year, abm_Teamkey):
+    """Reads the dated national brand soybean sales of one of the yearly
+    sales files, without summing them.
+    
+    Keyword arguments:
+        year -- the year of the sales file
+        abm_Teamkey -- the team key to abm converter
+    Returns:
+        orders -- the dataframe of the sales by year, product, abm, and
+            effective date
+    """
+    orders = pd.read_csv(DATA_DIR + SALES_DIR + str(year) + '.csv',
+                         usecols=list(SALES_COLUMN_TYPES), dtype=SALES_COLUMN_DTYPES)
+    
+    return prepare_yearly_sales(dfi=orders, year=year, abm_Teamkey=abm_Teamkey)
+
+
+def read_SRP(yearly_SRP=None):
     """Reads in the SRP data.
     
     Keyword arguments:
-        None
+        yearly_SRP -- the historical SRP files, as returned by read_SRP_year for
+            each of SRP_YEARS. read from the files when not given
     Returns: 
-        SRP_2011_2020 -- the fully concatenated SRP values from 2011 to 2020
+        SRP_2011_2024 -- the fully concatenated SRP values from 2011 to 2024
     """
     
-    # define a list to store all SRP data
-    dfs_path = []
-    
     # read in the historical data and concatenate each file from 2011 to 2019
-    for year in range(2011, 2020):
-        print("Read ", str(year), "SRP Data")
-        dfi_path = DATA_DIR + HISTORICAL_SRP + str(year) + '_SRP.csv'
-        
-        dfi = pd.read_csv(dfi_path)
-        
-        # set a year parameter to be the year 
-        dfi['year'] = year
-        dfs_path.append(dfi)
-    
-    # concatenate all dataframes    
-    SRP_2011_2019 = pd.concat(dfs_path).reset_index(drop=True)
+    if yearly_SRP is None:
+        yearly_SRP = pd.concat(read_years(read_SRP_year, SRP_YEARS))
+    SRP_2011_2019 = yearly_SRP.reset_index(drop=True)
     
     # select required columns
     SRP_2011_2019 = SRP_2011_2019[['year', 'VARIETY', 'SRP']]
@@ -746,6 +761,24 @@ def read_SRP():
     return SRP_2011_2024
 
 
+def read_SRP_year(year):
+    """Reads in one of the historical SRP files.
+    
+    Keyword arguments:
+        year -- the year of the SRP file
+    Returns:
+        dfi -- the SRP data for the year
+    """
+    print("Read ", str(year), "SRP Data")
+    dfi_path = DATA_DIR + HISTORICAL_SRP + str(year) + '_SRP.csv'
+    dfi = pd.read_csv(dfi_path)
+    
+    # set a year parameter to be the year 
+    dfi['year'] = year
+    
+    return dfi
+
+
 def read_soybean_trait_map():
     """Reads in the SRP data.
     
@@ -777,39 +810,180 @@ def read_state_county_fips():
     return State_fips, County_fips
 
 
-def read_weather_filepath():
+def read_weather_filepath(years=None):
     """Reads in the Blizzard data and concatenates it into a single dataframe.
-       Reads in the county_locations data 
-       Reads in the abm_years
+       Loads the grid index of the county_locations data
+       Loads the compiled abm_years lookup
     
     Keyword arguments:
-        years -- the years we want to read the data for
+        years -- the years we want to read the data for, WEATHER_YEARS by
+            default
     Returns:
         Weather_2012_2020 -- the dataframe of all the county level blizzard data
-        County_Location - the dataframe of all fips code w.r.t lati and long
-        FIPS_abm - the dataframe of all fips w.r.t abm and year 
+        County_Grid - the grid index of the fips codes by lati and long
+        FIPS_abm_lookup - the compiled lookup of abm by fips and year, the last
+            year of the map carrying forward to later years
         
     """
-    # define a list to store all weather data 
-    dfs_path = []
+    # read in the data by year and concatenate it
+    if years is None:
+        years = WEATHER_YEARS
+    Weather_2012_2020 = pd.concat(read_years(read_weather_year,
+                                             years)).reset_index(drop = True)
+    
+    County_Grid, FIPS_abm_lookup = read_weather_maps()
+    
+    return Weather_2012_2020, County_Grid, FIPS_abm_lookup
+
+
+def read_weather_chunks(year, chunk_size=None):
+    """Reads in one year of the Blizzard data a chunk of rows at a time, only
+    the columns the pipeline uses, from the columnar store with WEATHER_STORE
+    and from the CSV otherwise (see read_weather_year).
+    
+    Keyword arguments:
+        year -- the year of the Blizzard file
+        chunk_size -- the number of rows in each chunk, None reads the year
+            in one chunk
+    Returns:
+        chunks -- the iterator of the chunks of the county level blizzard data
+    """
+    if chunk_size is None:
+        return iter([read_weather_year(year=year)])
+    
+    print("Read ", str(year), " Weather Data in chunks of ", chunk_size, " rows")
+    chunks = None
+    if WEATHER_STORE == True:
+        try:
+            chunks = iter_weather_partition(year, chunk_size=chunk_size)
+        except ImportError as error:
+            print("Could not use the weather store (", error, "), reading the CSV")
+    
+    if chunks is None:
+        chunks = pd.read_csv(blizzard_csv_path(year), usecols=list(WEATHER_COLUMN_TYPES),
+                             chunksize=chunk_size)
+    
+    # set year as str
+    return (chunk[list(WEATHER_COLUMN_TYPES)].assign(year=chunk['year'].astype(str))
+            for chunk in chunks)
+
+
+def read_weather_grouped(years, County_Grid, FIPS_abm_lookup):
+    """Reads in the Blizzard data and sums it by year, month, and abm as it's
+    read, the years at the same time in a process pool (see
+    read_weather_year_grouped). Only one chunk of each year's rows and the
+    sums are ever in memory, never all the years' rows.
+    
+    Keyword arguments:
+        years -- the years we want to read the data for
+        County_Grid -- the grid index of the fips codes by lati and long
+        FIPS_abm_lookup -- the compiled lookup of abm by fips and year
+    Returns:
+        weather_sums -- the sums and rows of the weather features by year,
+            month, and abm, see preprocess.weather_partial_sums
+    """
+    # the years are separate groups, so their sums only need stacking
+    weather_sums = pd.concat(read_years(read_weather_year_grouped, years,
+                                        County_Grid=County_Grid,
+                                        FIPS_abm_lookup=FIPS_abm_lookup)).reset_index(drop=True)
+    
+    return weather_sums
+
+
+def read_weather_maps():
+    """Loads the grid index of the county_locations data and the compiled
+    abm_years lookup.
+    
+    Keyword arguments:
+        None
+    Returns:
+        County_Grid - the grid index of the fips codes by lati and long
+        FIPS_abm_lookup - the compiled lookup of abm by fips and year, the last
+            year of the map carrying forward to later years
+    """
+    County_Grid = grid_fips_index()
+    
+    FIPS_abm_lookup = fips_abm_lookup()
+    
+    return County_Grid, FIPS_abm_lookup
+
+
+def read_weather_year(year):
+    """Reads in one year of the Blizzard data, only the columns the pipeline
+    uses. With WEATHER_STORE the year is read from the columnar store, and
+    from the CSV if the store can't be written (e.g. without pyarrow).
+    
+    Keyword arguments:
+        year -- the year of the Blizzard file
+    Returns:
+        dfi -- the county level blizzard data for the year
+    """
+    print("Read ", str(year), " Weather Data")
+    dfi = None
+    if WEATHER_STORE == True:
+        try:
+            dfi = read_weather_partition(year)
+        except ImportError as error:
+            print("Could not use the weather store (", error, "), reading the CSV")
+    
+    if dfi is None:
+        dfi = pd.read_csv(blizzard_csv_path(year), usecols=list(WEATHER_COLUMN_TYPES))
+        dfi = dfi[list(WEATHER_COLUMN_TYPES)]
+    
+    # set year as str
+    dfi['year'] = dfi['year'].astype(str)
+    
+    return dfi
+
+
+def read_weather_year_grouped(year, County_Grid, FIPS_abm_lookup):
+    """Reads in one year of the Blizzard data WEATHER_CHUNK_SIZE rows at a
+    time, adding the FIPS and abm of each chunk and folding its sums by year,
+    month, and abm into the running sums. Writes the year's unmatched point
+    report once the whole year is read.
     
-    # read in the data by year
-    for i in range(2012, 2025):
-        print("Read ", str(i), " Weather Data")
-        dfi_path = BLIZZARD_DIR + 'Blizzard_' + str(i) + '.csv'
-        dfi = pd.read_csv(dfi_path)
+    Keyword arguments:
+        year -- the year of the Blizzard file
+        County_Grid -- the grid index of the fips codes by lati and long
+        FIPS_abm_lookup -- the compiled lookup of abm by fips and year
+    Returns:
+        weather_sums -- the sums and rows of the weather features by year,
+            month, and abm for the year
+    """
+    weather_sums = None
+    unmatched_points = None
+    for chunk in read_weather_chunks(year, chunk_size=WEATHER_CHUNK_SIZE):
+        Weather, chunk_unmatched = match_grid_fips(chunk, County_Grid)
+        chunk_sums = weather_partial_sums(join_abm(Weather, FIPS_abm_lookup, how='left'))
         
-        # add the dataframe to the list
-        dfs_path.append(dfi)
+        if weather_sums is None or len(weather_sums) == 0:
+            weather_sums = chunk_sums
+        elif len(chunk_sums) > 0:
+            weather_sums = pd.concat([weather_sums, chunk_sums]).groupby(
+                    by=['year', 'month', 'abm'], as_index=False).sum()
         
-    # concate all dataframes  
-    Weather_2012_2020 = pd.concat(dfs_path).reset_index(drop = True)
+        if unmatched_points is None:
+            unmatched_points = chunk_unmatched
+        else:
+            unmatched_points = pd.concat([unmatched_points, chunk_unmatched]).groupby(
+                    by=['year', 'latitude', 'longitude'], dropna=False, as_index=False).sum()
     
-    County_Location_Address = BLIZZARD_DIR + 'county_locations.csv'
-    County_Location = pd.read_csv(County_Location_Address)
+    if unmatched_points is not None:
+        report_unmatched_points(unmatched_points, years=[str(year)])
     
-    FIPS_abm_Address = YEARLY_ABM_FIPS_MAP #DATA_DIR + 'abm_years.csv'
-    FIPS_abm = pd.read_csv(FIPS_abm_Address)
+    return weather_sums
+
+
+def read_yearly_abm_map():
+    """Reads in the yearly fips/abm map, projecting the 2022 map forward to
+    2023 and 2024.
+    
+    Keyword arguments:
+        None
+    Returns:
+        FIPS_abm - the dataframe of all fips w.r.t abm and year 
+    """
+    FIPS_abm = load_source('yearly_abm_fips_map', copy=False)
     FIPS_abm = FIPS_abm[['year', 'fips', 'abm']]
     
     # set the 2023 data to be the same as the 2022
@@ -820,30 +994,53 @@ def read_weather_filepath():
     FIPS_abm_2024 = FIPS_abm[FIPS_abm['year'] == 2022]
     FIPS_abm_2024['year'] = 2024
     FIPS_abm = pd.concat([FIPS_abm, FIPS_abm_2024])
-
     
     # set year as str
-    Weather_2012_2020['year'] = Weather_2012_2020['year'].astype(str)
     FIPS_abm['year'] = FIPS_abm['year'].astype(str)
     
     # set fips to int in FIPS_abm
     FIPS_abm['fips'] = FIPS_abm['fips'].astype(int)
     
-    return Weather_2012_2020, County_Location, FIPS_abm
+    return FIPS_abm
 
 
 def supply_data(df):
     """Reads in historical supply data and sets the supply data for 2023 to be
     the 0.66x the Y1 consensus forecast
     """
-    hist_supply = pd.read_csv(HISTORICAL_SUPPLY)
+    df_w_supply = df.merge(supply_table(), on=['year', 'abm', 'hybrid'], how='left')
+    
+    df_w_supply = impute_supply(df=df_w_supply)
+    
+    return df_w_supply
+
+
+def supply_table():
+    """Reads in the historical supply data by year, abm, and hybrid.
+    
+    Keyword arguments:
+        None
+    Returns:
+        hist_supply -- the historical supply data
+    """
+    hist_supply = load_source('historical_supply')
     
     hist_supply['year'] = hist_supply['year'].astype(str)
     
-    df_w_supply = df.merge(hist_supply, on=['year', 'abm', 'hybrid'], how='left')
+    return hist_supply
+
+
+def impute_supply(df):
+    """Sets missing supply values to be the 1.33x the Y1 consensus forecast.
+    
+    Keyword arguments:
+        df -- the dataframe with the supply data merged
+    Returns:
+        df_w_supply -- the dataframe with the supply imputed
+    """
+    df_w_supply = df.copy()
     
     df_w_supply.loc[df_w_supply['avai_supply_region'].isna(), 'avai_supply_region'] = (
            1.33 * df_w_supply.loc[df_w_supply['avai_supply_region'].isna(), 'TEAM_Y1_FCST_1'])
     
-    
     return df_w_supply
\ No newline at end of file
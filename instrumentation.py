@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 15:05:22 2026
+
+@author: epnzv
+"""
+import datetime as dt
+import json
+import sys
+import time
+
+import pandas as pd
+
+from contextlib import contextmanager
+
+from aggregation_config import (RUN_REPORT_PATH)
+
+# the records of the steps measured in this process since the last reset
+RUN_RECORDS = []
+
+
+def frame_shape(obj):
+    """Returns the number of rows and columns of a stage input or output. A
+    tuple or list of dataframes is counted as the sum of its dataframes.
+
+    Keyword arguments:
+        obj -- a dataframe, a tuple/list of dataframes, or anything else
+    Returns:
+        rows -- the number of rows, None if obj holds no dataframes
+        columns -- the number of columns, None if obj holds no dataframes
+    """
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return obj.shape[0], (obj.shape[1] if obj.ndim == 2 else 1)
+
+    if isinstance(obj, (tuple, list)):
+        shapes = [frame_shape(item) for item in obj]
+        shapes = [shape for shape in shapes if shape[0] is not None]
+        if len(shapes) > 0:
+            return sum(shape[0] for shape in shapes), sum(shape[1] for shape in shapes)
+
+    return None, None
+
+
+def measure_call(name, func, kwargs, kind='stage'):
+    """Runs a function and measures it. Steps measured inside the function
+    (e.g. the merge steps of merge_all) are returned along with it, so this
+    also works in a worker process whose RUN_RECORDS the parent can't see.
+
+    Keyword arguments:
+        name -- the name of the step
+        func -- the function to run
+        kwargs -- the dictionary of keyword arguments of the function
+        kind -- the kind of step, e.g. 'stage'
+    Returns:
+        output -- the output of the function
+        records -- the list of records of the nested steps and of the call
+    """
+    start = len(RUN_RECORDS)
+
+    with track_step(name, inputs=list(kwargs.values()), kind=kind, records=[]) as step:
+        output = func(**kwargs)
+        step['output'] = output
+
+    records = RUN_RECORDS[start:] + [step]
+    del RUN_RECORDS[start:]
+
+    return output, records
+
+
+def peak_rss_mb():
+    """Returns the peak resident set size of this process in MB, None where the
+    resource module isn't available (Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+
+    return peak / 1024
+
+
+def reset_run_report():
+    """Clears the records of this process before a new run."""
+    del RUN_RECORDS[:]
+
+
+def summary_table(records):
+    """Formats the records as a table with one line per step.
+
+    Keyword arguments:
+        records -- the list of step records
+    Returns:
+        table -- the table as a string
+    """
+    def fmt(value, spec):
+        return '-' if value is None else format(value, spec)
+
+    lines = ['{:<45} {:<7} {:>9} {:>9} {:>9} {:>10} {:>10} {:>6}'.format(
+            'step', 'kind', 'wall s', 'cpu s', 'rss+ MB', 'rows in', 'rows out', 'cols')]
+    for record in records:
+        lines.append('{:<45} {:<7} {:>9} {:>9} {:>9} {:>10} {:>10} {:>6}'.format(
+                record['name'][:45], record['kind'],
+                fmt(record['wall_s'], '.2f'), fmt(record['cpu_s'], '.2f'),
+                fmt(record['peak_rss_delta_mb'], '.1f'),
+                fmt(record['rows_in'], 'd'), fmt(record['rows_out'], 'd'),
+                fmt(record['columns_out'], 'd')))
+
+    return '\n'.join(lines)
+
+
+@contextmanager
+def track_step(name, inputs=(), kind='step', records=None):
+    """Measures the wall time, CPU time, peak RSS growth, and input and output
+    shapes of a block. The block stores what it produced in step['output'].
+    The peak RSS delta is how far the block raised the process's high-water
+    mark, so a step that stays under an earlier peak records 0.
+
+    Keyword arguments:
+        name -- the name of the step
+        inputs -- the input dataframes, the first one (e.g. the left side of a
+            merge) gives rows_in and columns_in
+        kind -- the kind of step, e.g. 'stage' or 'merge'
+        records -- the list the record is appended to, RUN_RECORDS by default
+    Returns:
+        step -- the record of the step (yielded)
+    """
+    if records is None:
+        records = RUN_RECORDS
+
+    input_shapes = [list(frame_shape(obj)) for obj in inputs]
+    step = {'name': name, 'kind': kind}
+
+    rss_start = peak_rss_mb()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    try:
+        yield step
+    finally:
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        rss_end = peak_rss_mb()
+
+        # drop the output so the record doesn't keep the dataframe alive
+        rows_out, columns_out = frame_shape(step.pop('output', None))
+        step.update({'wall_s': wall,
+                     'cpu_s': cpu,
+                     'peak_rss_delta_mb': None if rss_start is None else rss_end - rss_start,
+                     'rows_in': input_shapes[0][0] if len(input_shapes) > 0 else None,
+                     'columns_in': input_shapes[0][1] if len(input_shapes) > 0 else None,
+                     'input_shapes': input_shapes,
+                     'rows_out': rows_out,
+                     'columns_out': columns_out})
+        records.append(step)
+
+
+def write_run_report(path=None, records=None):
+    """Writes the records of a run as a JSON report and prints the summary
+    table.
+
+    Keyword arguments:
+        path -- the path of the JSON report, RUN_REPORT_PATH by default
+        records -- the list of step records, RUN_RECORDS by default
+    Returns:
+        report -- the report dictionary
+    """
+    if path is None:
+        path = RUN_REPORT_PATH
+    if records is None:
+        records = RUN_RECORDS
+
+    report = {'created': dt.datetime.now().isoformat(timespec='seconds'),
+              'peak_rss_mb': peak_rss_mb(),
+              'steps': records}
+
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(summary_table(records))
+
+    return report
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 13:40:51 2026
+
+@author: epnzv
+"""
+import os
+
+import pandas as pd
+
+from aggregation_config import (EXPORT_CSV, INTERMEDIATE_COMPRESSION, INTERMEDIATE_DIR,
+                                INTERMEDIATE_FORMAT)
+
+# the file extension used by each intermediate format
+FORMAT_EXTENSIONS = {'parquet': '.parquet',
+                     'feather': '.feather',
+                     'pickle': '.pkl'}
+
+
+def intermediate_path(name, file_format=None):
+    """Returns the path of an intermediate. With no format given, this is the
+    path of whichever format of the intermediate exists on disk (the
+    configured one first), falling back to the configured format's path.
+
+    Keyword arguments:
+        name -- the name of the intermediate, e.g. 'Sale_all'
+        file_format -- 'parquet', 'feather', or 'pickle'
+    Returns:
+        path -- the path of the intermediate file
+    """
+    if file_format is not None:
+        return os.path.join(INTERMEDIATE_DIR, name + FORMAT_EXTENSIONS[file_format])
+
+    formats = [INTERMEDIATE_FORMAT] + [f for f in FORMAT_EXTENSIONS if f != INTERMEDIATE_FORMAT]
+    for candidate in formats:
+        path = os.path.join(INTERMEDIATE_DIR, name + FORMAT_EXTENSIONS[candidate])
+        if os.path.exists(path) == True:
+            return path
+
+    return os.path.join(INTERMEDIATE_DIR, name + FORMAT_EXTENSIONS[INTERMEDIATE_FORMAT])
+
+
+def read_intermediate(name, csv_path=None, dtype=None):
+    """Reads an intermediate written by write_intermediate. If it hasn't been
+    written in a columnar format yet, the CSV version is read instead, with
+    explicit dtypes so e.g. the year comes back as the same type it was
+    written with.
+
+    Keyword arguments:
+        name -- the name of the intermediate
+        csv_path -- the CSV to fall back to
+        dtype -- the dtypes used when reading the CSV, e.g. {'year': str}
+    Returns:
+        df -- the intermediate dataframe
+    """
+    path = intermediate_path(name)
+
+    if os.path.exists(path) == False:
+        if csv_path is None:
+            raise FileNotFoundError('no intermediate named ' + name)
+        return pd.read_csv(csv_path, dtype=dtype)
+
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    if path.endswith('.feather'):
+        return pd.read_feather(path)
+
+    return pd.read_pickle(path)
+
+
+def write_intermediate(df, name, csv_path=None):
+    """Writes an intermediate in the configured typed, compressed format.
+    Parquet and feather need pyarrow; without it, or for frames pyarrow can't
+    represent (e.g. object columns mixing ints and strings), the frame is
+    pickled instead, which also keeps the dtypes. The CSV is only written
+    when EXPORT_CSV is set.
+
+    Keyword arguments:
+        df -- the dataframe to write
+        name -- the name of the intermediate
+        csv_path -- the path of the CSV export
+    Returns:
+        path -- the path the intermediate was written to
+    """
+    os.makedirs(os.path.dirname(intermediate_path(name, INTERMEDIATE_FORMAT)), exist_ok=True)
+
+    # remove other formats of the same intermediate so a stale one is never read
+    for file_format in FORMAT_EXTENSIONS:
+        old_path = intermediate_path(name, file_format)
+        if os.path.exists(old_path) == True:
+            os.remove(old_path)
+
+    file_format = INTERMEDIATE_FORMAT
+    path = intermediate_path(name, file_format)
+
+    if file_format in ['parquet', 'feather']:
+        try:
+            # columnar formats need a default index
+            df_out = df.reset_index(drop=True)
+            if file_format == 'parquet':
+                df_out.to_parquet(path, compression=INTERMEDIATE_COMPRESSION, index=False)
+            else:
+                df_out.to_feather(path, compression=INTERMEDIATE_COMPRESSION)
+        except (ImportError, TypeError, ValueError) as error:
+            print("Could not write ", name, " as ", file_format, " (", error, "), pickling instead")
+            if os.path.exists(path) == True:
+                os.remove(path)
+            file_format = 'pickle'
+            path = intermediate_path(name, file_format)
+
+    if file_format == 'pickle':
+        df.to_pickle(path)
+
+    if EXPORT_CSV == True and csv_path is not None:
+        df.to_csv(csv_path, index=False)
+
+    return path
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:12:36 2026
+
+@author: epnzv
+"""
+import numpy as np
+import pandas as pd
+
+# the key domain each join key column is encoded in, Variety_Name and hybrid
+# are both product names so they share codes
+KEY_COLUMNS = {'year': 'year',
+               'abm': 'abm',
+               'Variety_Name': 'hybrid',
+               'hybrid': 'hybrid',
+               'TEAM_KEY': 'TEAM_KEY'}
+
+# the known values of each domain, a value's code is its position. values are
+# only ever appended, so a code never changes within a process
+KEY_DICTIONARY = {'abm': pd.Index([], dtype=object),
+                  'hybrid': pd.Index([], dtype=object),
+                  'TEAM_KEY': pd.Index([], dtype=object)}
+
+
+def decode_keys(df, columns=None):
+    """Turns encoded key columns back into their values. The year comes back
+    as a string, the type the rest of the pipeline and the exports use.
+
+    Keyword arguments:
+        df -- the dataframe with encoded key columns
+        columns -- the key columns to decode, all encoded ones by default
+    Returns:
+        df_decoded -- a copy of the dataframe with the keys decoded
+    """
+    df_decoded = df.copy()
+
+    for column in _key_columns(df, columns):
+        domain = KEY_COLUMNS[column]
+        if domain == 'year':
+            df_decoded[column] = df[column].astype(str)
+        else:
+            df_decoded[column] = KEY_DICTIONARY[domain].take(
+                    df[column].values, allow_fill=True, fill_value=np.nan).values
+
+    return df_decoded
+
+
+def encode_keys(df, columns=None):
+    """Replaces the join key columns of a dataframe with compact integer codes
+    so that merges and groupbys on them compare integers instead of strings.
+    The year, whether it comes in as a string or an int, becomes an int16;
+    abms, products, and team keys become int32 codes from KEY_DICTIONARY,
+    with values not seen before added to it. Missing keys get the code -1,
+    so they still match each other in a merge the way NaN keys do.
+
+    Keyword arguments:
+        df -- the dataframe to encode
+        columns -- the key columns to encode, all KEY_COLUMNS present by default
+    Returns:
+        df_encoded -- a copy of the dataframe with the keys encoded
+    """
+    df_encoded = df.copy()
+
+    for column in _key_columns(df, columns):
+        domain = KEY_COLUMNS[column]
+        if domain == 'year':
+            df_encoded[column] = pd.to_numeric(df[column]).astype('int16')
+        else:
+            df_encoded[column] = key_codes(df[column], domain)
+
+    return df_encoded
+
+
+def key_codes(values, domain):
+    """Returns the codes of values in a key domain, adding any new values to
+    the domain.
+
+    Keyword arguments:
+        values -- the series of key values
+        domain -- the key domain, 'abm', 'hybrid', or 'TEAM_KEY'
+    Returns:
+        codes -- the int32 array of codes, -1 for missing values
+    """
+    values = values.astype(object)
+    codes = KEY_DICTIONARY[domain].get_indexer(values)
+
+    new_values = pd.unique(values[(codes == -1) & values.notna().values])
+    if len(new_values) > 0:
+        KEY_DICTIONARY[domain] = KEY_DICTIONARY[domain].append(pd.Index(new_values, dtype=object))
+        codes = KEY_DICTIONARY[domain].get_indexer(values)
+
+    return codes.astype('int32')
+
+
+def _key_columns(df, columns):
+    """Returns the key columns of a dataframe to encode or decode."""
+    if columns is None:
+        return [column for column in df.columns if column in KEY_COLUMNS]
+
+    return list(columns)
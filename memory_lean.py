@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct 21 09:37:15 2026
+
+@author: epnzv
+"""
+import numpy as np
+import pandas as pd
+
+from aggregation_config import (LEAN_FLOAT_DTYPE, LEAN_PRECISION_CHECK, LEAN_PRECISION_TOLERANCE)
+
+
+def downcast_features(df, skip_columns=(), float_dtype=None, check_precision=None,
+                      tolerance=None):
+    """Downcasts the float64 columns of a dataframe to a smaller float type and
+    the int64 columns to the smallest int type that holds them. When the
+    precision is checked, a float column whose values would change by more
+    than the tolerance (relative to their size, e.g. ones that overflow the
+    smaller type) keeps its float64 type.
+
+    Keyword arguments:
+        df -- the dataframe to downcast
+        skip_columns -- the columns to leave as they are, e.g. the join keys
+        float_dtype -- the float type, LEAN_FLOAT_DTYPE by default
+        check_precision -- whether to check the float downcasts,
+            LEAN_PRECISION_CHECK by default
+        tolerance -- the largest relative change allowed when checking,
+            LEAN_PRECISION_TOLERANCE by default
+    Returns:
+        df_downcast -- a copy of the dataframe with the numeric columns downcast
+    """
+    if float_dtype is None:
+        float_dtype = LEAN_FLOAT_DTYPE
+    if check_precision is None:
+        check_precision = LEAN_PRECISION_CHECK
+    if tolerance is None:
+        tolerance = LEAN_PRECISION_TOLERANCE
+
+    df_downcast = df.copy()
+    kept_columns = []
+
+    for column in df.columns:
+        if column in skip_columns:
+            continue
+
+        if df[column].dtype == 'float64':
+            values = df[column].values
+            with np.errstate(over='ignore'):
+                downcast = values.astype(float_dtype)
+            if check_precision == True and _relative_change(values, downcast) > tolerance:
+                kept_columns.append(column)
+                continue
+            df_downcast[column] = downcast
+        elif df[column].dtype == 'int64':
+            df_downcast[column] = pd.to_numeric(df[column], downcast='integer')
+
+    if len(kept_columns) > 0:
+        print('Columns kept as float64, a downcast would change them by more than',
+              tolerance, ':', kept_columns)
+
+    return df_downcast
+
+
+def prune_feature_tables(tables, drop_columns):
+    """Leaves the columns that are dropped later on out of the feature tables
+    before they're merged, and leaves out the tables with no other columns.
+
+    Keyword arguments:
+        tables -- the list of (feature dataframe, key columns) pairs
+        drop_columns -- the columns to leave out
+    Returns:
+        pruned_tables -- the list of (feature dataframe, key columns) pairs
+            with the columns left out
+    """
+    pruned_tables = []
+    for table, keys in tables:
+        columns = [column for column in table.columns
+                   if column in keys or column not in drop_columns]
+        if len(columns) > len(keys):
+            pruned_tables.append((table[columns], keys))
+
+    return pruned_tables
+
+
+def _relative_change(values, downcast):
+    """Returns the largest change downcasting made to the values, relative to
+    the size of the values.
+    """
+    present = np.isfinite(values)
+    if present.any() == False:
+        return 0.0
+
+    original = values[present]
+    change = np.abs(downcast[present].astype('float64') - original)
+    scale = np.maximum(np.abs(original), np.finfo('float64').tiny)
+
+    return np.nanmax(np.where(np.isfinite(change), change / scale, np.inf))
@@ -5,110 +5,35 @@ Created on Thu Jan  6 15:22:08 2022
 
 @author: epnzv
 """
-import datetime as dt
 import pandas as pd
 
-from calendar import monthrange
-
-from aggregation_config import(ABM_FIPS_MAP, CORN_SOY_ACRES, DATA_DIR, ORDER_DATE,
-                               ORDER_FRACTION_2021, PRICE_REC, SALES_2021_W_DATE)
+from data_catalog import (load_source)
+from date_decoding import (decode_yyyymmdd)
+from order_curves import (month_end_cutoffs, order_date_cutoff, orders_as_of)
 from preprocess import (adv_in_trait, adv_outof_trait, adv_overall,
                         yield_aggregation)
 
 
-def merge_2021_sales_data_w_date(df, abm_Teamkey):
-    """Merges the 2021 sales data.
+def merge_2021_sales_data_w_date(df, order_index):
+    """Merges the 2021 sales data. The orders by month and the orders to date,
+    the orders as of ORDER_DATE, are read off the as-of index of the dated
+    orders.
     
     Keyword arguments:
         df -- the dataframe to concat onto
-        abm_Teamkey -- the team key to abm converter
+        order_index -- the as-of index of the dated orders, see
+            import_files.read_order_index
     Returns:
         df_merged
     """
-    # read in the 2021 sales data
-    sales_2021 = pd.read_csv(DATA_DIR + SALES_2021_W_DATE)
-    
-    # grab relevant columns
-    sales_2021_subset = sales_2021[['MK_YR', 'EFFECTIVE_DATE', 'BRAND_FAMILY_DESCR',
-                                    'SPECIE_DESCR', 'VARIETY_NAME', 'SLS_LVL_2_ID',
-                                    'SUM(ORDER_QTY_TO_DATE)']]
-    
-    # get the asgrow soybeans
-    sales_asgrow = sales_2021_subset[
-            sales_2021_subset['BRAND_FAMILY_DESCR'] == 'NATIONAL'].reset_index(drop=True)
-    sales_soybeans = sales_asgrow[sales_asgrow['SPECIE_DESCR'] == 'SOYBEAN'].reset_index(drop=True)
-    
-    # drop those columns
-    sales_soybeans = sales_soybeans.drop(columns=['BRAND_FAMILY_DESCR',
-                                                  'SPECIE_DESCR'])
-    
-    # rename the columns
-    sales_soybeans = sales_soybeans.rename(columns={'MK_YR': 'year',
-                                                    'SLS_LVL_2_ID': 'TEAM_KEY',
-                                                    'VARIETY_NAME': 'Variety_Name',
-                                                    'EFFECTIVE_DATE': 'date',
-                                                    'SUM(ORDER_QTY_TO_DATE)': 'order_Q'})
-    
-    # remove any variety names with "Empty"
-    sales_soybeans = sales_soybeans[
-            sales_soybeans['Variety_Name'] != '(Empty)'].reset_index(drop=True)
-        
-    sales_soybeans = sales_soybeans.merge(abm_Teamkey, on=['TEAM_KEY'], how='left')
-    
-    sales_soybeans = sales_soybeans.drop(columns=['TEAM_KEY'])
-    sales_soybeans['year'] = '2021'
-            
-    # change the date column to a datetime
-    # grab the year, month, and day values from the date field
-    sales_dates = sales_soybeans['date'].astype(str).to_frame()
-    sales_dates['year'] = sales_dates['date'].str[:4]
-    sales_dates['month'] = sales_dates['date'].str[4:6]
-    sales_dates['day'] = sales_dates['date'].str[6:8]
-    sales_dates = sales_dates.drop(columns=['date'])
-    
-    sales_dates['EFFECTIVE_DATE'] = pd.to_datetime(sales_dates)
-    sales_soybeans['EFFECTIVE_DATE'] = sales_dates['EFFECTIVE_DATE'].copy()
-    sales_soybeans = sales_soybeans.drop(columns=['date'])
-    
-    # only grab orders after certain date
-    months=[9, 10, 11, 12, 1, 2, 3, 4, 5, 6, 7, 8]
-    year = 2021
+    # read the orders up to the end of each month of the season and up to
+    # the order date
+    cutoffs = month_end_cutoffs(year=2021)
+    cutoffs['orders_to_date'] = order_date_cutoff(year=2021)
     
-    # create the total monthly dataframe
-    sales_monthly_total = sales_soybeans[
-            ['year', 'abm', 'Variety_Name']].drop_duplicates().reset_index(drop=True)
-    
-    for month in months:
-        print("month", month)
-        if month > 8:
-            date_mask = dt.datetime(year = int(year) - 1, month = month, day = monthrange(int(year) - 1, month)[1])
-            
-        if month <= 8:
-            date_mask = dt.datetime(year = int(year), month = month, day = monthrange(int(year), month)[1])
-            
-        sales_monthly = sales_soybeans[sales_soybeans['EFFECTIVE_DATE'] <= date_mask].copy().reset_index(drop = True)
-        
-        sales_monthly = sales_monthly.groupby(
-                by=['year','Variety_Name', 'abm'], as_index=False).sum().reset_index(drop = True)
-        
-        # rename 
-        sales_monthly = sales_monthly.rename(columns = {'order_Q': 'order_Q_month_' + str(month)})
-            
-        # merge with df_monthly_total 
-        sales_monthly_total = sales_monthly_total.merge(
-                sales_monthly, on=['year', 'Variety_Name', 'abm'], how='left')
+    sales_monthly_total = orders_as_of(order_index, cutoffs, where={'year': '2021'})
     
     sales_monthly_total = sales_monthly_total.fillna(0)
-        
-    # create the orders_to_date feature
-    this_month = sales_monthly_total['order_Q_month_' + str(ORDER_DATE['month'])].values
-    if ORDER_DATE['month'] != 12:
-        next_month = sales_monthly_total['order_Q_month_' + str(ORDER_DATE['month'] + 1)].values
-    else:
-        next_month = sales_monthly_total['order_Q_month_1'].values
-    
-    this_month_change = next_month - this_month
-    sales_monthly_total['orders_to_date'] = this_month + ORDER_FRACTION_2021 * this_month_change
     
     df_merged = df.merge(
             sales_monthly_total, on=['year', 'Variety_Name', 'abm'], how='left')
@@ -173,8 +98,26 @@ def merge_price_received(df):
     Returns:
         df_with_price_rec -- the dataframe with the price received data added
     """
+    # merge with the dataframe
+    df_with_price_rec = df.merge(price_received_table(), on=['year', 'abm'], how='left')
+    
+    # impute the price rec data
+    df_with_pr_imputed = impute_price_rec(df=df_with_price_rec)
+    df_with_price_rec = df_with_pr_imputed.copy()
+        
+    return df_with_price_rec
+
+
+def price_received_table():
+    """Creates the corn and soybean price received by year and abm.
+    
+    Keyword arguments:
+        None
+    Returns:
+        price_rec_corn_soy -- the price received data by year and abm
+    """
     # read in the price received data
-    price_rec_raw = pd.read_csv(DATA_DIR + PRICE_REC)
+    price_rec_raw = load_source('price_received')
     
     # clean and aggregate the price_rec_raw df
     price_rec = prep_price_rec(df=price_rec_raw)
@@ -208,15 +151,8 @@ def merge_price_received(df):
     price_rec_corn_soy = pd.concat([price_rec_corn_soy, df_y_2024])
 
     price_rec_corn_soy['year'] = price_rec_corn_soy['year'].astype(str)
-
-    # merge with the dataframe
-    df_with_price_rec = df.merge(price_rec_corn_soy, on=['year', 'abm'], how='left')
     
-    # impute the price rec data
-    df_with_pr_imputed = impute_price_rec(df=df_with_price_rec)
-    df_with_price_rec = df_with_pr_imputed.copy()
-        
-    return df_with_price_rec
+    return price_rec_corn_soy
 
 
 def impute_price_rec(df):
@@ -325,10 +261,10 @@ def state_weight():
         weight_map -- the weighting dataframe
     """
     # read in the acreage data
-    acreage_data = pd.read_csv(DATA_DIR + CORN_SOY_ACRES)
+    acreage_data = load_source('corn_soy_acres')
     
     # read in the mapping file
-    abm_map = pd.read_csv(DATA_DIR + ABM_FIPS_MAP)
+    abm_map = load_source('abm_fips_map', copy=False)
     
     # create a unique crd -> abm mapping. some crds belong to multiple abms,
     # but the number of cases is appropriately small (~50 crds out of 350)
@@ -383,3 +319,56 @@ def state_weight():
         acreage_agg = pd.concat([acreage_agg, acreage_agg_next]).reset_index(drop=True)
     
     return acreage_agg
+
+
+def read_dated_orders_file(source, year, abm_Teamkey):
+    """Reads the dated national brand soybean orders of one of the DSM sales
+    files (sales_2021_w_date, sales_2022), with the old abm names and the
+    effective date as a datetime.
+    
+    Keyword arguments:
+        source -- the name of the sales file in the data catalog
+        year -- the year of the sales file
+        abm_Teamkey -- the team key to abm converter
+    Returns:
+        sales_soybeans -- the dataframe of the orders by year, product, abm,
+            and effective date
+    """
+    # read in the sales data
+    sales = load_source(source, copy=False)
+    
+    # grab relevant columns
+    sales_subset = sales[['MK_YR', 'EFFECTIVE_DATE', 'BRAND_FAMILY_DESCR',
+                          'SPECIE_DESCR', 'VARIETY_NAME', 'SLS_LVL_2_ID',
+                          'SUM(ORDER_QTY_TO_DATE)']]
+    
+    # get the asgrow soybeans
+    sales_asgrow = sales_subset[
+            sales_subset['BRAND_FAMILY_DESCR'] == 'NATIONAL'].reset_index(drop=True)
+    sales_soybeans = sales_asgrow[sales_asgrow['SPECIE_DESCR'] == 'SOYBEAN'].reset_index(drop=True)
+    
+    # drop those columns
+    sales_soybeans = sales_soybeans.drop(columns=['BRAND_FAMILY_DESCR',
+                                                  'SPECIE_DESCR'])
+    
+    # rename the columns
+    sales_soybeans = sales_soybeans.rename(columns={'MK_YR': 'year',
+                                                    'SLS_LVL_2_ID': 'TEAM_KEY',
+                                                    'VARIETY_NAME': 'Variety_Name',
+                                                    'EFFECTIVE_DATE': 'date',
+                                                    'SUM(ORDER_QTY_TO_DATE)': 'order_Q'})
+    
+    # remove any variety names with "Empty"
+    sales_soybeans = sales_soybeans[
+            sales_soybeans['Variety_Name'] != '(Empty)'].reset_index(drop=True)
+        
+    sales_soybeans = sales_soybeans.merge(abm_Teamkey, on=['TEAM_KEY'], how='left')
+    
+    sales_soybeans = sales_soybeans.drop(columns=['TEAM_KEY'])
+    sales_soybeans['year'] = str(year)
+            
+    # change the YYYYMMDD date column to a datetime
+    sales_soybeans['EFFECTIVE_DATE'] = decode_yyyymmdd(sales_soybeans['date'])
+    sales_soybeans = sales_soybeans.drop(columns=['date'])
+    
+    return sales_soybeans
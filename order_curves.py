@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 27 08:47:19 2026
+
+@author: epnzv
+"""
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+from calendar import monthrange
+
+from aggregation_config import (ORDER_DATE)
+from stage_cache import (function_fingerprint, load_stage_output, save_stage_output, stage_key)
+
+# the months of the sales season in order, September through August
+SEASON_MONTHS = [9, 10, 11, 12, 1, 2, 3, 4, 5, 6, 7, 8]
+
+
+def build_order_index(orders, values=['order_Q'], keys=['year', 'Variety_Name', 'abm'],
+                      date='EFFECTIVE_DATE'):
+    """Builds the as-of index of a table of dated orders. The orders are
+    sorted by group and date once and the running sums of the quantities
+    within each group are kept, so the quantities of a group as of any date
+    can be read off with a binary search.
+
+    Keyword arguments:
+        orders -- the dataframe of dated orders
+        values -- the quantity columns to index, e.g. order_Q and return_Q
+        keys -- the group columns, orders with a missing key are left out
+        date -- the datetime column of the order dates, orders without a date
+            aren't summed
+    Returns:
+        index -- a dictionary of the group keys ('keys', one row per group),
+            the group columns ('key_columns'), the sorted unique dates
+            ('dates'), the sorted group/date positions ('sort_key'), where
+            each group starts ('group_start'), and the running sum of each
+            quantity within its group, after a leading 0 ('running_sums')
+    """
+    orders = orders.dropna(subset=keys).reset_index(drop=True)
+
+    group_ids = orders.groupby(by=keys, sort=False).ngroup().values.astype('int64')
+    n_groups = group_ids.max() + 1 if len(group_ids) > 0 else 0
+
+    # the first order of every group gives its keys, groups whose orders all
+    # lack a date are kept and have no orders as of any date
+    _, first_rows = np.unique(group_ids, return_index=True)
+    group_keys = orders[keys].iloc[first_rows].reset_index(drop=True)
+
+    dated = orders[date].notna().values
+    orders = orders[dated].reset_index(drop=True)
+    group_ids = group_ids[dated]
+
+    # sort by group and then by the rank of the date
+    dates = orders[date].values.astype('datetime64[ns]').view('int64')
+    unique_dates = np.unique(dates)
+    sort_key = group_ids * (len(unique_dates) + 1) + np.searchsorted(unique_dates, dates) + 1
+
+    sort_order = np.argsort(sort_key, kind='stable')
+    sort_key = sort_key[sort_order]
+
+    # the running sums restart at each group, so a group's sums don't carry
+    # the rounding of the groups sorted before it. missing quantities count
+    # as 0, as they do in a groupby sum
+    sorted_groups = group_ids[sort_order]
+    running_sums = {}
+    for value in values:
+        quantities = pd.Series(np.nan_to_num(orders[value].values[sort_order]))
+        running_sums[value] = np.concatenate(
+                [np.zeros(1, dtype=quantities.dtype),
+                 quantities.groupby(sorted_groups, sort=False).cumsum().values])
+
+    group_base = np.arange(n_groups, dtype='int64') * (len(unique_dates) + 1)
+
+    return {'keys': group_keys,
+            'key_columns': list(keys),
+            'dates': unique_dates,
+            'sort_key': sort_key,
+            'group_start': np.searchsorted(sort_key, group_base, side='right'),
+            'running_sums': running_sums}
+
+
+def cumulative_orders(orders, cutoffs, keys=['year', 'Variety_Name', 'abm'],
+                      value='order_Q', date='EFFECTIVE_DATE'):
+    """Sums the orders placed up to each of several dates by group, reading
+    every date off a single sorted running sum (see build_order_index)
+    instead of scanning the orders once per date.
+
+    A group gets NaN for a date if it has no orders up to the date, the same
+    as filtering the orders to the date, summing them by group, and merging
+    the sums back.
+
+    Keyword arguments:
+        orders -- the dataframe of orders
+        cutoffs -- a dictionary of output column name to the date the orders
+            are summed up to (inclusive)
+        keys -- the group columns, groups with a missing key are left out
+        value -- the quantity column summed
+        date -- the datetime column of the order dates
+    Returns:
+        curves -- the dataframe with the group columns and a column of sums
+            for each cutoff, in the order of cutoffs
+    """
+    index = build_order_index(orders, values=[value], keys=keys, date=date)
+
+    return orders_as_of(index, cutoffs, value=value)
+
+
+def load_order_index(name, read_orders, files, values=['order_Q'], **kwargs):
+    """Returns a persisted as-of order index, building it from the orders
+    read by read_orders only when one of the files or the code reading and
+    indexing them has changed. The index is kept in the stage cache.
+
+    Keyword arguments:
+        name -- the name of the index
+        read_orders -- the function returning the dataframe of dated orders,
+            called with the keyword arguments
+        files -- the files read_orders reads
+        values -- the quantity columns to index
+        **kwargs -- the keyword arguments of read_orders
+    Returns:
+        index -- the order index, see build_order_index
+    """
+    cache_name = 'order_index_' + name
+    key = stage_key(cache_name, read_orders, files=files,
+                    upstream=[function_fingerprint(build_order_index)])
+    hit, index = load_stage_output(name=cache_name, key=key)
+
+    if hit == False or set(values).issubset(index['running_sums']) == False:
+        index = build_order_index(read_orders(**kwargs), values=values)
+        save_stage_output(name=cache_name, key=key, output=index)
+
+    return index
+
+
+def month_end_cutoffs(year, months=SEASON_MONTHS, prefix='order_Q_month_'):
+    """Returns the last day of each month of a sales season, the months after
+    August falling in the year before.
+
+    Keyword arguments:
+        year -- the year of the season
+        months -- the months of the season
+        prefix -- the prefix of the column names, followed by the month
+    Returns:
+        cutoffs -- a dictionary of column name to the last day of the month
+    """
+    cutoffs = {}
+    for month in months:
+        month_year = int(year) - 1 if month > 8 else int(year)
+        cutoffs[prefix + str(month)] = dt.datetime(year=month_year, month=month,
+                                                   day=monthrange(month_year, month)[1])
+
+    return cutoffs
+
+
+def order_date_cutoff(year):
+    """Returns ORDER_DATE in a sales season, in the year before if it falls
+    after August.
+
+    Keyword arguments:
+        year -- the year of the season
+    Returns:
+        cutoff -- the datetime of the order date
+    """
+    order_year = int(year) - 1 if ORDER_DATE['month'] > 8 else int(year)
+
+    return dt.datetime(year=order_year, month=ORDER_DATE['month'], day=ORDER_DATE['day'])
+
+
+def order_snapshot(index, queries, value='order_Q', date='date'):
+    """Looks up a quantity of each queried group as of the date of the query,
+    so every row can ask about its own date.
+
+    Keyword arguments:
+        index -- the order index, see build_order_index
+        queries -- the dataframe of the group columns and the date of each query
+        value -- the quantity looked up
+        date -- the datetime column of the query dates
+    Returns:
+        snapshot -- the series of the quantity as of each query's date, with
+            the index of queries. NaN for groups that aren't in the index or
+            have no orders up to the date
+    """
+    keys = index['key_columns']
+    group_ids = index['keys'].reset_index().rename(columns={'index': '_group'})
+    query_groups = queries[keys].merge(group_ids, on=keys, how='left')['_group'].values
+
+    found = np.isnan(query_groups.astype('float64')) == False
+    group = np.where(found, query_groups, 0).astype('int64')
+
+    cutoff_ranks = np.searchsorted(index['dates'],
+                                   queries[date].values.astype('datetime64[ns]').view('int64'),
+                                   side='right')
+    width = len(index['dates']) + 1
+    group_start = index['group_start'][group] if len(index['group_start']) > 0 else group
+    group_end = np.searchsorted(index['sort_key'], group * width + cutoff_ranks, side='right')
+
+    running_sum = index['running_sums'][value]
+    snapshot = pd.Series(running_sum[group_end], index=queries.index)
+
+    return snapshot.where(found & (group_end > group_start))
+
+
+def orders_as_of(index, cutoffs, value='order_Q', where=None):
+    """Reads a quantity of every group as of each of several dates.
+
+    Keyword arguments:
+        index -- the order index, see build_order_index
+        cutoffs -- a dictionary of output column name to the date (inclusive)
+        value -- the quantity read
+        where -- a dictionary of group column to value, to read only the
+            groups with those keys (e.g. {'year': '2021'}), every group by
+            default
+    Returns:
+        snapshots -- the dataframe with the group columns and a column for
+            each cutoff, NaN where a group has no orders up to the date
+    """
+    groups = np.arange(len(index['group_start']), dtype='int64')
+    if where is not None:
+        selected = np.ones(len(groups), dtype=bool)
+        for column, key in where.items():
+            selected &= (index['keys'][column] == key).values
+        groups = groups[selected]
+
+    snapshots = index['keys'].iloc[groups].reset_index(drop=True)
+
+    group_start = index['group_start'][groups]
+    group_base = groups * (len(index['dates']) + 1)
+    running_sum = index['running_sums'][value]
+
+    for name, cutoff in cutoffs.items():
+        cutoff_rank = np.searchsorted(index['dates'], pd.Timestamp(cutoff).value, side='right')
+        group_end = np.searchsorted(index['sort_key'], group_base + cutoff_rank, side='right')
+
+        sums = pd.Series(running_sum[group_end])
+        snapshots[name] = sums.where(group_end > group_start)
+
+    return snapshots
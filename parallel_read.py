@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 23 10:14:48 2026
+
+@author: epnzv
+"""
+import multiprocessing
+import os
+
+import aggregation_config
+
+from aggregation_config import (READ_WORKERS)
+from pipeline import (apply_config)
+
+
+def read_years(read_year, years, n_workers=None, **kwargs):
+    """Reads one file per year with read_year, reading the files at the same
+    time in a process pool. The yearly files don't depend on each other, so
+    the parsing is spread over the workers and the frames come back in the
+    order of the years, as a loop over the years would return them.
+
+    Keyword arguments:
+        read_year -- the function reading one year's file, called with year=
+            and the keyword arguments
+        years -- the years to read
+        n_workers -- the number of worker processes, READ_WORKERS by default
+            (None uses every core, or reads the files one after another when
+            this is itself running in a pipeline worker, 1 reads the files
+            one after another here)
+        **kwargs -- the other keyword arguments of read_year
+    Returns:
+        dfs -- the list of the yearly frames, in the order of the years
+    """
+    if n_workers is None:
+        n_workers = READ_WORKERS
+    if n_workers is None:
+        # the stages already run in a pool of every core, so a stage's worker
+        # reads its files itself rather than starting a pool of its own
+        if multiprocessing.parent_process() is not None:
+            n_workers = 1
+        else:
+            n_workers = os.cpu_count() or 1
+
+    years = list(years)
+    if n_workers == 1 or len(years) < 2:
+        return [read_year(year=year, **kwargs) for year in years]
+
+    # only pull in the process pool machinery when it's used
+    from concurrent.futures import (ProcessPoolExecutor)
+
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=apply_config,
+                             initargs=(config_snapshot(),)) as executor:
+        futures = [executor.submit(read_year, year=year, **kwargs) for year in years]
+        dfs = [future.result() for future in futures]
+
+    return dfs
+
+
+def config_snapshot():
+    """Returns the current value of every aggregation_config constant, so the
+    workers read with the same config as this process, including overrides.
+    """
+    return {name: value for name, value in vars(aggregation_config).items()
+            if name.isupper() == True}
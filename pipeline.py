@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 11:02:15 2026
+
+@author: epnzv
+"""
+import os
+import sys
+
+import aggregation_config
+
+from aggregation_config import (PIPELINE_WORKERS)
+from instrumentation import (RUN_RECORDS, measure_call, track_step)
+from stage_cache import (load_stage_output, save_stage_output, stage_key)
+
+# the directory holding this repo's modules, used to find the modules that
+# imported a config constant
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def apply_config(overrides):
+    """Overrides aggregation_config constants for this process. The modules
+    here import constants by name, so the override is also applied to every
+    already imported repo module holding a copy of the constant.
+
+    Keyword arguments:
+        overrides -- the dictionary of constant name to new value
+    Returns:
+        previous -- the dictionary of constant name to the value it replaced,
+            which can be passed back in to undo the override
+    """
+    previous = {}
+
+    for name, value in overrides.items():
+        if hasattr(aggregation_config, name) == False:
+            raise KeyError('unknown aggregation_config constant ' + name)
+
+        previous[name] = getattr(aggregation_config, name)
+        setattr(aggregation_config, name, value)
+
+        for module in list(sys.modules.values()):
+            module_file = getattr(module, '__file__', None)
+            if (module_file is None or module is aggregation_config or
+                    os.path.dirname(os.path.abspath(module_file)) != REPO_DIR):
+                continue
+            if name in vars(module):
+                setattr(module, name, value)
+
+    return previous
+
+
+def prune_stages(stages, targets):
+    """Subsets a stage graph to the target stages and the stages they depend on.
+
+    Keyword arguments:
+        stages -- the dictionary of stage name to stage definition
+        targets -- the names of the stages whose outputs are wanted
+    Returns:
+        needed_stages -- the dictionary of the stages that need to run
+    """
+    needed = set()
+
+    def visit(name):
+        if name not in stages:
+            raise KeyError('unknown stage ' + name)
+        if name in needed:
+            return
+
+        needed.add(name)
+        for upstream in stages[name].get('inputs', {}).values():
+            visit(upstream)
+
+    for target in targets:
+        visit(target)
+
+    return {name: stage for name, stage in stages.items() if name in needed}
+
+
+def run_stage_graph(stages, n_workers=PIPELINE_WORKERS, config=None, input_files=None):
+    """Runs a graph of pipeline stages. Each stage is a dictionary with the
+    stage function ('func'), a mapping of keyword argument name to the stage
+    providing it ('inputs'), optionally the files it reads ('files', or use
+    input_files), the config constants it depends on ('config'), and optionally 'local': True for join stages that
+    should run in this process rather than being shipped to a worker.
+
+    Stages whose inputs are all available run at the same time in a process
+    pool, so independent branches (sales, weather, commodity, ...) only join
+    where a stage such as merge_all needs all of them. Stage outputs are taken
+    from the stage cache when their key hasn't changed. Every stage run or
+    cache load is measured and added to instrumentation.RUN_RECORDS.
+
+    Keyword arguments:
+        stages -- the dictionary of stage name to stage definition
+        n_workers -- the number of worker processes, 1 runs every stage here
+        config -- the aggregation_config overrides already applied in this
+            process, re-applied in each worker
+        input_files -- a function of the stage name returning the files the
+            stage reads, used for stages without a 'files' entry
+    Returns:
+        outputs -- the dictionary of stage name to stage output
+    """
+    # only pull in the process pool machinery when it's used
+    from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor, wait)
+
+    order = stage_order(stages)
+
+    # the keys only depend on files, config, code, and upstream keys, so they
+    # can all be computed before anything runs
+    keys = {}
+    for name in order:
+        stage = stages[name]
+        if 'files' in stage or input_files is None:
+            files = stage.get('files', [])
+        else:
+            files = input_files(name)
+        keys[name] = stage_key(name, stage['func'],
+                               files=files,
+                               config=stage.get('config', []),
+                               upstream=[keys[upstream] for upstream in
+                                         stage.get('inputs', {}).values()])
+
+    outputs = {}
+    pending = []
+    for name in order:
+        load_records = []
+        with track_step(name, kind='cached', records=load_records) as step:
+            hit, output = load_stage_output(name=name, key=keys[name])
+            step['output'] = output
+        if hit == True:
+            print("Stage ", name, " loaded from cache")
+            outputs[name] = output
+            RUN_RECORDS.extend(load_records)
+        else:
+            pending.append(name)
+
+    if len(pending) == 0:
+        return outputs
+
+    if n_workers == 1:
+        for name in pending:
+            outputs[name] = _run_stage(name, stages[name], outputs)
+            save_stage_output(name=name, key=keys[name], output=outputs[name])
+        return outputs
+
+    running = {}
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=apply_config,
+                             initargs=(config or {},)) as executor:
+        while len(pending) > 0 or len(running) > 0:
+            # start every stage whose inputs are available
+            for name in list(pending):
+                if all(upstream in outputs
+                       for upstream in stages[name].get('inputs', {}).values()) == False:
+                    continue
+
+                pending.remove(name)
+                if stages[name].get('local', False) == True:
+                    outputs[name] = _run_stage(name, stages[name], outputs)
+                    save_stage_output(name=name, key=keys[name], output=outputs[name])
+                else:
+                    kwargs = _stage_kwargs(stages[name], outputs)
+                    print("Running stage ", name)
+                    running[executor.submit(measure_call, name, stages[name]['func'],
+                                            kwargs)] = name
+
+            if len(running) == 0:
+                continue
+
+            done, _ = wait(list(running.keys()), return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                outputs[name], records = future.result()
+                RUN_RECORDS.extend(records)
+                save_stage_output(name=name, key=keys[name], output=outputs[name])
+                print("Finished stage ", name)
+
+    return outputs
+
+
+def stage_order(stages):
+    """Orders the stages so that every stage comes after the stages it takes
+    inputs from.
+
+    Keyword arguments:
+        stages -- the dictionary of stage name to stage definition
+    Returns:
+        order -- the list of stage names in dependency order
+    """
+    order = []
+    visiting = set()
+
+    def visit(name):
+        if name in order:
+            return
+        if name in visiting:
+            raise ValueError('stage graph has a cycle at stage ' + name)
+        if name not in stages:
+            raise KeyError('unknown stage ' + name)
+
+        visiting.add(name)
+        for upstream in stages[name].get('inputs', {}).values():
+            visit(upstream)
+        visiting.remove(name)
+        order.append(name)
+
+    for name in stages:
+        visit(name)
+
+    return order
+
+
+def _run_stage(name, stage, outputs):
+    """Runs and measures a single stage in this process."""
+    print("Running stage ", name)
+
+    output, records = measure_call(name, stage['func'], _stage_kwargs(stage, outputs))
+    RUN_RECORDS.extend(records)
+
+    return output
+
+
+def _stage_kwargs(stage, outputs):
+    """Maps the outputs of upstream stages to the keyword arguments of a stage."""
+    return {argument: outputs[upstream]
+            for argument, upstream in stage.get('inputs', {}).items()}
@@ -9,14 +9,22 @@ import datetime as dt
 import pandas as pd
 import numpy as np
 
-from calendar import monthrange
 from functools import reduce
-from pandasql import sqldf
 
-from aggregation_config import (ABM_FIPS_MAP, CF_2022_FILE, DAILY_FRACTIONS, DATA_DIR,
-                                E3_EQUAL_XF, MONTHLY_FRACTIONS, ORDER_DATE, ORDER_FRACTION_2021,
-                                SALES_2021, SALES_2022, SCM_DATA_DIR, SCM_DATA_FILE, US_STATE_ABBREV,
-                                YEARLY_ABM_FIPS_MAP, YIELD_COUNTY_DATA)
+from aggregation_config import (DATA_DIR, E3_EQUAL_XF, ORDER_DATE, ORDER_FRACTION_2021,
+                                SALES_CHUNK_SIZE, SALES_LAGS, TRAIT_MAP_DROP_COLUMNS,
+                                US_STATE_ABBREV)
+from data_catalog import (load_source, source_path, source_read_kwargs)
+from date_decoding import (decode_yyyymmdd)
+from feature_assembly import assemble_features
+from fips_lookup import (fips_abm_lookup, join_abm)
+from fraction_cube import (daily_fraction_cube, gather_fractions, impute_to_date,
+                           monthly_fraction_cube)
+from order_curves import (SEASON_MONTHS, month_end_cutoffs, orders_as_of)
+from relative_maturity import (relative_maturity)
+from streaming_read import (read_csv_grouped)
+from weather_store import (join_grid_fips)
+from year_lags import (year_lags)
 
 def adv_in_trait(df):
     """Aggregates the advantage feature for a given abm within the trait group
@@ -111,7 +119,7 @@ def amend_trait_features(df):
     df_amended = df.copy()
     df_amended.loc[df_amended['trait'] == 'CONV', 'trait'] = 'Conventional'
     
-    df_amended = df_amended.drop(columns=['RR', 'SR', 'RR2X', 'XF'])
+    df_amended = df_amended.drop(columns=TRAIT_MAP_DROP_COLUMNS, errors='ignore')
     
     return df_amended
 
@@ -265,47 +273,78 @@ def clean_state_county(State_fips, County_fips, FIPS_abm):
     return State_County_abm
 
 
-def clean_Weather(df_weather, df_county_locations, df_fips):
-    """Adds the FIPS code to the Blizzard data, merging on the latitude and 
-    longitude.
-       Adds the abm feature to the Blizzard data, merging on the fips and year.
+def clean_Weather(df_weather, county_grid, fips_lookup):
+    """Adds the FIPS code to the Blizzard data, looking up the integer grid key
+    of the latitude and longitude.
+       Adds the abm feature to the Blizzard data, looking it up by fips and year.
        Aggregate the county-level Blizzard data to the abm level. 
     
     Keyword arguments:
         df_weather -- the dataframe of the Blizzard data
-        df_county_locations -- the dataframe with fips, latitude, longtitude
-        df_fips -- the dataframe with fips, abm, year 
+        county_grid -- the grid index of the county locations, see
+            weather_store.grid_fips_index
+        fips_lookup -- the compiled FIPS to abm lookup of the yearly map, see
+            fips_lookup.fips_abm_lookup
     Returns:
         Weather_w_abm -- the dataframe aggregated to the abm level
     """   
-    Weather = df_weather.copy()
-    County_Locations = df_county_locations.copy()
+    # look up the FIPS of each point, reporting the points without a county
+    Weather = join_grid_fips(df_weather, county_grid)
     
-    # round latitude and longitude 
-    Weather['latitude'] = Weather['latitude'].round(2)
-    Weather['longitude'] = Weather['longitude'].round(2)
+    # look up the abm feature by fips and year
+    Weather = join_abm(Weather, fips_lookup, how='left')
     
-    County_Locations['latitude'] = County_Locations['latitude'].round(2)
-    County_Locations['longitude'] = County_Locations['longitude'].round(2)
+    print("Check the fraction of missing value: ", Weather.isna().sum()/Weather.shape[0])
+    
+    # group by the abm, year, and month and take the avg of min/max temperatures
+    Weather = weather_means(weather_partial_sums(Weather))
+    
+    return Weather
+
+
+def weather_means(weather_sums):
+    """Divides the sums of the weather features by their number of rows,
+    giving the averages by year, month, and abm.
+    
+    Keyword arguments:
+        weather_sums -- the sums and rows by year, month, and abm, see
+            weather_partial_sums
+    Returns:
+        Weather -- the dataframe of the average weather features by year,
+            month, and abm
+    """
+    Weather = weather_sums.drop(columns=['rows'])
     
-    # merge Weather with County_Locations to add the FIPS feature 
-    Weather = Weather.merge(County_Locations, on=['latitude', 'longitude'], how='left')
+    features = [column for column in Weather.columns if column not in ['year', 'month', 'abm']]
+    Weather[features] = Weather[features].div(weather_sums['rows'], axis=0)
     
-    # merge Weather with FIPS_abm to add the abm feature
-    Weather = Weather.merge(df_fips, on = ['fips', 'year'], how='left')
+    return Weather
+
+
+def weather_partial_sums(Weather):
+    """Sums the weather features of Blizzard rows that have their FIPS and abm
+    added by year, month, and abm, and counts the rows. Rows with any missing
+    value are dropped first. The sums of separate chunks of the Blizzard data
+    add up to the sums of all of it, so they can be built as the data are read.
     
+    Keyword arguments:
+        Weather -- the Blizzard rows with the fips and abm columns
+    Returns:
+        weather_sums -- the dataframe of the sums of the weather features and
+            the number of rows ('rows') by year, month, and abm
+    """
     # Drop missing value 
-    print("Check the fraction of missing value: ", Weather.isna().sum()/Weather.shape[0])
     Weather = Weather.dropna().reset_index(drop = True)
     
     # Drop latitude, longitude, fips 
     dropped_cols = ['latitude', 'longitude', 'fips']
     Weather = Weather.drop(columns = dropped_cols)
     
-    # group by the abm, year, and month and take the avg of min/max temperatures
-    Weather = Weather.groupby(by=['year', 'month', 'abm'],as_index=False).mean().reset_index(drop=True)
+    grouped = Weather.groupby(by=['year', 'month', 'abm'])
+    weather_sums = grouped.sum().reset_index()
+    weather_sums['rows'] = grouped.size().values
     
-    return Weather
+    return weather_sums
 
 
 def create_commodity_features(df, crop_type):
@@ -470,7 +509,8 @@ def create_imputation_frames(df):
 
 def create_lagged_sales(df):
     """Creates the "lagged" sales features, namely the sales data for a product
-    from the two previous years in a given ABM.
+    from the previous years in a given ABM. The quantities and years lagged
+    are set by SALES_LAGS.
     
     Keyword arguments:
         df -- the dataframe with the cleaned sales data that will be used to 
@@ -480,52 +520,17 @@ def create_lagged_sales(df):
     """
     print('Creating lagged features...')
     
-    LAGGED_FEATURES = ['nets_Q_1', 'order_Q_1', 'return_Q_1', 'replant_Q_1',
-                   'nets_Q_2', 'order_Q_2', 'return_Q_2']
-    
-    df = df.rename(columns = {'Variety_Name':'hybrid'})
-    df['year'] = df['year'].astype(int)
-    sales_all = df.copy()
-
-    # define the selection criteria as strings to use in the sqldf commmand
-    # this is principally just for readability
-    #current_year_q = "select a.year, a.abm, a.hybrid, a.nets_Q, a.order_Q, a.return_Q, a.replant_Q, "
-    #last_year_q = "b.nets_Q as nets_Q_1, b.order_Q as order_Q_1, b.return_Q as return_Q_1, b.replant_Q as replant_Q_1, "
-    #two_years_q = "c.nets_Q as nets_Q_2, c.order_Q as order_Q_2, c.return_Q as return_Q_2 from sales_all "
-    #join_last_year = "a left join sales_all b on a.hybrid = b.hybrid and a.abm = b.abm and a.year = b.year + 1 "
-    #join_two_years = "left join sales_all c on a.hybrid = c.hybrid and a.abm = c.abm and a.year = c.year + 2"
- 
-    #sales_with_lag = sqldf(current_year_q + last_year_q + two_years_q + 
-    #                       join_last_year + join_two_years)
-    
-    sales_all_lag_1 = sales_all.copy()
-    sales_all_lag_2 = sales_all.copy()
-    
-    # adjust years
-    sales_all_lag_1['year'] = sales_all_lag_1['year'] + 1
-    sales_all_lag_2['year'] = sales_all_lag_2['year'] + 2
-    
-    sales_all_lag_1 = sales_all_lag_1[
-            ['year', 'hybrid', 'abm', 'nets_Q', 'order_Q', 'return_Q', 'replant_Q']].rename(
-            columns={'nets_Q': 'nets_Q_1', 'order_Q': 'order_Q_1',
-                     'return_Q': 'return_Q_1', 'replant_Q': 'replant_Q_1'})
-    sales_all_lag_2 = sales_all_lag_2[
-            ['year', 'hybrid', 'abm', 'nets_Q', 'order_Q', 'return_Q']].rename(
-            columns={'nets_Q': 'nets_Q_2', 'order_Q': 'order_Q_2',
-                     'return_Q': 'return_Q_2'})
-    
-    sales_with_lag = sales_all.merge(sales_all_lag_1, on=['year', 'hybrid', 'abm'], how='left')
-    sales_with_lag = sales_with_lag.merge(sales_all_lag_2, on=['year', 'hybrid', 'abm'], how='left')
+    LAGGED_FEATURES = [column + '_' + str(lag) for lag in sorted(SALES_LAGS)
+                       for column in SALES_LAGS[lag]]
+    
+    sales_with_lag = year_lags(df.reset_index(drop=True), lags=SALES_LAGS)
     
     # impute, replacing the NaNs with zeros
     for feature in LAGGED_FEATURES:
         sales_with_lag[feature] = sales_with_lag[feature].fillna(0)
     
     # convert year to str
-    sales_with_lag['year'] = sales_with_lag['year'].astype(str)
-    
-    # rename hybrid columns 
-    sales_with_lag = sales_with_lag.rename(columns = {'hybrid':'Variety_Name'})
+    sales_with_lag['year'] = sales_with_lag['year'].astype(int).astype(str)
     
     # grabs data after the cutoff year
     sales_with_lag = sales_with_lag[sales_with_lag['year'] >= '2012'] 
@@ -537,57 +542,43 @@ def create_lagged_sales(df):
 
 
 def create_late_lagged_sales(df, full_df, year):
+    """Adds the sales of the two previous years to the sales of a year added
+    after the yearly files.
+    
+    Keyword arguments:
+        df -- the sales of the year
+        full_df -- the sales data with the previous years
+        year -- the year of df
+    Returns:
+        df_merged -- df with the sales of the two previous years added
     """
-    """
-       # get the lagged sales data
-    df_last_year = full_df[full_df['year'] == str(year - 1)].copy().reset_index(drop=True)
-    df_last_year = df_last_year[['abm', 'Variety_Name', 'nets_Q', 'order_Q',
-                                 'return_Q', 'replant_Q']]
-    df_last_year['year'] = str(year)
-    df_last_year = df_last_year.rename(columns={'nets_Q': 'nets_Q_1',
-                                                'order_Q': 'order_Q_1',
-                                                'return_Q': 'return_Q_1',
-                                                'replant_Q': 'replant_Q_1'})
-        
-    df_two_year = full_df[full_df['year'] == str(year - 2)].copy().reset_index(drop=True)
-    df_two_year = df_two_year[['abm', 'Variety_Name', 'nets_Q', 'order_Q',
-                               'return_Q', 'replant_Q']]
-    df_two_year['year'] = str(year)
-    df_two_year = df_two_year.rename(columns={'nets_Q': 'nets_Q_2',
-                                              'order_Q': 'order_Q_2',
-                                              'return_Q': 'return_Q_2',
-                                              'replant_Q': 'replant_Q_2'})
-
-    df_merged = df.merge(df_last_year, 
-                         on=['year', 'Variety_Name', 'abm'], 
-                         how='left')
-    df_merged = df_merged.merge(df_two_year,
-                                on=['year', 'Variety_Name', 'abm'],
-                                how='left')
+    # get the lagged sales data
+    full_df = full_df[full_df['year'].isin([str(year - 1), str(year - 2)])]
+    
+    df_merged = year_lags(df.reset_index(drop=True),
+                          lags={1: ['nets_Q', 'order_Q', 'return_Q', 'replant_Q'],
+                                2: ['nets_Q', 'order_Q', 'return_Q', 'replant_Q']},
+                          source=full_df, years=[year])
     
     return df_merged
 
   
-def create_monthly_sales(Sale_2012_2020_lagged, clean_Sale, abm_Teamkey):
+def create_monthly_sales(Sale_2012_2020_lagged, order_index, abm_Teamkey):
     """ Create the "datemask" to get monthly feature for the netsale data
     
     Keyword arguments:
         Sale_2012_2020 -- the dataframe of the yealry sales data from 2012 to 2020 with lagged features 
-        df_clean_sale -- the dataframe of clean sales data with effective date
+        order_index -- the as-of index of the dated orders, see
+            import_files.read_order_index
     Returns:
         Sales_all -- the dataframe of clean sales data with montly and lagged features 
     """
     print('Creating monthly features...')
 
-    clean_Sale = clean_Sale[['EFFECTIVE_DATE', 'year', 'abm', 'Variety_Name', 'order_Q']]
-    months = [9, 10, 11, 12, 1, 2, 3, 4, 5, 6, 7, 8]
-    
     dfs_monthly_netsales = []
     years = ['2012', '2013', '2014', '2015', '2016', '2017', '2018', '2019', '2020']
     for year in years:
         print('year', year)
-        df_year = clean_Sale[clean_Sale['year'] == year].reset_index(drop = True)
-        
         df_monthly_total = pd.DataFrame()
         
         df_single_year = Sale_2012_2020_lagged[Sale_2012_2020_lagged['year'] == year].copy().reset_index(drop = True)
@@ -600,35 +591,13 @@ def create_monthly_sales(Sale_2012_2020_lagged, clean_Sale, abm_Teamkey):
                                           month=ORDER_DATE['month'],
                                           day=ORDER_DATE['day'])
         
-        # grab the orders to date
-        df_to_date = df_year[
-                df_year['EFFECTIVE_DATE'] <= orders_to_date_mask].copy().reset_index(drop=True)
-        
-        df_to_date = df_to_date.groupby(by=['year', 'Variety_Name', 'abm'],
-                                        as_index=False).sum().reset_index(drop=True)
-        
-        df_to_date = df_to_date.rename(columns={'order_Q': 'orders_to_date'})
-        
-        for month in months:
-            print("month", month)
-            if month > 8:
-                date_mask = dt.datetime(year = int(year) - 1, month = month, day = monthrange(int(year) - 1, month)[1])
-            
-            if month <= 8:
-                date_mask = dt.datetime(year = int(year), month = month, day = monthrange(int(year), month)[1])
-            
-            df_monthly = df_year[df_year['EFFECTIVE_DATE'] <= date_mask].copy().reset_index(drop = True)
-            
-            df_monthly = df_monthly.groupby(by = ['year','Variety_Name', 'abm'], as_index = False).sum().reset_index(drop = True)
-            
-            # rename 
-            df_monthly = df_monthly.rename(columns = {'order_Q': 'order_Q_month_' + str(month)})
-            
-            # merge with df_montly_total 
-            df_monthly_total = df_monthly_total.merge(df_monthly, on = ['year', 'Variety_Name', 'abm'], how = 'left')
+        # read the orders up to the end of each month and up to the order date
+        # off the order index
+        cutoffs = month_end_cutoffs(year=year)
+        cutoffs['orders_to_date'] = orders_to_date_mask
         
-        # merge the orders to date
-        df_monthly_total = df_monthly_total.merge(df_to_date,
+        df_monthly_total = df_monthly_total.merge(orders_as_of(order_index, cutoffs,
+                                                               where={'year': year}),
                                                   on=['year', 'Variety_Name', 'abm'],
                                                   how='left')
         
@@ -667,7 +636,7 @@ def create_prediction_set(df, abm_Teamkey):
     """
     # initialize a dataframe using the consensus forecast data to build the index
     # we are only grabbing product/abm pairs that have a nonzero Y1_FCST
-    CF_2022 = pd.read_excel(DATA_DIR + CF_2022_FILE)
+    CF_2022 = load_source('cf_2022', copy=False)
     pred_set_index = CF_2022[
             CF_2022['FORECAST_YEAR'] == 2023].reset_index(drop=True)
     pred_set_index = pred_set_index[
@@ -881,14 +850,10 @@ def impute_h2h_data(df, product_abm_level, trait_abm_year_level, abm_year_level,
     
     
     product_abm_level = product_abm_level.rename(columns = {'hybrid': 'Variety_Name'})
-    df_with_pa = df.merge(product_abm_level, on=['abm', 'Variety_Name'], how='left')
-    
-    df_with_tay = df_with_pa.merge(trait_abm_year_level, on=['year', 'abm', 'trait'],
-                                   how='left')
-    
-    df_with_ay = df_with_tay.merge(abm_year_level, on=['year', 'abm'], how='left')
-
-    df_with_y = df_with_ay.merge(year_level, on=['year'], how='left')
+    df_with_y = assemble_features(df, [(product_abm_level, ['abm', 'Variety_Name']),
+                                       (trait_abm_year_level, ['year', 'abm', 'trait']),
+                                       (abm_year_level, ['year', 'abm']),
+                                       (year_level, ['year'])])
     
     # the features we'll drop
     agg_features_to_drop = []
@@ -996,9 +961,12 @@ def impute_SRP(df):
     SRP_last_year = SRP_real[['year', 'Variety_Name', 'SRP']].drop_duplicates().reset_index(drop=True)
     SRP_real = SRP_real[['year', 'trait', 'SRP']]
     
-    # get the last year SRPs
-    SRP_last_year['year'] = SRP_last_year['year'].astype(int) + 1
-    SRP_last_year['year'] = SRP_last_year['year'].astype(str)
+    # get the last year SRPs, keeping the type the year comes in as (a string,
+    # or an int when the keys are encoded)
+    next_year = SRP_last_year['year'].astype(int) + 1
+    if SRP_last_year['year'].dtype == object:
+        next_year = next_year.astype(str)
+    SRP_last_year['year'] = next_year
     SRP_last_year = SRP_last_year.rename(columns={'SRP': 'SRP_ly'})
     
     # aggregate the SRP_real based on trait/year, year, and trait
@@ -1011,10 +979,10 @@ def impute_SRP(df):
     SRP_year = SRP_year.rename(columns={'SRP': 'SRP_y'})
     SRP_trait = SRP_trait.rename(columns={'SRP': 'SRP_t'})
     
-    df_imputed = df.merge(SRP_last_year, on=['year', 'Variety_Name'], how='left')
-    df_imputed = df_imputed.merge(SRP_trait_year, on=['year', 'trait'], how='left')
-    df_imputed = df_imputed.merge(SRP_year, on=['year'], how='left')
-    df_imputed = df_imputed.merge(SRP_trait, on=['trait'], how='left')
+    df_imputed = assemble_features(df, [(SRP_last_year, ['year', 'Variety_Name']),
+                                        (SRP_trait_year, ['year', 'trait']),
+                                        (SRP_year, ['year']),
+                                        (SRP_trait, ['trait'])])
     
     # set missing values to be the aggregated values. trait/year if it is available,
     # just by year if not
@@ -1083,67 +1051,20 @@ def flatten_monthly_weather(df_weather):
 
 
 def get_RM(df):
-    """
-    """
-    hybrids = df['Variety_Name']
+    """Adds the relative maturity (RM) of each product, read off its name with
+    the RM_BINS table (see relative_maturity).
     
-    digits = hybrids.str.findall('[0-9]+')
+    Keyword arguments:
+        df -- the dataframe with the product names as Variety_Name
+    Returns:
+        df_w_RM -- the dataframe with the RM added
+    """
+    hybrids = df['Variety_Name'].drop_duplicates().reset_index(drop=True)
     
-    for i in range(len(digits)):
-        if len(digits[i]) > 0:
-            digits[i] = digits[i][0]
-        else:
-            digits[i] = '00'
-    
-    # turn the digits series into a df
-    digits = digits.to_frame(name='digits')
-    
-    # set the RM to be 0 and then 
-    digits['RM'] = 0
-    digits['Variety_Name'] = hybrids.values
-    
-    digits = digits.drop_duplicates().reset_index(drop=True)
-    for i in range(len(digits)):
-        if int(digits.loc[i, 'digits'][:2]) <= 0:
-            digits.loc[i, 'RM'] = -0.1
-        elif (int(digits.loc[i, 'digits'][:2]) > 0  and int(digits.loc[i, 'digits'][:2]) < 5):
-            digits.loc[i, 'RM'] = 0
-        elif (int(digits.loc[i, 'digits'][:2]) >= 5 and int(digits.loc[i, 'digits'][:2]) < 10):
-            digits.loc[i, 'RM'] = 0.5
-        elif (int(digits.loc[i, 'digits'][:2]) >= 10 and int(digits.loc[i, 'digits'][:2]) < 15):
-            digits.loc[i, 'RM'] = 1.0
-        elif (int(digits.loc[i, 'digits'][:2]) >= 15 and int(digits.loc[i, 'digits'][:2]) < 20):
-            digits.loc[i, 'RM'] = 1.5
-        elif (int(digits.loc[i, 'digits'][:2]) >= 20 and int(digits.loc[i, 'digits'][:2]) < 25):
-            digits.loc[i, 'RM'] = 2.0
-        elif (int(digits.loc[i, 'digits'][:2]) >= 25 and int(digits.loc[i, 'digits'][:2]) < 30):
-            digits.loc[i, 'RM'] = 2.5
-        elif (int(digits.loc[i, 'digits'][:2]) >= 30 and int(digits.loc[i, 'digits'][:2]) < 35):
-            digits.loc[i, 'RM'] = 3.0
-        elif (int(digits.loc[i, 'digits'][:2]) >= 35 and int(digits.loc[i, 'digits'][:2]) < 40):
-            digits.loc[i, 'RM'] = 3.5
-        elif (int(digits.loc[i, 'digits'][:2]) >= 40 and int(digits.loc[i, 'digits'][:2]) < 45):
-            digits.loc[i, 'RM'] = 4.0
-        elif (int(digits.loc[i, 'digits'][:2]) >= 45 and int(digits.loc[i, 'digits'][:2]) < 50):
-            digits.loc[i, 'RM'] = 4.5
-        elif (int(digits.loc[i, 'digits'][:2]) >= 50 and int(digits.loc[i, 'digits'][:2]) < 55):
-            digits.loc[i, 'RM'] = 5.0
-        elif (int(digits.loc[i, 'digits'][:2]) >= 55 and int(digits.loc[i, 'digits'][:2]) < 60):
-            digits.loc[i, 'RM'] = 5.5
-        elif (int(digits.loc[i, 'digits'][:2]) >= 60 and int(digits.loc[i, 'digits'][:2]) < 65):
-            digits.loc[i, 'RM'] = 6.0
-        elif (int(digits.loc[i, 'digits'][:2]) >= 65 and int(digits.loc[i, 'digits'][:2]) < 70):
-            digits.loc[i, 'RM'] = 6.5
-        elif (int(digits.loc[i, 'digits'][:2]) >= 70 and int(digits.loc[i, 'digits'][:2]) < 75):
-            digits.loc[i, 'RM'] = 7.0
-        elif (int(digits.loc[i, 'digits'][:2]) >= 75 and int(digits.loc[i, 'digits'][:2]) < 80):
-            digits.loc[i, 'RM'] = 7.5
-        elif (int(digits.loc[i, 'digits'][:2]) >= 80 and int(digits.loc[i, 'digits'][:2]) < 85):
-            digits.loc[i, 'RM'] = 8.0
-        elif (int(digits.loc[i, 'digits'][:2]) >= 85 and int(digits.loc[i, 'digits'][:2]) < 90):
-            digits.loc[i, 'RM'] = 8.5
+    hybrid_RM = pd.DataFrame({'RM': relative_maturity(hybrids).values,
+                              'Variety_Name': hybrids.values})
             
-    df_w_RM = df.merge(digits.drop(columns=['digits']),
+    df_w_RM = df.merge(hybrid_RM,
                        on=['Variety_Name'],
                        how='left')
     
@@ -1159,7 +1080,7 @@ def merge_2021_sales_data_impute_daily(df, abm_Teamkey):
         df_merged
     """
     # read in the 2021 sales data
-    sales_2021 = pd.read_csv(DATA_DIR + SALES_2021)
+    sales_2021 = load_source('sales_2021', copy=False)
     
     # grab relevant columns
     sales_2021_subset = sales_2021[['Team', 'VARIETY', 'CY Net Sales',
@@ -1211,31 +1132,20 @@ def merge_2021_sales_data_impute_daily(df, abm_Teamkey):
     sales_2021_agg = sales_2021_subset.groupby(
             by=['Variety_Name', 'abm'], as_index=False).sum()
     
-    # read in the monthly historical fractions
-    daily_fractions = pd.read_csv(DAILY_FRACTIONS)
-    
-    # grab the day from the daily fractions
-    daily_fractions_order_date = daily_fractions[
-            (daily_fractions['month'] == ORDER_DATE['month']) &
-            (daily_fractions['day'] == ORDER_DATE['day'])].reset_index(drop=True)
-    
-    daily_fractions_order_date = daily_fractions_order_date.drop(columns=['month', 'day'])
+    # impute the quantities to date with the historical daily fractions of the
+    # order date, leaving out the products/abms without a fraction
+    fractions = daily_fraction_cube()
+    to_date = impute_to_date(sales_2021_agg, fractions, months=ORDER_DATE['month'],
+                             days=ORDER_DATE['day'])[:, 0, :]
+    has_fraction = ((np.isnan(to_date).any(axis=1) == False) &
+                    sales_2021_agg.notna().all(axis=1).values)
     
-    # merge the monthly fractions
-    sales_2021_to_date = sales_2021_agg.merge(daily_fractions_order_date,
-                                              on=['abm'],
-                                              how='left')
-    
-    # drop NAs
-    sales_2021_to_date = sales_2021_to_date.dropna().reset_index(drop=True)
-            
-    quantities = ['nets', 'order', 'return', 'replant']
+    sales_2021_to_date = sales_2021_agg[has_fraction].reset_index(drop=True)
     
     sales_2021_to_date['nets_Q_eoy'] = sales_2021_to_date['nets_Q'].values
     
-    for qty in quantities:
-        sales_2021_to_date[qty + '_Q'] = sales_2021_to_date[qty + '_Q'] * sales_2021_to_date[qty + '_fraction']
-        sales_2021_to_date = sales_2021_to_date.drop(columns=[qty + '_fraction'])
+    for i, qty in enumerate(fractions['quantities']):
+        sales_2021_to_date[qty + '_Q'] = to_date[has_fraction, i]
         
     sales_2021_to_date['year'] = 2021
     sales_2021_to_date['year'] = sales_2021_to_date['year'].astype(str)    
@@ -1255,7 +1165,7 @@ def merge_2021_sales_data_impute_monthly(df, abm_Teamkey):
         df_merged
     """
     # read in the 2021 sales data
-    sales_2021 = pd.read_csv(DATA_DIR + SALES_2021)
+    sales_2021 = load_source('sales_2021', copy=False)
     
     # grab relevant columns
     sales_2021_subset = sales_2021[['Team', 'VARIETY', 'CY Net Sales',
@@ -1311,50 +1221,31 @@ def merge_2021_sales_data_impute_monthly(df, abm_Teamkey):
     sales_2021_agg_nets_Q = sales_2021_agg_nets_Q.rename(
             columns={'nets_Q': 'nets_Q_eoy'})
     
-    # read in the monthly historical fractions
-    monthly_fractions = pd.read_csv(MONTHLY_FRACTIONS)
+    # gather the historical monthly fractions of the month before the order
+    # date and of the order date, leaving out the products/abms without
+    # fractions
+    fractions = monthly_fraction_cube()
+    order_month = SEASON_MONTHS.index(ORDER_DATE['month'])
     
-    # merge the monthly fractions
-    sales_2021_monthly = sales_2021_agg.merge(monthly_fractions,
-                                              on=['abm'],
-                                              how='left')
+    has_fractions = ((np.isnan(gather_fractions(
+            fractions, sales_2021_agg['abm'].values,
+            range(len(SEASON_MONTHS)))).any(axis=1) == False) &
+            sales_2021_agg.notna().all(axis=1).values)
+    sales_2021_monthly = sales_2021_agg[has_fractions].reset_index(drop=True)
     
-    # drop NAs
-    sales_2021_monthly = sales_2021_monthly.dropna().reset_index(drop=True)
-        
-    # create the monthly order features
-    months = [9, 10, 11, 12, 1,2, 3, 4, 5, 6, 7]
-    quantities = ['order_Q', 'return_Q', 'replant_Q', 'nets_Q']
+    month_fractions = gather_fractions(fractions, sales_2021_monthly['abm'].values,
+                                       [order_month - 1, order_month])
     
     # impute the quantities using the monthly fractions
+    quantities = ['order_Q', 'return_Q', 'replant_Q', 'nets_Q']
     for qty in quantities:
-        for i in months:
-            sales_2021_monthly[qty + '_month_' + str(i)] = (
-                    sales_2021_monthly[qty] * sales_2021_monthly['frac_' + str(i)])
-        sales_2021_monthly[qty + '_month_8'] = sales_2021_monthly[qty].values
-        if ORDER_DATE['month'] != 1:
-            this_month = sales_2021_monthly[qty + '_month_' + str(ORDER_DATE['month'] - 1)].values
-        else:
-            this_month = sales_2021_monthly[qty + '_month_12'].values
-        
-        next_month = sales_2021_monthly[qty + '_month_' + str(ORDER_DATE['month'])].values
+        this_month = sales_2021_monthly[qty].values * month_fractions[:, 0]
+        next_month = sales_2021_monthly[qty].values * month_fractions[:, 1]
         this_month_change = next_month - this_month
         
         sales_2021_monthly[qty] = this_month + ORDER_FRACTION_2021 * this_month_change
-        
-        # drop monthly quantities
-        sales_2021_monthly = sales_2021_monthly.drop(
-                columns=[qty + '_month_9', qty + '_month_10', qty + '_month_11',
-                         qty + '_month_12', qty + '_month_1', qty + '_month_2',
-                         qty + '_month_3', qty + '_month_4', qty + '_month_5',
-                         qty + '_month_6', qty + '_month_7', qty + '_month_8'])
     
     sales_2021_monthly['year'] = '2021'
-                
-    # drop the fractional quantities
-    sales_2021_monthly = sales_2021_monthly.drop(
-            columns=['frac_9', 'frac_10', 'frac_11', 'frac_12', 'frac_1',
-                     'frac_2', 'frac_3', 'frac_4', 'frac_5', 'frac_6', 'frac_7'])
     
     # merge the eoy sales
     sales_2021_monthly_w_eoy = sales_2021_monthly.merge(sales_2021_agg_nets_Q, 
@@ -1376,7 +1267,7 @@ def merge_2022_sales_data_impute_daily(df, abm_Teamkey):
         df_merged
     """
     # read in the 2021 sales data
-    sales_2022 = pd.read_csv(DATA_DIR + SALES_2022)
+    sales_2022 = load_source('sales_2022', copy=False)
     
     # grab relevant columns
     sales_2022_subset = sales_2022[['Team', 'VARIETY', 'CY Net Sales',
@@ -1426,33 +1317,21 @@ def merge_2022_sales_data_impute_daily(df, abm_Teamkey):
     sales_2022_agg = sales_2022_subset.groupby(
             by=['Variety_Name', 'abm'], as_index=False).sum()
     
-    # read in the monthly historical fractions
-    daily_fractions = pd.read_csv(DAILY_FRACTIONS)
+    # impute the quantities to date with the historical daily fractions of the
+    # order date, leaving out the products/abms without a fraction
+    fractions = daily_fraction_cube()
+    to_date = impute_to_date(sales_2022_agg, fractions, months=ORDER_DATE['month'],
+                             days=ORDER_DATE['day'])[:, 0, :]
+    has_fraction = ((np.isnan(to_date).any(axis=1) == False) &
+                    sales_2022_agg.notna().all(axis=1).values)
     
-    # grab the day from the daily fractions
-    daily_fractions_order_date = daily_fractions[
-            (daily_fractions['month'] == ORDER_DATE['month']) &
-            (daily_fractions['day'] == ORDER_DATE['day'])].reset_index(drop=True)
-    
-    daily_fractions_order_date = daily_fractions_order_date.drop(columns=['month', 'day'])
-    
-    # merge the monthly fractions
-    sales_2022_to_date = sales_2022_agg.merge(daily_fractions_order_date,
-                                              on=['abm'],
-                                              how='left')
-    
-    # drop NAs
-    sales_2022_to_date = sales_2022_to_date.dropna().reset_index(drop=True)
+    sales_2022_to_date = sales_2022_agg[has_fraction].reset_index(drop=True)
     
     sales_2022_to_date['nets_Q_eoy'] = sales_2022_to_date['nets_Q'].values
-
     
-    quantities = ['nets', 'order', 'return', 'replant']
-    
-    for qty in quantities:
-        sales_2022_to_date[qty + '_Q'] = sales_2022_to_date[qty + '_Q'] * sales_2022_to_date[qty + '_fraction']
-        sales_2022_to_date = sales_2022_to_date.drop(columns=[qty + '_fraction'])
-
+    for i, qty in enumerate(fractions['quantities']):
+        sales_2022_to_date[qty + '_Q'] = to_date[has_fraction, i]
+        
     sales_2022_to_date['year'] = 2022
     sales_2022_to_date['year'] = sales_2022_to_date['year'].astype(str)    
     
@@ -1466,7 +1345,7 @@ def merge_2022_SCM_data(df, abm_Teamkey):
     """
     """
     # read in the SCM data
-    SCM_data = pd.read_csv(DATA_DIR + SCM_DATA_DIR + SCM_DATA_FILE)
+    SCM_data = load_source('scm', copy=False)
     
     SCM_data_subset = SCM_data[['Team', 'VARIETY', 'Dealer/Gross Orders', 
                                 'Returns', 'Replants', 'Haulbacks', 'CY Net Sales']]
@@ -1516,12 +1395,59 @@ def merge_2022_SCM_data(df, abm_Teamkey):
 
 
 def merge_2023_D1MS(df, abm_Teamkey):
+    """Adds the 2023 sales to date from the D1 MS file to the sales data. With
+    SALES_CHUNK_SIZE set the file is read and summed a chunk at a time.
+    
+    Keyword arguments:
+        df -- the dataframe of the sales data
+        abm_Teamkey -- the team key to abm converter
+    Returns:
+        df_w_23 -- the sales data with the 2023 sales added
     """
+    # read in the file
+    sales_23_no_date = read_csv_grouped(
+            source_path('sales_2023_d1ms'),
+            aggregate_chunk=lambda sales_23: aggregate_2023_D1MS(sales_23=sales_23,
+                                                                 abm_Teamkey=abm_Teamkey),
+            by=['year', 'Variety_Name', 'abm'],
+            chunk_size=SALES_CHUNK_SIZE,
+            **source_read_kwargs('sales_2023_d1ms'))
+    
+    # set the net sales quantity (use forecasted values here?)
+    sales_23_no_date['nets_Q_eoy'] = 0
+    
+    df_w_23 = pd.concat([df, sales_23_no_date])
+    
+    return df_w_23
+
+
+def aggregate_2023_D1MS(sales_23, abm_Teamkey):
+    """Sums the rows of the 2023 D1 MS file by year, product, and abm.
+    
+    Keyword arguments:
+        sales_23 -- the rows of the D1 MS file, or a chunk of them
+        abm_Teamkey -- the team key to abm converter
+    Returns:
+        sales_23_no_date -- the sales summed by year, product, and abm
     """
+    sales_23_subset = prepare_2023_D1MS(sales_23=sales_23, abm_Teamkey=abm_Teamkey)
     
-    # read in the file
-    sales_23 = pd.read_csv(DATA_DIR + 'D1_MS_23_product_location_022823.csv')
+    sales_23_no_date = sales_23_subset.drop(columns=['EFFECTIVE_DATE']).groupby(
+            by=['year', 'Variety_Name', 'abm'], as_index=False).sum()
+    
+    return sales_23_no_date
+
+
+def prepare_2023_D1MS(sales_23, abm_Teamkey):
+    """Selects the national brand soybean rows of the 2023 D1 MS file, with
+    the old abm names and the effective date as a datetime.
     
+    Keyword arguments:
+        sales_23 -- the rows of the D1 MS file, or a chunk of them
+        abm_Teamkey -- the team key to abm converter
+    Returns:
+        sales_23_subset -- the dated sales by year, product, and abm
+    """
     # fill nas with 0
     sales_23 = sales_23.fillna(0)
     
@@ -1550,30 +1476,13 @@ def merge_2023_D1MS(df, abm_Teamkey):
     # remove the 'RIB' string from the hybrid name
     sales_23_subset['Variety_Name'] = sales_23_subset['Variety_Name'].str.replace('RIB', '')
 
-    # change the effective date string to make the datetime readable
-    sales_23_dates = sales_23_subset['EFFECTIVE_DATE'].astype(str).to_frame()
-    
-    sales_23_dates['year'] = sales_23_dates['EFFECTIVE_DATE'].str[:4]
-    sales_23_dates['month'] = sales_23_dates['EFFECTIVE_DATE'].str[4:6]
-    sales_23_dates['day'] = sales_23_dates['EFFECTIVE_DATE'].str[6:8]
-    
-    sales_23_dates = sales_23_dates.drop(columns=['EFFECTIVE_DATE'])
-    
-    # create a datetime object out of the effective date
-    sales_23_subset['EFFECTIVE_DATE'] = pd.to_datetime(sales_23_dates)
+    # create a datetime object out of the YYYYMMDD effective date
+    sales_23_subset['EFFECTIVE_DATE'] = decode_yyyymmdd(sales_23_subset['EFFECTIVE_DATE'])
     
     # remove M string from the year
     sales_23_subset['year'] = sales_23_subset['year'].str.replace('M', '')
     
-    sales_23_no_date = sales_23_subset.drop(columns=['EFFECTIVE_DATE']).groupby(
-            by=['year', 'Variety_Name', 'abm'], as_index=False).sum()
-    
-    # set the net sales quantity (use forecasted values here?)
-    sales_23_no_date['nets_Q_eoy'] = 0
-    
-    df_w_23 = pd.concat([df, sales_23_no_date])
-    
-    return df_w_23
+    return sales_23_subset
 
 
 def Performance_with_yield_adv(df_performance):
@@ -1604,6 +1513,21 @@ def usda_acre_data(df, crop):
     Returns:
         df_w_acreage -- the dataframe with the yield data added
     """
+    df_w_acres = df.merge(usda_acre_table(crop=crop),
+                          on=['year', 'abm'],
+                          how='left')
+    
+    return df_w_acres
+
+
+def usda_acre_table(crop):
+    """Creates the USDA county level acreage of a crop summed by year and abm.
+    
+    Keyword arguments:
+        crop -- the crop we're adding acreage for
+    Returns:
+        county_acres_abm -- the acreage data by year and abm
+    """
     if crop == 'corn':
         ACRE_COUNTY_DATA = 'corn_acres.csv'
     elif crop == 'soybean':
@@ -1666,16 +1590,8 @@ def usda_acre_data(df, crop):
         
     county_acres_subset = county_acres_subset.drop_duplicates().reset_index(drop=True)
     
-    # read in the abm map
-    #abm_map = pd.read_csv(DATA_DIR + ABM_FIPS_MAP)
-    abm_map = pd.read_csv(YEARLY_ABM_FIPS_MAP)
-    
-    abm_map = abm_map[['year', 'fips', 'abm']]
-    
-    # merge on abm
-    county_acres_abm = county_acres_subset.merge(abm_map,
-                                                 on=['year', 'fips'],
-                                                 how='left')
+    # look up the abm by year and fips in the yearly abm map
+    county_acres_abm = join_abm(county_acres_subset, fips_abm_lookup(), how='left')
     county_acres_abm = county_acres_abm.drop(columns=['fips'])
     county_acres_abm = county_acres_abm.groupby(by=['year', 'abm'], as_index=False).sum()
     county_acres_abm['year'] = county_acres_abm['year'].astype(str)
@@ -1690,20 +1606,12 @@ def usda_acre_data(df, crop):
     county_acres_2022['year'] = '2022'
     county_acres_abm = pd.concat([county_acres_abm, county_acres_2022])
     
-    df_w_acres = df.merge(county_acres_abm,
-                          on=['year', 'abm'],
-                          how='left')
-    
     # same for 23! this is bad, have to think of a better way to make this work
     county_acres_2023 = county_acres_2022.copy()
     county_acres_2023['year'] = '2023'
     county_acres_abm = pd.concat([county_acres_abm, county_acres_2023])
     
-    df_w_acres = df.merge(county_acres_abm,
-                          on=['year', 'abm'],
-                          how='left')
-    
-    return df_w_acres
+    return county_acres_abm
 
 
 def update_age_trait():
@@ -1714,7 +1622,7 @@ def update_age_trait():
     Returns:
         updated_map -- the updated age/trait map
     """
-    CF_2022 = pd.read_excel(DATA_DIR + CF_2022_FILE)
+    CF_2022 = load_source('cf_2022', copy=False)
     pred_set_index = CF_2022[
             CF_2022['FORECAST_YEAR'] == 2022].reset_index(drop=True)
     pred_set_index = pred_set_index[
@@ -1766,8 +1674,23 @@ def usda_yield_data(df):
     Returns:
         df_w_yield -- the dataframe with the yield data added
     """
+    df_w_yield = df.merge(usda_yield_table(), 
+                          on=['year', 'abm'],
+                          how='left')
+    
+    return df_w_yield
+
+
+def usda_yield_table():
+    """Creates the USDA county level yield averaged by year and abm.
+    
+    Keyword arguments:
+        None
+    Returns:
+        county_yield_abm -- the yield data by year and abm
+    """
     # read in the yield data
-    county_yield = pd.read_csv(DATA_DIR + YIELD_COUNTY_DATA, low_memory=False)
+    county_yield = load_source('yield_county', copy=False)
     
     # grab the year, values, state and county ANSIs
     county_yield_subset = county_yield[['Year', 'State ANSI', 'County ANSI', 'Value']]
@@ -1819,14 +1742,9 @@ def usda_yield_data(df):
     
     county_yield_subset = county_yield_subset.drop_duplicates().reset_index(drop=True)
     
-    # read in the abm map
-    abm_map = pd.read_csv(DATA_DIR + ABM_FIPS_MAP)
-    abm_map = abm_map[['fips', 'abm']]
-    
-    # merge on abm
-    county_yield_abm = county_yield_subset.merge(abm_map,
-                                                 on=['fips'],
-                                                 how='left')
+    # look up the abm by fips in the abm map
+    county_yield_abm = join_abm(county_yield_subset,
+                                fips_abm_lookup(source='abm_fips_map', year=None), how='left')
     county_yield_abm = county_yield_abm.drop(columns=['fips'])
     
     county_yield_abm = county_yield_abm.groupby(by=['year', 'abm'], as_index=False).mean()
@@ -1840,12 +1758,8 @@ def usda_yield_data(df):
     county_yield_2022 = county_yield_2021.copy()
     county_yield_2022['year'] = '2022'
     county_yield_abm = pd.concat([county_yield_abm, county_yield_2022])
-
-    df_w_yield = df.merge(county_yield_abm, 
-                          on=['year', 'abm'],
-                          how='left')
     
-    return df_w_yield
+    return county_yield_abm
 
 
 def yield_aggregation(df):
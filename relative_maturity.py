@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 30 09:05:44 2026
+
+@author: epnzv
+"""
+import numpy as np
+import pandas as pd
+
+from aggregation_config import (RM_BINS)
+from stage_cache import (load_stage_output, save_stage_output, stage_key)
+
+
+def parse_relative_maturity(names, bins=None):
+    """Reads the relative maturity (RM) off product names. The first two digits
+    of the first number in the name (00 if there's none) are binned with the
+    bin table.
+
+    Keyword arguments:
+        names -- the series of product names
+        bins -- the list of (lowest two digit value, RM) bins in increasing
+            order, starting at 0. RM_BINS by default
+    Returns:
+        RM -- the series of the RMs, with the index of names
+    """
+    if bins is None:
+        bins = RM_BINS
+
+    names = pd.Series(names)
+    first_number = names.str.extract('([0-9]+)', expand=False).fillna('00')
+    two_digits = first_number.str[:2].astype(int).values
+
+    lower_bounds = np.array([lower for lower, _ in bins])
+    bin_RMs = np.array([RM for _, RM in bins], dtype='float64')
+    bin_index = np.searchsorted(lower_bounds, two_digits, side='right') - 1
+
+    return pd.Series(bin_RMs[np.maximum(bin_index, 0)], index=names.index)
+
+
+def relative_maturity(names):
+    """Returns the relative maturity of each product name, parsing only the
+    names that haven't been parsed before. The parsed names are kept in the
+    stage cache across runs, and dropped when the parsing or RM_BINS change.
+
+    Keyword arguments:
+        names -- the series of product names
+    Returns:
+        RM -- the series of the RMs, with the index of names
+    """
+    names = pd.Series(names)
+
+    key = stage_key('rm_memo', parse_relative_maturity, config=['RM_BINS'])
+    hit, memo = load_stage_output(name='rm_memo', key=key)
+    if hit == False:
+        memo = {}
+
+    new_names = [name for name in names.dropna().unique() if name not in memo]
+    if len(new_names) > 0:
+        memo.update(zip(new_names, parse_relative_maturity(new_names).values))
+        save_stage_output(name='rm_memo', key=key, output=memo)
+
+    return names.map(memo)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 22 08:51:27 2026
+
+@author: epnzv
+"""
+import json
+import os
+
+import pandas as pd
+
+from aggregation_config import (INTERMEDIATE_DIR, REFRESH_YEARS)
+from intermediate_store import (intermediate_path, read_intermediate, write_intermediate)
+from stage_cache import (stage_key)
+
+# the intermediates under INTERMEDIATE_DIR the year partitions are kept in
+SEASON_STORE_NAME = 'seasons'
+
+# the config constants that only choose which years are built, left out of
+# the partition keys so adding or refreshing a season doesn't rebuild the
+# other years
+SEASON_LIST_CONFIG = ['CF_Y1_FILES', 'H2H_YEARS', 'REFRESH_YEARS', 'SALES_YEARS', 'SEASON_STORE',
+                      'SRP_YEARS', 'WEATHER_YEARS']
+
+
+def load_partitions(name, build_year, year_files, config=(), **kwargs):
+    """Returns the per-year outputs of build_year for every year, building
+    only the years that aren't in the season store yet. Each year's output is
+    kept as its own intermediate along with the key of the files, config
+    constants, and code it was built from, so a year is built again only
+    when one of those changes, or when it's listed in REFRESH_YEARS.
+
+    Keyword arguments:
+        name -- the name of the partitioned data, e.g. 'weather'
+        build_year -- the function building one year's output, called with
+            year= and the keyword arguments
+        year_files -- a dictionary of year to the files the year's output is
+            built from, including the files any keyword arguments come from
+        config -- the names of the aggregation_config constants of the
+            calling stage, the ones in SEASON_LIST_CONFIG are left out
+        **kwargs -- the other keyword arguments of build_year
+    Returns:
+        df -- the outputs of all the years, in year order
+    """
+    manifest = read_manifest(name)
+    refresh_years = [int(year) for year in REFRESH_YEARS]
+
+    config = [constant for constant in config if constant not in SEASON_LIST_CONFIG]
+
+    partitions = []
+    built_years = []
+    for year in year_files:
+        key = stage_key(name + '/' + str(year), build_year, files=year_files[year],
+                        config=config)
+        partition_name = partition_intermediate(name, year)
+
+        if (int(year) not in refresh_years and manifest.get(str(year)) == key and
+                os.path.exists(intermediate_path(partition_name)) == True):
+            partitions.append(read_intermediate(partition_name))
+            continue
+
+        partition = build_year(year=year, **kwargs)
+        write_intermediate(partition, partition_name)
+        manifest[str(year)] = key
+        write_manifest(name, manifest)
+
+        partitions.append(partition)
+        built_years.append(year)
+
+    print("Season store ", name, ": built ", built_years, ", reused ",
+          len(partitions) - len(built_years), " years")
+
+    return pd.concat(partitions).reset_index(drop=True)
+
+
+def partition_intermediate(name, year):
+    """Returns the name of the intermediate holding a year's partition."""
+    return SEASON_STORE_NAME + '/' + name + '/' + str(year)
+
+
+def read_manifest(name):
+    """Reads the keys of the stored year partitions of name.
+
+    Keyword arguments:
+        name -- the name of the partitioned data
+    Returns:
+        manifest -- a dictionary of year (as a string) to partition key
+    """
+    path = os.path.join(INTERMEDIATE_DIR, SEASON_STORE_NAME, name, 'manifest.json')
+    if os.path.exists(path) == False:
+        return {}
+
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_manifest(name, manifest):
+    """Writes the keys of the stored year partitions of name.
+
+    Keyword arguments:
+        name -- the name of the partitioned data
+        manifest -- a dictionary of year (as a string) to partition key
+    Returns:
+        None
+    """
+    path = os.path.join(INTERMEDIATE_DIR, SEASON_STORE_NAME, name, 'manifest.json')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
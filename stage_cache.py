@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 09:12:40 2026
+
+@author: epnzv
+"""
+import hashlib
+import inspect
+import os
+import pickle
+import tempfile
+
+import aggregation_config
+
+from aggregation_config import (CACHE_DIR, CACHE_HASH_CONTENTS)
+
+# the directory holding this repo's modules, used to decide which helper
+# functions are part of a stage's code
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def cached_stage_call(name, key, func, **kwargs):
+    """Returns the output of a stage, loading it from the cache if a result
+    with the same key exists and running (and storing) the stage otherwise.
+
+    Keyword arguments:
+        name -- the name of the stage
+        key -- the stage key from stage_key
+        func -- the stage function
+        kwargs -- the keyword arguments passed to the stage function
+    Returns:
+        output -- the stage output
+    """
+    hit, output = load_stage_output(name=name, key=key)
+
+    if hit == True:
+        print("Stage ", name, " loaded from cache")
+        return output
+
+    print("Running stage ", name)
+    output = func(**kwargs)
+    save_stage_output(name=name, key=key, output=output)
+
+    return output
+
+
+def file_fingerprint(path, hash_contents=CACHE_HASH_CONTENTS):
+    """Creates a fingerprint of an input file. By default this is the path,
+    size, and modification time; with hash_contents the file is hashed instead
+    of using the modification time.
+
+    Keyword arguments:
+        path -- the path of the file
+        hash_contents -- whether to hash the file contents
+    Returns:
+        fingerprint -- the string fingerprint of the file
+    """
+    if os.path.exists(path) == False:
+        return path + ':missing'
+
+    stat = os.stat(path)
+
+    if hash_contents == True:
+        file_hash = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                file_hash.update(block)
+        return path + ':' + str(stat.st_size) + ':' + file_hash.hexdigest()
+
+    return path + ':' + str(stat.st_size) + ':' + str(stat.st_mtime_ns)
+
+
+def function_fingerprint(func, seen=None):
+    """Hashes the source of a stage function along with the source of every
+    function from this repo that it calls, so that editing a helper such as
+    clean_Weather invalidates the stages that use it.
+
+    Keyword arguments:
+        func -- the stage function
+        seen -- the names of the functions already hashed (used in recursion)
+    Returns:
+        source_hash -- the hex digest of the combined source
+    """
+    if seen is None:
+        seen = set()
+
+    source_hash = hashlib.sha256()
+
+    for source in _repo_function_sources(func, seen):
+        source_hash.update(source.encode('utf-8'))
+
+    return source_hash.hexdigest()
+
+
+def load_stage_output(name, key):
+    """Loads a stage output from the cache.
+
+    Keyword arguments:
+        name -- the name of the stage
+        key -- the stage key
+    Returns:
+        hit -- whether the output was found in the cache
+        output -- the cached output, None on a miss
+    """
+    path = stage_cache_path(name=name, key=key)
+
+    if os.path.exists(path) == False:
+        return False, None
+
+    # another process can replace the entry between the check and the read
+    try:
+        with open(path, 'rb') as f:
+            output = pickle.load(f)
+    except FileNotFoundError:
+        return False, None
+
+    return True, output
+
+
+def save_stage_output(name, key, output):
+    """Writes a stage output to the cache, replacing older outputs of the same
+    stage.
+
+    Keyword arguments:
+        name -- the name of the stage
+        key -- the stage key
+        output -- the stage output (a dataframe or a tuple of dataframes)
+    Returns:
+        None
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    # remove stale entries for this stage. several worker processes can save
+    # the same entry at once, so another one may have removed a file already
+    for file_name in os.listdir(CACHE_DIR):
+        if file_name.startswith(name + '-') and file_name.endswith('.pkl'):
+            try:
+                os.remove(os.path.join(CACHE_DIR, file_name))
+            except FileNotFoundError:
+                pass
+
+    # write to a temporary file of this writer's own first, so an interrupted
+    # run can't leave a truncated entry behind and writers don't collide
+    path = stage_cache_path(name=name, key=key)
+    handle, temp_path = tempfile.mkstemp(dir=CACHE_DIR, prefix=name + '-', suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'wb') as f:
+            pickle.dump(output, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path) == True:
+            os.remove(temp_path)
+        raise
+
+
+def stage_cache_path(name, key):
+    """Returns the path of the cache entry for a stage.
+
+    Keyword arguments:
+        name -- the name of the stage
+        key -- the stage key
+    Returns:
+        path -- the path of the cache file
+    """
+    return os.path.join(CACHE_DIR, name + '-' + key[:16] + '.pkl')
+
+
+def stage_key(name, func, files=(), config=(), upstream=()):
+    """Creates the content address of a stage from its input files, the
+    config constants it depends on, its code, and the keys of the stages it
+    takes outputs from.
+
+    Keyword arguments:
+        name -- the name of the stage
+        func -- the stage function
+        files -- the paths of the files the stage reads
+        config -- the names of the aggregation_config constants it uses
+        upstream -- the keys of the stages feeding into this one
+    Returns:
+        key -- the hex digest identifying this version of the stage output
+    """
+    key = hashlib.sha256()
+    key.update(name.encode('utf-8'))
+    key.update(function_fingerprint(func).encode('utf-8'))
+
+    for path in files:
+        key.update(file_fingerprint(path).encode('utf-8'))
+
+    for constant in config:
+        key.update((constant + '=' + repr(getattr(aggregation_config, constant))).encode('utf-8'))
+
+    for upstream_key in upstream:
+        key.update(upstream_key.encode('utf-8'))
+
+    return key.hexdigest()
+
+
+def _repo_function_sources(func, seen):
+    """Collects the source of a function and, recursively, of the functions
+    defined in this repo that it references.
+    """
+    qualified_name = func.__module__ + '.' + func.__qualname__
+    if qualified_name in seen:
+        return []
+    seen.add(qualified_name)
+
+    try:
+        sources = [inspect.getsource(func)]
+    except (OSError, TypeError):
+        return []
+
+    for global_name in func.__code__.co_names:
+        referenced = func.__globals__.get(global_name)
+        if inspect.isfunction(referenced) == False:
+            continue
+
+        source_file = inspect.getsourcefile(referenced)
+        if source_file is None or os.path.dirname(os.path.abspath(source_file)) != REPO_DIR:
+            continue
+
+        sources.extend(_repo_function_sources(referenced, seen))
+
+    return sources
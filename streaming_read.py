@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 24 09:26:03 2026
+
+@author: epnzv
+"""
+import pandas as pd
+
+
+def read_csv_grouped(path, aggregate_chunk, by, chunk_size=None, **read_kwargs):
+    """Reads a csv file and sums it by the group columns. With a chunk size,
+    the file is read that many rows at a time and each chunk's sums are
+    folded into a running total, so only one chunk and the groups are ever in
+    memory. aggregate_chunk has to work row by row (filters, renames, maps)
+    before its groupby, so the sums don't depend on where the chunks split.
+
+    Keyword arguments:
+        path -- the path of the csv file
+        aggregate_chunk -- the function taking a chunk of the file and returning
+            its sums by the group columns, with the group columns as columns
+        by -- the group columns
+        chunk_size -- the number of rows read at a time, None reads the whole
+            file at once
+        **read_kwargs -- the other keyword arguments of pd.read_csv
+    Returns:
+        df_grouped -- the sums of the whole file by the group columns
+    """
+    if chunk_size is None:
+        return aggregate_chunk(pd.read_csv(path, **read_kwargs))
+
+    df_grouped = None
+    for chunk in pd.read_csv(path, chunksize=chunk_size, **read_kwargs):
+        chunk_grouped = aggregate_chunk(chunk)
+
+        if df_grouped is None or len(df_grouped) == 0:
+            df_grouped = chunk_grouped
+        elif len(chunk_grouped) > 0:
+            df_grouped = pd.concat([df_grouped, chunk_grouped]).groupby(
+                    by=by, as_index=False).sum()
+
+    # a file with no rows has no chunks
+    if df_grouped is None:
+        df_grouped = aggregate_chunk(pd.read_csv(path, nrows=0, **read_kwargs))
+
+    return df_grouped
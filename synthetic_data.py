@@ -0,0 +1,631 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 09:20:44 2026
+
+@author: epnzv
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from aggregation_config import (ABM_FIPS_MAP, ABM_TABLE, BIG_CF_FILE, CF_2022_FILE,
+                                CF_2023_FILE, CM_DIR, CORN_SOY_ACRES, DAILY_FRACTIONS,
+                                H2H_DIR, HISTORICAL_SRP, HISTORICAL_SUPPLY, KYNETIC_COLUMNS_TO_DROP,
+                                KYNETIC_DATA, MONTHLY_FRACTIONS, PRICE_REC, PROD_LIST_23,
+                                PROD_LIST_24, SALES_2021, SALES_2021_W_DATE, SALES_2022,
+                                SALES_2023_D1MS, SALES_DIR, SCM_DATA_DIR, SCM_DATA_FILE,
+                                YEARLY_ABM_FIPS_MAP, YIELD_COUNTY_DATA)
+
+# the states the synthetic counties are placed in (name, fips code)
+SYNTHETIC_STATES = [('Illinois', 17), ('Indiana', 18), ('Iowa', 19), ('Kansas', 20),
+                    ('Michigan', 26), ('Minnesota', 27), ('Missouri', 29), ('Nebraska', 31),
+                    ('North Dakota', 38), ('Ohio', 39), ('South Dakota', 46), ('Wisconsin', 55)]
+
+# the traits given to the synthetic products
+SYNTHETIC_TRAITS = ['RR2X', 'XF', 'E3', 'CONV']
+
+
+def generate_synthetic_data(root, scale=1, seed=0):
+    """Writes a deterministic synthetic copy of every input file the pipeline
+    reads, with the same file names, columns, and value formats (e.g. the
+    comma separated quantities of the dealer files and the YYYYMMDD effective
+    dates of the D1MS files). The same root, scale, and seed always give the
+    same files. Row counts grow linearly with the scale: the number of
+    counties, products, and sales, H2H, and Kynetic rows are all multiplied by
+    it.
+
+    The files are laid out as root/data/ (DATA_DIR), root/blizzard/
+    (BLIZZARD_DIR), and root/work/, which holds the files read relative to the
+    working directory (the yearly abm map, the fractions, Age_Trait_2024.csv,
+    ...), so the pipeline runs on them from root/work/ with the config
+    returned by synthetic_config.
+
+    Keyword arguments:
+        root -- the directory to write the data to
+        scale -- the scale factor, 1 gives ~100 counties and ~40 products
+        seed -- the random seed
+    Returns:
+        config -- the aggregation_config overrides pointing at the data
+    """
+    rng = np.random.RandomState(seed)
+    config = synthetic_config(root)
+    data_dir = config['DATA_DIR']
+    blizzard_dir = config['BLIZZARD_DIR']
+    work_dir = os.path.join(root, 'work')
+
+    for directory in [data_dir + SALES_DIR, data_dir + SCM_DATA_DIR, data_dir + CM_DIR,
+                      data_dir + H2H_DIR, data_dir + HISTORICAL_SRP, blizzard_dir,
+                      os.path.join(work_dir, 'output')]:
+        os.makedirs(directory, exist_ok=True)
+
+    world = _synthetic_world(rng, scale)
+
+    print("Writing synthetic data at scale ", scale, " to ", root)
+    _write_geography(rng, world, data_dir, work_dir)
+    _write_sales(rng, world, data_dir, work_dir)
+    _write_forecasts(rng, world, data_dir, work_dir)
+    _write_products(rng, world, data_dir, work_dir)
+    _write_performance(rng, world, data_dir)
+    _write_weather(rng, world, blizzard_dir)
+    _write_commodity(rng, world, data_dir)
+    _write_usda(rng, world, data_dir)
+
+    return config
+
+
+def synthetic_config(root):
+    """Returns the aggregation_config overrides for synthetic data written to
+    root by generate_synthetic_data.
+
+    Keyword arguments:
+        root -- the directory the data was written to
+    Returns:
+        config -- the dictionary of config overrides
+    """
+    root = os.path.abspath(root)
+
+    return {'DATA_DIR': os.path.join(root, 'data') + '/',
+            'BLIZZARD_DIR': os.path.join(root, 'blizzard') + '/',
+            'CACHE_DIR': os.path.join(root, 'cache') + '/'}
+
+
+def _comma_quantities(values):
+    """Formats quantities the way the dealer files store them, e.g. '1,234'."""
+    return ['{:,}'.format(int(value)) for value in values]
+
+
+def _excel(df, path, skiprows, title):
+    """Writes a spreadsheet with a title and blank rows above the header, as
+    in the geocode and forecast files. Writing xlsx needs openpyxl; without it
+    the file is skipped and the readers of it fail when benchmarked.
+    """
+    try:
+        with pd.ExcelWriter(path) as writer:
+            pd.DataFrame([[title]]).to_excel(writer, index=False, header=False)
+            df.to_excel(writer, index=False, startrow=skiprows)
+    except ImportError as error:
+        print("Skipping ", path, " (", error, ")")
+
+
+def _season_dates(rng, year, n):
+    """Draws order dates between September 1 of the previous year and August
+    31 of the year, weighted towards the fall and winter.
+    """
+    start = np.datetime64(str(year - 1) + '-09-01')
+    days = (np.datetime64(str(year) + '-08-31') - start).astype(int)
+    offsets = np.minimum((rng.beta(1.5, 3.0, size=n) * (days + 1)).astype(int), days)
+
+    return start + offsets.astype('timedelta64[D]')
+
+
+def _synthetic_world(rng, scale):
+    """Creates the shared keys (states, counties, abms, team keys, products)
+    that every synthetic file is built from, so that they join up the way the
+    real files do.
+    """
+    counties_per_state = min(10 * scale, 999)
+    n_abm = max(12, int(round(12 * scale ** 0.5)))
+    n_products = 40 * scale
+
+    counties = []
+    for state_name, state_fips in SYNTHETIC_STATES:
+        for county in range(1, counties_per_state + 1):
+            counties.append({'state': state_name,
+                             'state_fips': state_fips,
+                             'county_fips': county,
+                             'fips': state_fips * 1000 + county,
+                             'county': 'Cnty' + str(county).zfill(3),
+                             'ag_district': 10 * (1 + county % 9),
+                             'latitude': round(36.0 + state_fips % 10 + county * 0.011, 2),
+                             'longitude': round(-104.0 + state_fips % 7 * 1.3 + county * 0.013, 2)})
+    counties = pd.DataFrame(counties)
+
+    # abms are contiguous runs of counties, a few counties move abm in some years
+    abms = np.array(['A' + str(i).zfill(3) for i in range(n_abm)])
+    counties['abm'] = abms[np.arange(len(counties)) * n_abm // len(counties)]
+    team_keys = np.array(['T' + str(5000 + i) for i in range(n_abm)])
+
+    # products launch between 2006 and 2024 and are sold for 3 to 9 years
+    # the names carry the relative maturity as their first digits (e.g. AG24X7 is
+    # a 2.4 RM XF product), as get_RM expects
+    launch = rng.randint(2006, 2025, size=n_products)
+    relative_maturity = rng.randint(0, 60, size=n_products)
+    traits = rng.choice(SYNTHETIC_TRAITS, size=n_products)
+    products = pd.DataFrame({
+            'Variety_Name': ['AG' + str(rm).zfill(2) + trait[0] + str(i)
+                             for i, (rm, trait) in enumerate(zip(relative_maturity, traits))],
+            'launch': launch,
+            'last': launch + rng.randint(3, 10, size=n_products),
+            'SRP': np.round(rng.uniform(40, 70, size=n_products), 2),
+            'trait': traits})
+
+    return {'scale': scale,
+            'counties': counties,
+            'abms': abms,
+            'team_keys': team_keys,
+            'products': products}
+
+
+def _active_products(world, year):
+    """Returns the names of the products sold in a year."""
+    products = world['products']
+
+    return products.loc[(products['launch'] <= year) & (products['last'] >= year),
+                        'Variety_Name'].values
+
+
+def _write_commodity(rng, world, data_dir):
+    """Writes the corn and soybean futures prices by update and contract date."""
+    contract_months = {'corn': [3, 5, 7, 9, 12], 'soybean': [1, 3, 5, 7, 8, 9, 11]}
+    files = {'corn': 'corn_to_01242023.csv', 'soybean': 'soybean_to_01242023.csv'}
+    days = [1, 8, 15, 22][:max(1, min(4, world['scale']))]
+
+    for crop, months in contract_months.items():
+        rows = []
+        base = 4.0 if crop == 'corn' else 10.0
+        for update_year in range(2005, 2024):
+            for update_month in range(1, 13):
+                for day in days:
+                    for contract_year in [update_year, update_year + 1]:
+                        for contract_month in months:
+                            rows.append([crop, base * rng.uniform(0.7, 1.5),
+                                         str(contract_year) + '-' + str(contract_month).zfill(2) + '-14',
+                                         str(update_year) + '-' + str(update_month).zfill(2) + '-' +
+                                         str(day).zfill(2)])
+        df = pd.DataFrame(rows, columns=['Crop', 'Price', 'Contract Date', 'Update Date'])
+        df.loc[rng.rand(len(df)) < 0.01, 'Price'] = np.nan
+        df.to_csv(data_dir + CM_DIR + files[crop], index=False)
+
+
+def _write_forecasts(rng, world, data_dir, work_dir):
+    """Writes the consensus forecast files and the 2023 net sales forecast."""
+    team_keys = world['team_keys']
+    columns = ['FORECAST_YEAR', 'TEAM_KEY', 'ACRONYM_NAME', 'TEAM_Y1_FCST_1']
+
+    def forecasts(years):
+        rows = []
+        for year in years:
+            for product in _active_products(world, year + 1):
+                for team in rng.choice(team_keys, size=min(len(team_keys), 6), replace=False):
+                    rows.append([year, team, product, float(rng.randint(0, 400))])
+        return pd.DataFrame(rows, columns=columns)
+
+    # the y + 1 forecasts, the 2022 file holds both the 2022 and 2023 forecast years
+    forecasts([2020, 2021]).to_csv(data_dir + BIG_CF_FILE, index=False)
+    cf_2022 = forecasts([2022, 2023])
+    cf_2022['BASE_TRAIT'] = world['products'].set_index('Variety_Name').loc[
+            cf_2022['ACRONYM_NAME'], 'trait'].values
+    _excel(cf_2022, data_dir + CF_2022_FILE, 0, 'FY23')
+    cf_2023 = forecasts([2023])
+    cf_2023['BASE_TRAIT'] = world['products'].set_index('Variety_Name').loc[
+            cf_2023['ACRONYM_NAME'], 'trait'].values
+    _excel(cf_2023, data_dir + CF_2023_FILE, 0, 'FY24')
+
+    # the older forecast files
+    for file_name, years in [('FY16_20_soybean.csv', range(2016, 2021)),
+                             ('FY22_01_14_21.csv', [2021])]:
+        old = forecasts(years)
+        old['CROP_DESCR'] = rng.choice(['SOYBEAN', 'CORN'], size=len(old), p=[0.9, 0.1])
+        old['BRAND_GROUP'] = rng.choice(['ASGROW', 'NATIONAL', 'CHANNEL'], size=len(old))
+        old.to_csv(data_dir + file_name, index=False)
+
+    cf_2016_2022 = forecasts(range(2016, 2022)).rename(
+            columns={'FORECAST_YEAR': 'year', 'ACRONYM_NAME': 'Variety_Name'})
+    cf_2016_2022.to_csv(os.path.join(work_dir, 'CF_2016_2022.csv'), index=False)
+
+    # the 2023 net sales forecast
+    net_sales = pd.DataFrame([[2023, product, abm, float(rng.randint(0, 2000))]
+                              for product in _active_products(world, 2023)
+                              for abm in world['abms']],
+                             columns=['year', 'hybrid', 'abm', 'loc'])
+    net_sales.to_csv(os.path.join(work_dir, 'net_sales_23_fcst.csv'), index=False)
+
+
+def _write_geography(rng, world, data_dir, work_dir):
+    """Writes the abm table, the abm/fips maps, the geocode spreadsheets, and
+    the county locations used by the weather data.
+    """
+    counties = world['counties']
+    abms = world['abms']
+
+    pd.DataFrame({'Old Area ID': abms,
+                  'New Area ID': world['team_keys'],
+                  'Area Name': ['Area ' + abm for abm in abms]}).to_csv(
+            data_dir + ABM_TABLE, index=False)
+
+    # the yearly map, with ~3% of counties in a neighbouring abm each year
+    yearly = []
+    for year in range(2008, 2023):
+        year_map = counties[['fips', 'abm']].copy()
+        moved = rng.rand(len(year_map)) < 0.03
+        year_map.loc[moved, 'abm'] = abms[(np.searchsorted(abms, year_map.loc[moved, 'abm'].values) + 1)
+                                          % len(abms)]
+        year_map.insert(0, 'year', year)
+        year_map['state'] = counties['state'].values
+        yearly.append(year_map)
+    pd.concat(yearly).to_csv(os.path.join(work_dir, YEARLY_ABM_FIPS_MAP), index=False)
+
+    abm_map = counties[['fips', 'abm']].copy()
+    abm_map['crd'] = (counties['state_fips'].astype(str) +
+                      counties['ag_district'].astype(str)).astype(float)
+    abm_map.to_csv(data_dir + ABM_FIPS_MAP, index=False)
+
+    states = pd.DataFrame({'Region': 2,
+                           'Division': 3,
+                           'State (FIPS)': [state_fips for _, state_fips in SYNTHETIC_STATES],
+                           'Name': [state_name for state_name, _ in SYNTHETIC_STATES]})
+    states = pd.concat([pd.DataFrame({'Region': [2], 'Division': [0], 'State (FIPS)': [0],
+                                      'Name': ['Midwest Region']}), states])
+    _excel(states, os.path.join(work_dir, 'state-geocodes-v2018.xlsx'), 5,
+           'Census Bureau Region, Division, and State FIPS Codes')
+
+    area_column = 'Area Name (including legal/statistical area description)'
+    geocodes = pd.DataFrame({'Summary Level': 50,
+                             'State Code (FIPS)': counties['state_fips'],
+                             'County Code (FIPS)': counties['county_fips'],
+                             'County Subdivision Code (FIPS)': 0,
+                             'Place Code (FIPS)': 0,
+                             'Consolidtated City Code (FIPS)': 0,
+                             area_column: counties['county'] + ' County'})
+    state_rows = pd.DataFrame({'Summary Level': 40,
+                               'State Code (FIPS)': [state_fips for _, state_fips in SYNTHETIC_STATES],
+                               'County Code (FIPS)': 0,
+                               'County Subdivision Code (FIPS)': 0,
+                               'Place Code (FIPS)': 0,
+                               'Consolidtated City Code (FIPS)': 0,
+                               area_column: [state_name for state_name, _ in SYNTHETIC_STATES]})
+    _excel(pd.concat([state_rows, geocodes]), os.path.join(work_dir, 'all-geocodes-v2018.xlsx'), 4,
+           'All Geocodes, 2018')
+
+    # historical daily and monthly fractions of the end of year quantities
+    season = pd.date_range('2019-09-01', '2020-08-31')
+    progress = np.linspace(0, 1, len(season)) ** 0.7
+    daily = []
+    for abm in abms:
+        frame = pd.DataFrame({'abm': abm, 'month': season.month, 'day': season.day})
+        for qty in ['nets', 'order', 'return', 'replant']:
+            frame[qty + '_fraction'] = np.minimum(progress * rng.uniform(0.9, 1.1), 1.0)
+        daily.append(frame)
+    pd.concat(daily).to_csv(os.path.join(work_dir, DAILY_FRACTIONS), index=False)
+
+    monthly = pd.DataFrame({'abm': abms})
+    for i, month in enumerate([9, 10, 11, 12, 1, 2, 3, 4, 5, 6, 7]):
+        monthly['frac_' + str(month)] = (i + 1) / 12.0 * rng.uniform(0.9, 1.0, size=len(abms))
+    monthly.to_csv(os.path.join(work_dir, MONTHLY_FRACTIONS), index=False)
+
+
+def _write_performance(rng, world, data_dir):
+    """Writes the head to head yield trials, Combined_H2HYYYY.csv."""
+    counties = world['counties']
+    products = world['products'].set_index('Variety_Name')
+    n_rows = 500 * world['scale']
+
+    for year in range(2011, 2023):
+        active = _active_products(world, year)
+        sites = counties.iloc[rng.randint(0, len(counties), size=n_rows)]
+        c_hybrid = rng.choice(active, size=n_rows)
+        o_hybrid = rng.choice(active, size=n_rows)
+        c_yield = np.round(rng.normal(60, 8, size=n_rows), 1)
+        o_yield = np.round(rng.normal(60, 8, size=n_rows), 1)
+        c_yield[rng.rand(n_rows) < 0.002] = 0
+
+        pd.DataFrame({'state': sites['state'].values,
+                      'county': sites['county'].values,
+                      'c_hybrid': c_hybrid,
+                      'c_trait': products.loc[c_hybrid, 'trait'].values,
+                      'c_yield': c_yield,
+                      'o_hybrid': o_hybrid,
+                      'o_trait': products.loc[o_hybrid, 'trait'].values,
+                      'o_yield': o_yield}).to_csv(
+                data_dir + H2H_DIR + 'Combined_H2H' + str(year) + '.csv', index=False)
+
+
+def _write_products(rng, world, data_dir, work_dir):
+    """Writes the product level files: SRPs, the Kynetic survey, the trait
+    map, the age/trait map, the product lists, and the supply data.
+    """
+    products = world['products']
+    counties = world['counties']
+
+    # SRP files, whose format changes over the years
+    for year in range(2011, 2025):
+        active = products[(products['launch'] <= year) & (products['last'] >= year)]
+        srp = np.round(active['SRP'].values * (1 + 0.02 * (year - 2011)), 2)
+        if year < 2020:
+            values = [' $' + '{:.2f}'.format(value) + ' ' for value in srp]
+            values = np.where(rng.rand(len(values)) < 0.03, ' - ', values)
+            df = pd.DataFrame({'VARIETY': active['Variety_Name'].values, 'SRP': values,
+                               'Brand': 'ASGROW'})
+            df.to_csv(data_dir + HISTORICAL_SRP + str(year) + '_SRP.csv', index=False)
+        elif year == 2020:
+            pd.DataFrame({'Product': active['Variety_Name'].values, 'Price': srp}).to_csv(
+                    data_dir + HISTORICAL_SRP + '2020_SRP.csv', index=False)
+        elif year == 2021:
+            pd.DataFrame({'Product': active['Variety_Name'].values, 'SRP': srp}).to_csv(
+                    data_dir + HISTORICAL_SRP + '21_product_srp.csv', index=False)
+        else:
+            pd.DataFrame({'Product Name': active['Variety_Name'].values, 'Srp': srp,
+                          'Trait': active['trait'].values}).to_csv(
+                    data_dir + HISTORICAL_SRP + str(year - 2000) + '_product_srp.csv', index=False)
+
+    # the Kynetic survey, whose export has a trailing unnamed column
+    rows = []
+    n_rows = 300 * world['scale']
+    for year in range(2008, 2023):
+        active = products[(products['launch'] <= year) & (products['last'] >= year)]
+        picked = active.iloc[rng.randint(0, len(active), size=n_rows)]
+        sites = counties.iloc[rng.randint(0, len(counties), size=n_rows)]
+        rows.append(pd.DataFrame({'Year': year,
+                                  'County (Numeric)': sites['fips'].values,
+                                  'Hybrid/Variety': picked['Variety_Name'].values,
+                                  'Retail Price': np.round(picked['SRP'].values *
+                                                           rng.uniform(0.8, 1.0, size=n_rows), 2),
+                                  'Discount Amount': np.round(rng.uniform(0, 8, size=n_rows), 2)}))
+    kynetic = pd.concat(rows).reset_index(drop=True)
+    for column in KYNETIC_COLUMNS_TO_DROP:
+        kynetic[column] = rng.randint(1, 100, size=len(kynetic))
+    kynetic['Crop'] = 'Soybeans'
+    kynetic['State'] = 'IL'
+    kynetic['Company/Brand'] = 'Asgrow'
+    kynetic['Seed Trait'] = 'RR2X'
+    kynetic['Acre Range'] = '250-499'
+    kynetic['Projected Units'] = _comma_quantities(rng.randint(100, 5000, size=len(kynetic)))
+    kynetic[''] = np.nan
+    kynetic.to_csv(data_dir + KYNETIC_DATA, index=False)
+
+    pd.DataFrame({'trait': ['RR2X', 'XF', 'CONV', 'Conventional', 'RR', 'SR'],
+                  'RR': [1, 1, None, None, 1, None],
+                  'SR': [None, None, None, None, None, 1],
+                  'RR2X': [1, None, None, None, None, None],
+                  'XF': [None, 1, None, None, None, None],
+                  'trait_RR2X': [1, 0, 0, 0, 0, 0],
+                  'trait_XF': [0, 1, 0, 0, 0, 0]}).to_csv(
+            data_dir + 'soybean_trait_map_xf.csv', index=False)
+
+    # the age/trait map for every year a product is sold
+    age_trait = pd.DataFrame([[year, row.Variety_Name, year - row.launch + 1, row.trait]
+                              for row in products.itertuples()
+                              for year in range(max(row.launch, 2008), min(row.last, 2024) + 1)],
+                             columns=['year', 'Variety_Name', 'age', 'trait'])
+    age_trait.to_csv(os.path.join(work_dir, 'Age_Trait_2024.csv'), index=False)
+    age_trait[age_trait['year'] <= 2022].to_csv(os.path.join(work_dir, 'Age_Trait.csv'),
+                                                 index=False)
+
+    # the product lists
+    pd.DataFrame({'ACRONYM_NAME': _active_products(world, 2023)}).to_csv(
+            data_dir + PROD_LIST_23, index=False)
+    prod_list_24 = pd.DataFrame([[product, team] for product in _active_products(world, 2024)
+                                 for team in world['team_keys']],
+                                columns=['ACRONYM_NAME', 'TEAM_KEY'])
+    prod_list_24.to_csv(data_dir + PROD_LIST_24, index=False)
+    prod_list_24.to_csv(os.path.join(work_dir, PROD_LIST_24), index=False)
+
+    # the historical supply by year, abm, and product
+    supply = pd.DataFrame([[year, abm, product, float(rng.randint(0, 5000))]
+                           for year in range(2016, 2023)
+                           for product in _active_products(world, year)
+                           for abm in world['abms']
+                           if rng.rand() < 0.8],
+                          columns=['year', 'abm', 'hybrid', 'avai_supply_region'])
+    supply.to_csv(os.path.join(work_dir, HISTORICAL_SUPPLY), index=False)
+
+
+def _write_sales(rng, world, data_dir, work_dir):
+    """Writes the yearly sales transactions for 2012 to 2020, the 2021 and
+    2022 dealer files, the dated D1MS order files, and the SCM file.
+    """
+    abms = world['abms']
+    team_keys = world['team_keys']
+    n_rows = 3000 * world['scale']
+
+    for year in range(2012, 2021):
+        active = _active_products(world, year)
+        abm_index = rng.randint(0, len(abms), size=n_rows)
+        orders = rng.randint(1, 400, size=n_rows)
+        returns = (orders * rng.uniform(0, 0.2, size=n_rows)).astype(int)
+        replants = (orders * rng.uniform(0, 0.05, size=n_rows)).astype(int)
+        fips = world['counties']['fips'].values[rng.randint(0, len(world['counties']), size=n_rows)]
+
+        # 2020 is keyed by the new team keys rather than the old abm ids
+        sales_level = team_keys[abm_index] if year == 2020 else abms[abm_index]
+
+        pd.DataFrame({'SPECIE_DESCR': rng.choice(['SOYBEAN', 'CORN'], size=n_rows, p=[0.85, 0.15]),
+                      'BRAND_FAMILY_DESCR': rng.choice(['NATIONAL', 'REGIONAL'], size=n_rows,
+                                                       p=[0.9, 0.1]),
+                      'EFFECTIVE_DATE': pd.DatetimeIndex(_season_dates(rng, year, n_rows)).strftime('%Y-%m-%d'),
+                      'DEALER_ACCOUNT_CY_BRAND_FAMILY': 'NATIONAL',
+                      'SHIPPING_STATE_CODE': fips // 1000,
+                      'SHIPPING_COUNTY': 'Cnty' + pd.Series(fips % 1000).astype(str).str.zfill(3),
+                      'SHIPPING_FIPS_CODE': fips,
+                      'SLS_LVL_1_ID': 'R' + pd.Series(abm_index % 4).astype(str),
+                      'SLS_LVL_2_ID': sales_level,
+                      'CUST_ID': rng.randint(100000, 999999, size=n_rows),
+                      'ACCT_ID': rng.randint(100000, 999999, size=n_rows),
+                      'VARIETY_NAME': rng.choice(active, size=n_rows),
+                      'NET_SALES_QTY_TO_DATE': orders - returns,
+                      'ORDER_QTY_TO_DATE': orders,
+                      'RETURN_QTY_TO_DATE': returns,
+                      'REPLANT_QTY_TO_DATE': replants,
+                      'NET_SHIPPED_QTY_TO_DATE': orders - returns}).to_csv(
+                data_dir + SALES_DIR + str(year) + '.csv', index=False)
+
+    # the dealer level files, with comma separated quantities and a dated order
+    # bank alongside (the 2022 file is read as both)
+    for year, file_name in [(2021, SALES_2021), (2022, SALES_2022)]:
+        active = _active_products(world, year)
+        n_dealers = n_rows // 4
+        varieties = rng.choice(active, size=n_dealers).astype(object)
+        varieties[rng.rand(n_dealers) < 0.01] = '(Empty)'
+        orders = rng.randint(1, 4000, size=n_dealers)
+        returns = (orders * rng.uniform(0, 0.2, size=n_dealers)).astype(int)
+        replants = orders // 40
+        # a large first dealer, so every quantity column has thousands separators
+        orders[0], returns[0], replants[0] = 40000, 4000, 2000
+        teams = rng.choice(team_keys, size=n_dealers)
+        dealer = pd.DataFrame({'Team': teams,
+                               'VARIETY': varieties,
+                               'Dealer': rng.randint(1000, 9999, size=n_dealers),
+                               'CY Net Sales': _comma_quantities(orders - returns // 2),
+                               'Returns': _comma_quantities(returns // 2),
+                               'Haulbacks': _comma_quantities(returns - returns // 2),
+                               'Replants': _comma_quantities(replants),
+                               'Shipped': _comma_quantities(orders),
+                               'Orders': _comma_quantities(orders)})
+        if year == 2022:
+            dealer = pd.concat([dealer, _dated_orders(rng, world, year, n_dealers, 'SUM(ORDER_QTY_TO_DATE)')],
+                               axis=1)
+        dealer.to_csv(data_dir + file_name, index=False)
+
+    _dated_orders(rng, world, 2021, n_rows // 4, 'SUM(ORDER_QTY_TO_DATE)').to_csv(
+            data_dir + SALES_2021_W_DATE, index=False)
+
+    # the 2023 D1MS file, with an 'M' prefixed marketing year and 'RIB' products
+    d1ms = _dated_orders(rng, world, 2023, n_rows // 2, 'SUM(ORDER_QTY_TO_DATE)')
+    d1ms['MK_YR'] = 'M2023'
+    rib = rng.rand(len(d1ms)) < 0.05
+    d1ms.loc[rib, 'VARIETY_NAME'] = d1ms.loc[rib, 'VARIETY_NAME'] + 'RIB'
+    orders = d1ms['SUM(ORDER_QTY_TO_DATE)'].values
+    d1ms['SUM(RETURN_QTY_TO_DATE)'] = (orders * rng.uniform(0, 0.1, size=len(d1ms))).astype(int)
+    d1ms['SUM(REPLANT_QTY_TO_DATE)'] = (orders * rng.uniform(0, 0.03, size=len(d1ms))).astype(int)
+    d1ms['SUM(NET_SALES_QTY_TO_DATE)'] = orders - d1ms['SUM(RETURN_QTY_TO_DATE)']
+    d1ms.to_csv(data_dir + SALES_2023_D1MS, index=False)
+
+    # the SCM file
+    n_dealers = n_rows // 4
+    orders = rng.randint(1, 4000, size=n_dealers)
+    orders[0] = 90000
+    pd.DataFrame({'Team': rng.choice(team_keys, size=n_dealers),
+                  'VARIETY': rng.choice(_active_products(world, 2022), size=n_dealers),
+                  'Dealer/Gross Orders': _comma_quantities(orders),
+                  'Returns': _comma_quantities(orders // 10),
+                  'Replants': _comma_quantities(orders // 50),
+                  'Haulbacks': _comma_quantities(orders // 20),
+                  'CY Net Sales': _comma_quantities(orders - orders // 10)}).to_csv(
+            data_dir + SCM_DATA_DIR + SCM_DATA_FILE, index=False)
+
+
+def _dated_orders(rng, world, year, n_rows, quantity_column):
+    """Creates order rows with YYYYMMDD effective dates, as in the D1MS and
+    DSM exports.
+    """
+    return pd.DataFrame({'MK_YR': year,
+                         'EFFECTIVE_DATE': pd.DatetimeIndex(
+                                 _season_dates(rng, year, n_rows)).strftime('%Y%m%d').astype(int),
+                         'BRAND_FAMILY_DESCR': rng.choice(['NATIONAL', 'REGIONAL'], size=n_rows,
+                                                          p=[0.9, 0.1]),
+                         'SPECIE_DESCR': rng.choice(['SOYBEAN', 'CORN'], size=n_rows,
+                                                    p=[0.85, 0.15]),
+                         'VARIETY_NAME': rng.choice(_active_products(world, year), size=n_rows),
+                         'SLS_LVL_2_ID': rng.choice(world['team_keys'], size=n_rows),
+                         quantity_column: rng.randint(1, 400, size=n_rows)})
+
+
+def _write_usda(rng, world, data_dir):
+    """Writes the USDA county yields and acreages, the state prices received,
+    and the crop reporting district acreages.
+    """
+    counties = world['counties']
+    years = range(2008, 2021)
+
+    def county_frame(value_scale):
+        rows = []
+        for year in years:
+            frame = pd.DataFrame({'Program': 'SURVEY',
+                                  'Year': year,
+                                  'State': counties['state'].str.upper().values,
+                                  'State ANSI': counties['state_fips'].values,
+                                  'County ANSI': counties['county_fips'].values.astype(float),
+                                  'Value': rng.uniform(0.5, 1.5, size=len(counties)) * value_scale})
+            rows.append(frame)
+        df = pd.concat(rows).reset_index(drop=True)
+        # the "OTHER (COMBINED) COUNTIES" rows have no county code
+        df.loc[rng.rand(len(df)) < 0.02, 'County ANSI'] = np.nan
+        return df
+
+    county_yield = county_frame(50)
+    county_yield['Value'] = county_yield['Value'].round(1)
+    county_yield.to_csv(data_dir + YIELD_COUNTY_DATA, index=False)
+
+    for crop, value_scale in [('corn', 60000), ('soybean', 50000)]:
+        acres = county_frame(value_scale)
+        acres['Value'] = _comma_quantities(acres['Value'].values + 1000)
+        acres.to_csv(data_dir + crop + '_acres.csv', index=False)
+
+    # the state prices received
+    states = [state_name.upper() for state_name, _ in SYNTHETIC_STATES]
+    rows = []
+    for year in range(2006, 2023):
+        for commodity, price in [('CORN', 4.0), ('SOYBEANS', 10.0)]:
+            for state in states:
+                for period in ['MARKETING YEAR', 'YEAR']:
+                    value = ' ' + '{:.2f}'.format(price * rng.uniform(0.7, 1.4))
+                    if rng.rand() < 0.03:
+                        value = rng.choice([' (NA)', ' (D)', ' (S)'])
+                    rows.append(['STATE', year, period, commodity, state, value])
+            rows.append(['NATIONAL', year, 'YEAR', commodity, 'US TOTAL',
+                         ' ' + '{:.2f}'.format(price)])
+    pd.DataFrame(rows, columns=['Geo Level', 'Year', 'Period', 'Commodity', 'State',
+                                'Value']).to_csv(data_dir + PRICE_REC, index=False)
+
+    # the acreage by crop reporting district
+    districts = counties[['state', 'state_fips', 'ag_district']].drop_duplicates()
+    rows = []
+    for year in range(2008, 2020):
+        for commodity in ['CORN', 'SOYBEANS']:
+            for district in districts.itertuples():
+                rows.append([year, commodity, district.state.upper(), district.state_fips,
+                             district.ag_district, float(rng.randint(10000, 900000))])
+    pd.DataFrame(rows, columns=['Year', 'Commodity', 'State', 'State ANSI', 'Ag District Code',
+                                'Value']).to_csv(data_dir + CORN_SOY_ACRES, index=False)
+
+
+def _write_weather(rng, world, blizzard_dir):
+    """Writes the monthly county weather, Blizzard_YYYY.csv, and the county
+    locations. A few points don't match a county location, as in the real
+    data.
+    """
+    counties = world['counties']
+    counties[['fips', 'latitude', 'longitude']].to_csv(blizzard_dir + 'county_locations.csv',
+                                                       index=False)
+
+    n_points = len(counties)
+    for year in range(2012, 2025):
+        months = 12 if year < 2024 else 2
+        month = np.repeat(np.arange(1, months + 1), n_points)
+        latitude = np.tile(counties['latitude'].values, months)
+        longitude = np.tile(counties['longitude'].values, months)
+        unmatched = rng.rand(len(month)) < 0.01
+        latitude = np.where(unmatched, latitude + 0.5, latitude)
+        maximum_temperature = 5 + 2.5 * (6.5 - np.abs(6.5 - month)) + rng.normal(0, 2, size=len(month))
+
+        pd.DataFrame({'year': year,
+                      'month': month,
+                      'latitude': latitude,
+                      'longitude': longitude,
+                      'precipitation': np.round(rng.gamma(2.0, 40.0, size=len(month)), 2),
+                      'total_solar_radiation': np.round(rng.normal(500, 80, size=len(month)), 2),
+                      'minimum_temperature': np.round(maximum_temperature - rng.uniform(6, 14, size=len(month)), 2),
+                      'maximum_temperature': np.round(maximum_temperature, 2)}).to_csv(
+                blizzard_dir + 'Blizzard_' + str(year) + '.csv', index=False)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Nov 02 09:20:14 2026
+
+@author: epnzv
+"""
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+from order_curves import (build_order_index, cumulative_orders, order_snapshot)
+
+
+def baseline_orders(orders, cutoffs):
+    """Sums the orders up to each cutoff by filtering and grouping, the way
+    the monthly order features were built before the running sums.
+    """
+    keys = ['year', 'Variety_Name', 'abm']
+    curves = orders[keys].drop_duplicates().reset_index(drop=True)
+    for name, cutoff in cutoffs.items():
+        sums = orders[orders['EFFECTIVE_DATE'] <= cutoff].groupby(
+                by=keys, as_index=False)['order_Q'].sum().rename(columns={'order_Q': name})
+        curves = curves.merge(sums, on=keys, how='left')
+
+    return curves
+
+
+def test_missing_quantity_stays_in_its_group():
+    orders = pd.DataFrame({'year': '2020',
+                           'Variety_Name': ['A', 'A', 'B', 'C'],
+                           'abm': 'A01',
+                           'EFFECTIVE_DATE': pd.to_datetime(['2019-10-01', '2019-10-02',
+                                                             '2019-10-03', '2019-10-04']),
+                           'order_Q': [1.0, np.nan, 2.0, 3.0]})
+
+    curves = cumulative_orders(orders, {'to_date': dt.datetime(2019, 12, 31)})
+
+    assert curves.set_index('Variety_Name')['to_date'].to_dict() == {'A': 1.0, 'B': 2.0, 'C': 3.0}
+
+
+def test_matches_the_groupby_sums():
+    rng = np.random.default_rng(0)
+    n_orders = 2000
+    orders = pd.DataFrame({'year': '2020',
+                           'Variety_Name': rng.choice(['P' + str(i) for i in range(40)], n_orders),
+                           'abm': rng.choice(['A01', 'A02', 'A03'], n_orders),
+                           'EFFECTIVE_DATE': pd.Timestamp('2019-09-01') + pd.to_timedelta(
+                                   rng.integers(0, 365, n_orders), unit='D'),
+                           'order_Q': rng.integers(-5, 50, n_orders).astype(float)})
+    orders.loc[rng.choice(n_orders, 100, replace=False), 'order_Q'] = np.nan
+
+    cutoffs = {'Oct': dt.datetime(2019, 10, 31), 'Dec': dt.datetime(2019, 12, 15),
+               'Aug': dt.datetime(2020, 8, 31)}
+    keys = ['year', 'Variety_Name', 'abm']
+
+    curves = baseline_orders(orders, cutoffs).merge(cumulative_orders(orders, cutoffs),
+                                                    on=keys, suffixes=('', '_index'))
+
+    for name in cutoffs:
+        pd.testing.assert_series_equal(curves[name], curves[name + '_index'], check_names=False)
+
+
+def test_small_group_keeps_its_precision():
+    orders = pd.DataFrame({'year': '2020',
+                           'Variety_Name': ['A', 'B'],
+                           'abm': 'A01',
+                           'EFFECTIVE_DATE': pd.to_datetime(['2019-10-01', '2019-10-02']),
+                           'order_Q': [1e17, 1.0]})
+
+    curves = cumulative_orders(orders, {'to_date': dt.datetime(2019, 12, 31)})
+
+    assert curves.set_index('Variety_Name').loc['B', 'to_date'] == 1.0
+
+
+def test_snapshot_matches_each_query_date():
+    rng = np.random.default_rng(1)
+    n_orders = 500
+    orders = pd.DataFrame({'year': '2020',
+                           'Variety_Name': rng.choice(['P' + str(i) for i in range(10)], n_orders),
+                           'abm': rng.choice(['A01', 'A02'], n_orders),
+                           'EFFECTIVE_DATE': pd.Timestamp('2019-09-01') + pd.to_timedelta(
+                                   rng.integers(0, 365, n_orders), unit='D'),
+                           'return_Q': rng.integers(0, 10, n_orders).astype(float)})
+    index = build_order_index(orders, values=['return_Q'])
+
+    queries = orders[['year', 'Variety_Name', 'abm']].drop_duplicates().reset_index(drop=True)
+    queries['date'] = pd.Timestamp('2019-09-01') + pd.to_timedelta(
+            rng.integers(0, 365, len(queries)), unit='D')
+    snapshot = order_snapshot(index, queries, value='return_Q')
+
+    for row, query in queries.iterrows():
+        placed = orders[(orders['Variety_Name'] == query['Variety_Name']) &
+                        (orders['abm'] == query['abm']) &
+                        (orders['EFFECTIVE_DATE'] <= query['date'])]
+        expected = placed['return_Q'].sum() if len(placed) > 0 else np.nan
+        np.testing.assert_equal(snapshot[row], expected)
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Nov 01 10:12:37 2026
+
+@author: epnzv
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from aggregation_config import (BLIZZARD_DIR, INTERMEDIATE_COMPRESSION, INTERMEDIATE_DIR,
+                                WEATHER_YEARS)
+from parallel_read import (read_years)
+from stage_cache import (stage_key)
+
+# the directory under INTERMEDIATE_DIR the yearly Blizzard partitions are kept in
+WEATHER_STORE_NAME = 'blizzard'
+
+# the county locations of the Blizzard grid points
+COUNTY_LOCATIONS_FILE = 'county_locations.csv'
+
+# the number of grid steps per degree of the integer grid keys, i.e. the
+# coordinates are matched to 2 decimals
+GRID_SCALE = 100
+
+# the Blizzard columns the pipeline uses and the types they're stored as
+WEATHER_COLUMN_TYPES = {'year': 'int16',
+                        'month': 'int8',
+                        'latitude': 'float64',
+                        'longitude': 'float64',
+                        'precipitation': 'float64',
+                        'total_solar_radiation': 'float64',
+                        'minimum_temperature': 'float64',
+                        'maximum_temperature': 'float64'}
+
+
+def blizzard_csv_path(year):
+    """Returns the path of a year's Blizzard CSV."""
+    return BLIZZARD_DIR + 'Blizzard_' + str(year) + '.csv'
+
+
+def build_grid_index(county_locations):
+    """Builds the grid index of the county locations, the FIPS of each integer
+    grid key (see grid_key), sorted by grid key.
+
+    Keyword arguments:
+        county_locations -- the dataframe with fips, latitude, longitude
+    Returns:
+        grid_index -- the dataframe of the grid keys ('grid') and their FIPS
+    """
+    grid_index = pd.DataFrame({'grid': grid_key(county_locations['latitude'],
+                                                county_locations['longitude']),
+                               'fips': county_locations['fips'].values})
+
+    return grid_index.sort_values(by='grid', kind='stable').reset_index(drop=True)
+
+
+def convert_weather_files(years=None, n_workers=None):
+    """Converts the Blizzard CSVs of several years into the columnar store,
+    converting the years at the same time in a process pool.
+
+    Keyword arguments:
+        years -- the years to convert, WEATHER_YEARS by default
+        n_workers -- the number of worker processes, see parallel_read.read_years
+    Returns:
+        paths -- the list of the paths of the partitions, in the order of the years
+    """
+    if years is None:
+        years = WEATHER_YEARS
+
+    return read_years(convert_weather_year, years, n_workers=n_workers)
+
+
+def convert_weather_year(year):
+    """Converts one year's Blizzard CSV into a typed parquet partition of the
+    columns in WEATHER_COLUMN_TYPES, and records the key of the CSV it came
+    from next to it.
+
+    Keyword arguments:
+        year -- the year of the Blizzard file
+    Returns:
+        path -- the path of the partition
+    """
+    print("Convert ", str(year), " Weather Data")
+    dfi = pd.read_csv(blizzard_csv_path(year), usecols=list(WEATHER_COLUMN_TYPES))
+    dfi = dfi[list(WEATHER_COLUMN_TYPES)].astype(WEATHER_COLUMN_TYPES)
+
+    path = weather_partition_path(year)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    dfi.to_parquet(path, compression=INTERMEDIATE_COMPRESSION, index=False)
+
+    with open(weather_key_path(year), 'w') as f:
+        json.dump({'key': weather_partition_key(year), 'columns': WEATHER_COLUMN_TYPES}, f,
+                  indent=2, sort_keys=True)
+
+    return path
+
+
+def grid_fips_index():
+    """Returns the grid index of the county locations (see build_grid_index),
+    kept in the weather store and rebuilt only when the county locations
+    file changes.
+
+    Keyword arguments:
+        None
+    Returns:
+        grid_index -- the dataframe of the grid keys and their FIPS
+    """
+    path = os.path.join(INTERMEDIATE_DIR, WEATHER_STORE_NAME, 'county_grid.parquet')
+    key_path = os.path.join(INTERMEDIATE_DIR, WEATHER_STORE_NAME, 'county_grid.json')
+    stored = {'key': stage_key(WEATHER_STORE_NAME + '/county_grid', build_grid_index,
+                               files=[BLIZZARD_DIR + COUNTY_LOCATIONS_FILE]),
+              'scale': GRID_SCALE}
+
+    if stored_key_current(path, key_path, stored) == True:
+        return pd.read_parquet(path)
+
+    grid_index = build_grid_index(pd.read_csv(BLIZZARD_DIR + COUNTY_LOCATIONS_FILE))
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    grid_index.to_parquet(path, compression=INTERMEDIATE_COMPRESSION, index=False)
+    with open(key_path, 'w') as f:
+        json.dump(stored, f, indent=2, sort_keys=True)
+
+    return grid_index
+
+
+def grid_key(latitude, longitude):
+    """Returns the integer grid key of each point, its latitude and longitude
+    scaled by GRID_SCALE and rounded to integers, so points are matched
+    exactly as their coordinates rounded to 2 decimals would be. Points
+    missing a coordinate get -1.
+
+    Keyword arguments:
+        latitude -- the latitudes
+        longitude -- the longitudes
+    Returns:
+        keys -- the int64 array of the grid keys
+    """
+    latitude = np.asarray(latitude, dtype='float64')
+    longitude = np.asarray(longitude, dtype='float64')
+    missing = np.isnan(latitude) | np.isnan(longitude)
+
+    lat_steps = np.rint(np.where(missing, 0, latitude) * GRID_SCALE).astype('int64') + 90 * GRID_SCALE
+    lon_steps = np.rint(np.where(missing, 0, longitude) * GRID_SCALE).astype('int64') + 180 * GRID_SCALE
+
+    return np.where(missing, -1, lat_steps * (360 * GRID_SCALE + 1) + lon_steps)
+
+
+def iter_weather_partition(year, chunk_size, columns=None):
+    """Reads one year of the Blizzard data from the columnar store a batch of
+    rows at a time, converting the year's CSV first if needed (see
+    read_weather_partition).
+
+    Keyword arguments:
+        year -- the year of the Blizzard file
+        chunk_size -- the number of rows in each batch
+        columns -- the columns to read, every column in WEATHER_COLUMN_TYPES
+            by default
+    Returns:
+        chunks -- the iterator of the batches of the year's rows, with the
+            types read_csv gives them
+    """
+    # only pull in pyarrow's parquet reader when the data are read in batches
+    from pyarrow.parquet import (ParquetFile)
+
+    if columns is None:
+        columns = list(WEATHER_COLUMN_TYPES)
+
+    if weather_partition_current(year) == False:
+        convert_weather_year(year)
+
+    batches = ParquetFile(weather_partition_path(year)).iter_batches(batch_size=chunk_size,
+                                                                     columns=list(columns))
+
+    return (widen_weather_types(batch.to_pandas()) for batch in batches)
+
+
+def join_grid_fips(df_weather, grid_index):
+    """Adds the FIPS of each Blizzard point with an integer grid key lookup in
+    the grid index of the county locations. The points without a county get
+    NaN and are written to the unmatched point report of their year (see
+    report_unmatched_points).
+
+    Keyword arguments:
+        df_weather -- the dataframe of the Blizzard data
+        grid_index -- the grid index, see grid_fips_index
+    Returns:
+        Weather -- df_weather with the fips column added, with a new index
+    """
+    Weather, unmatched_points = match_grid_fips(df_weather, grid_index)
+    report_unmatched_points(unmatched_points, years=df_weather['year'].unique())
+
+    return Weather
+
+
+def match_grid_fips(df_weather, grid_index):
+    """Adds the FIPS of each Blizzard point with an integer grid key lookup in
+    the grid index of the county locations, and counts the rows of the points
+    without a county.
+
+    Keyword arguments:
+        df_weather -- the dataframe of the Blizzard data
+        grid_index -- the grid index, see grid_fips_index
+    Returns:
+        Weather -- df_weather with the fips column added (NaN for the points
+            without a county), with a new index
+        unmatched_points -- the dataframe of the year, latitude, longitude,
+            and number of rows of each point without a county
+    """
+    keys = grid_key(df_weather['latitude'], df_weather['longitude'])
+    matched = np.isin(keys, grid_index['grid'].values)
+
+    # points listed under several counties multiply the rows, as a merge does
+    if grid_index['grid'].is_unique == False:
+        Weather = df_weather.assign(_grid=keys).merge(
+                grid_index.rename(columns={'grid': '_grid'}), on='_grid', how='left')
+        Weather = Weather.drop(columns=['_grid'])
+    else:
+        grid_rows = pd.Index(grid_index['grid']).get_indexer(keys)
+        Weather = df_weather.reset_index(drop=True)
+        Weather['fips'] = grid_index['fips'].reindex(grid_rows).values
+
+    unmatched_points = df_weather[matched == False].groupby(
+            by=['year', 'latitude', 'longitude'], dropna=False).size().reset_index(name='rows')
+
+    return Weather, unmatched_points
+
+
+def read_weather_partition(year, columns=None):
+    """Reads one year of the Blizzard data from the columnar store, converting
+    the year's CSV first if it isn't in the store yet or has changed since it
+    was converted. The columns come back with the types read_csv gives them.
+
+    Keyword arguments:
+        year -- the year of the Blizzard file
+        columns -- the columns to read, every column in WEATHER_COLUMN_TYPES
+            by default
+    Returns:
+        dfi -- the county level blizzard data for the year
+    """
+    if columns is None:
+        columns = list(WEATHER_COLUMN_TYPES)
+
+    if weather_partition_current(year) == False:
+        convert_weather_year(year)
+
+    dfi = pd.read_parquet(weather_partition_path(year), columns=list(columns))
+
+    return widen_weather_types(dfi)
+
+
+def report_unmatched_points(unmatched_points, years):
+    """Writes the Blizzard points without a county, one CSV per year with the
+    latitude, longitude, and number of rows of each point, next to the
+    weather store. Every year gets a report, an empty one if all of its
+    points were matched.
+
+    Keyword arguments:
+        unmatched_points -- the points without a county, see match_grid_fips
+        years -- the years of the Blizzard data
+    Returns:
+        None
+    """
+    print("Weather points without a county: ", len(unmatched_points), " points, ",
+          unmatched_points['rows'].sum(), " rows")
+
+    os.makedirs(os.path.join(INTERMEDIATE_DIR, WEATHER_STORE_NAME), exist_ok=True)
+    for year in years:
+        unmatched_points[unmatched_points['year'] == year].to_csv(unmatched_report_path(year),
+                                                                  index=False)
+
+
+def stored_key_current(path, key_path, stored):
+    """Returns whether a file in the weather store exists and the key stored
+    next to it matches.
+
+    Keyword arguments:
+        path -- the path of the stored file
+        key_path -- the path of the JSON key stored next to it
+        stored -- the dictionary the stored key must equal
+    Returns:
+        current -- True if the file can be read as it is
+    """
+    if os.path.exists(path) == False or os.path.exists(key_path) == False:
+        return False
+
+    with open(key_path) as f:
+        return json.load(f) == stored
+
+
+def unmatched_report_path(year):
+    """Returns the path of a year's unmatched point report."""
+    return os.path.join(INTERMEDIATE_DIR, WEATHER_STORE_NAME,
+                        'unmatched_points_' + str(year) + '.csv')
+
+
+def weather_key_path(year):
+    """Returns the path of the key of a year's partition."""
+    return os.path.join(INTERMEDIATE_DIR, WEATHER_STORE_NAME, 'Blizzard_' + str(year) + '.json')
+
+
+def weather_partition_current(year):
+    """Returns whether a year's partition exists and was converted from the
+    current version of its CSV with the current columns.
+
+    Keyword arguments:
+        year -- the year of the Blizzard file
+    Returns:
+        current -- True if the partition can be read as it is
+    """
+    return stored_key_current(weather_partition_path(year), weather_key_path(year),
+                              {'key': weather_partition_key(year), 'columns': WEATHER_COLUMN_TYPES})
+
+
+def weather_partition_key(year):
+    """Returns the key of the version of a year's CSV and of the converter."""
+    return stage_key(WEATHER_STORE_NAME + '/' + str(year), convert_weather_year,
+                     files=[blizzard_csv_path(year)])
+
+
+def weather_partition_path(year):
+    """Returns the path of a year's partition in the store."""
+    return os.path.join(INTERMEDIATE_DIR, WEATHER_STORE_NAME,
+                        'Blizzard_' + str(year) + '.parquet')
+
+
+def widen_weather_types(dfi):
+    """Widens the stored types of the Blizzard columns back to the ones
+    read_csv gives them.
+    """
+    return dfi.astype({column: ('int64' if WEATHER_COLUMN_TYPES[column].startswith('int')
+                                else 'float64') for column in dfi.columns})
+
+
+if __name__ == '__main__':
+    # convert every year's Blizzard CSV ahead of the first run
+    convert_weather_files()
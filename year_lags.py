@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 29 10:18:26 2026
+
+@author: epnzv
+"""
+import numpy as np
+import pandas as pd
+
+
+def year_lags(df, lags, source=None, keys=['Variety_Name', 'abm'], year='year', years=None):
+    """Adds the values of the quantities from earlier years of the same keys
+    (e.g. the same product in the same abm) to each row, for every lag in one
+    pass. The keys and years of the rows and of the source are coded as
+    integers once, and every lag is a hash lookup of the row's code shifted
+    back by the lag, so the frames are neither copied per lag nor merged.
+
+    Keyword arguments:
+        df -- the dataframe to add the lagged quantities to
+        lags -- a dictionary of the number of years lagged to the quantity
+            columns lagged by that many years, e.g. {1: ['order_Q'], 2: ['order_Q']}
+        source -- the dataframe the lagged quantities are taken from, df by
+            default. e.g. the full table when df only has newly added years
+        keys -- the columns identifying a panel of years
+        year -- the year column, as integers or strings of integers
+        years -- the years of the rows to add lagged quantities to, every row
+            by default. the other rows get NaN
+    Returns:
+        df_lagged -- df with a <quantity>_<lag> column for each lag and
+            quantity, NaN where the earlier year isn't in the source
+    """
+    if source is None:
+        source = df
+
+    lag_columns = {}
+    for lag in sorted(lags):
+        for column in lags[lag]:
+            lag_columns[column + '_' + str(lag)] = np.full(len(df), np.nan)
+
+    if len(df) > 0 and len(source) > 0:
+        df_years = df[year].astype(int).values
+        source_years = source[year].astype(int).values
+
+        # code the keys of both frames together, missing keys match each other
+        # as they do in a merge
+        key_ids = pd.concat([df[keys], source[keys]]).groupby(
+                by=keys, dropna=False, sort=False).ngroup().values.astype('int64')
+        df_ids = key_ids[:len(df)]
+        source_ids = key_ids[len(df):]
+
+        first_year = min(df_years.min(), source_years.min()) - max(lags)
+        span = max(df_years.max(), source_years.max()) - first_year + 1
+        source_codes = pd.Index(source_ids * span + (source_years - first_year))
+
+        # a source with repeated keys and years multiplies the rows, as a merge does
+        if source_codes.is_unique == False:
+            return merge_year_lags(df=df, lags=lags, source=source, keys=keys, year=year,
+                                   years=years)
+
+        selected = np.ones(len(df), dtype=bool)
+        if years is not None:
+            selected = np.isin(df_years, np.asarray(years, dtype='int64'))
+
+        for lag in sorted(lags):
+            source_rows = source_codes.get_indexer(df_ids * span + (df_years - lag - first_year))
+            found = (source_rows != -1) & selected
+
+            for column in lags[lag]:
+                lag_columns[column + '_' + str(lag)][found] = (
+                        source[column].values[source_rows[found]])
+
+    return pd.concat([df, pd.DataFrame(lag_columns, index=df.index)], axis=1)
+
+
+def merge_year_lags(df, lags, source, keys=['Variety_Name', 'abm'], year='year', years=None):
+    """Adds the lagged quantities with a merge per lag, for sources with repeated
+    keys and years (see year_lags).
+
+    Keyword arguments:
+        df -- the dataframe to add the lagged quantities to
+        lags -- a dictionary of the number of years lagged to the quantity columns
+        source -- the dataframe the lagged quantities are taken from
+        keys -- the columns identifying a panel of years
+        year -- the year column
+        years -- the years of the rows to add lagged quantities to
+    Returns:
+        df_lagged -- df with a <quantity>_<lag> column for each lag and
+            quantity, with a new index as the merges give
+    """
+    df_lagged = df.assign(_lag_year=df[year].astype(int))
+    if years is not None:
+        df_lagged['_lag_year'] = df_lagged['_lag_year'].where(
+                df_lagged['_lag_year'].isin(years))
+
+    for lag in sorted(lags):
+        source_lag = source[keys + lags[lag]].assign(_lag_year=source[year].astype(int) + lag)
+        source_lag = source_lag.rename(columns={column: column + '_' + str(lag)
+                                                for column in lags[lag]})
+        df_lagged = df_lagged.merge(source_lag, on=keys + ['_lag_year'], how='left')
+
+    return df_lagged.drop(columns=['_lag_year'])